@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark runner: sweeps strategy x input size x seed x workers and writes the results as JSON.
+
+    python -m primergen.benchmark run --strategies greedy delob_min_degree --sizes 100 500 --workers 1 2
+    python -m primergen.benchmark compare baseline.json new.json
+
+Each run is done in a fresh process (so peak memory and caches are per run) and calls start() / generate() only:
+no output files are written and the library isn't validated, so only the strategy itself is timed.
+Extractors read input lists from primergen/input (picked by their size), generators grow a library up to --target.
+"""
+
+import argparse
+import contextlib
+import importlib
+import inspect
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib import resources
+
+import numpy
+
+from primergen.common.profiling import PROFILERS, PhaseTimer
+from primergen.common.progress import ProgressReporter
+from primergen.common.util import DATA_FOLDER, get_filestamp
+
+# Strategy name (module name, as in python -m primergen.extractors.X) -> class
+EXTRACTORS = {
+    "approx_mis": "primergen.extractors.approx_mis.ApproxMisPrimerExtractor",
+    "components": "primergen.extractors.components.ComponentsPrimerExtractor",
+    "delob": "primergen.extractors.delob.DelobPrimerExtractor",
+    "delob_min_degree": "primergen.extractors.delob_min_degree.DelobMinDegreePrimerExtractor",
+    "delob_min_degree_neighbors": "primergen.extractors.delob_min_degree_neighbors.DelobMinDegreeNeighborsPrimerExtractor",
+    "exact_mis": "primergen.extractors.exact_mis.ExactMisPrimerExtractor",
+    "greedy": "primergen.extractors.greedy.GreedyPrimerExtractor",
+    "naive_clique": "primergen.extractors.naive_clique.NaiveCliquePrimerExtractor",
+    "streaming": "primergen.extractors.streaming.StreamingGreedyPrimerExtractor",
+}
+GENERATORS = {
+    "random": "primergen.generators.random.RandomPrimerGenerator",
+    "random_gc": "primergen.generators.random_gc.RandomBalancedGCPrimerGenerator",
+    "random_gc_frequencies": "primergen.generators.random_gc_frequencies.RandomBalancedGCFrequenciesPrimerGenerator",
+    "random_gc_frequencies_noreroll": "primergen.generators.random_gc_frequencies_noreroll.RandomBalancedGCFrequenciesPrimerGenerator",
+}
+STRATEGIES = {**EXTRACTORS, **GENERATORS}
+
+# Default sweep: every extractor, on inputs small enough to finish in seconds
+DEFAULT_SIZES = [100, 200, 500]
+# Library size generators stop at
+DEFAULT_GENERATOR_TARGET = 200
+# Results are written here unless --output is given
+BENCHMARK_FOLDER = os.path.join(DATA_FOLDER, "benchmarks")
+RESULTS_FORMAT_VERSION = 1
+# compare: a run this much slower (relative wall time) than the baseline is a regression
+REGRESSION_THRESHOLD = 0.1
+
+INPUT_FILE_PATTERN = re.compile(r"-(\d+)-primers\.txt$")
+
+
+def get_input_files():
+    """
+    Input size -> file name, for every primer list in primergen/input.
+    """
+    files = {}
+    for entry in resources.files("primergen.input").iterdir():
+        match = INPUT_FILE_PATTERN.search(entry.name)
+        if match:
+            files[int(match.group(1))] = entry.name
+    return dict(sorted(files.items()))
+
+
+def get_configs(strategies, sizes, seeds, workers, target, batch_size, repeat):
+    """
+    One config (dict) per run of the sweep.
+    Extractors get one config per input size, generators ignore sizes and grow a library of /target/ primers.
+    """
+    input_files = get_input_files()
+    for size in sizes:
+        if size not in input_files:
+            raise ValueError(
+                f"No input with {size} primers (have: {', '.join(map(str, input_files))})"
+            )
+    configs = []
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown strategy {strategy} (have: {', '.join(STRATEGIES)})"
+            )
+        if strategy in EXTRACTORS:
+            inputs = [(size, input_files[size]) for size in sizes]
+        else:
+            inputs = [(None, None)]
+        for size, input_file in inputs:
+            for seed in seeds:
+                for num_workers in workers:
+                    for run in range(repeat):
+                        configs.append(
+                            {
+                                "strategy": strategy,
+                                "kind": (
+                                    "extractor"
+                                    if strategy in EXTRACTORS
+                                    else "generator"
+                                ),
+                                "input_file": input_file,
+                                "input_size": size,
+                                "target": None if strategy in EXTRACTORS else target,
+                                "batch_size": (
+                                    None if strategy in EXTRACTORS else batch_size
+                                ),
+                                "seed": seed,
+                                "workers": num_workers,
+                                "run": run,
+                            }
+                        )
+    return configs
+
+
+def run_benchmarks(configs, edge_cache=False, verbose=False, profiler=None):
+    """
+    Runs each config in its own process, one after the other, and returns their results.
+    """
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for num, config in enumerate(configs, start=1):
+        print(
+            f"[{num}/{len(configs)}] {config['strategy']}, input: {config['input_size'] or config['target']}, seed: {config['seed']}, workers: {config['workers']}"
+        )
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                result = executor.submit(
+                    run_once, config, edge_cache, verbose, profiler
+                ).result()
+            except Exception as e:
+                result = {**config, "error": f"{type(e).__name__}: {e}"}
+        if "error" in result:
+            print(f"  failed: {result['error']}")
+        else:
+            print(
+                f"  {result['primers']} primers in {result['wall_sec']:.3f} sec (cpu: {result['cpu_sec']:.3f} sec, peak rss: {result['peak_rss_mb']:.1f} MB)"
+            )
+        runs.append(result)
+    return runs
+
+
+def run_once(config, edge_cache=False, verbose=False, profiler=None):
+    """
+    Runs one config in this process and measures it. Meant to be called in a fresh process (see run_benchmarks).
+    """
+    import primergen.extractors.base as extractor_base
+
+    # Graph extractors would otherwise reuse edges from earlier runs and skip the all-pairs edit distances
+    extractor_base.USE_EDGE_CACHE = edge_cache
+
+    module_name, class_name = STRATEGIES[config["strategy"]].rsplit(".", 1)
+    cls = getattr(importlib.import_module(module_name), class_name)
+    params = inspect.signature(cls).parameters
+    kwargs = {}
+    if "workers" in params:
+        kwargs["workers"] = config["workers"]
+    if config["kind"] == "extractor":
+        with resources.open_text("primergen.input", config["input_file"]) as f:
+            args = [f.read().splitlines()]
+    else:
+        args = []
+        kwargs["target"] = config["target"]
+        kwargs["batch_size"] = config["batch_size"]
+
+    output = None if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        generator = cls(*args, **kwargs)
+        # Constructors seed with the built-in seeds, so reseed after
+        if config["seed"] is not None:
+            random.seed(config["seed"])
+            numpy.random.seed(config["seed"])
+        generator.timer = PhaseTimer(profiler)
+        if not verbose:
+            # No progress thread competing with the run
+            generator.progress = ProgressReporter(generator, None)
+        generator.start()
+        with generator.timer.span("generate"):
+            generator.generate()
+        generator.timer.stop()
+        generator.progress.stop(report=False)
+    # CPU time includes the processes this one started (e.g., edit distance pools)
+    timings = generator.timer.to_dict()
+
+    # Peak memory too
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+    peak_rss_mb = max(usage.ru_maxrss, children.ru_maxrss) * rss_unit / 2**20
+
+    num_primers = len(generator.primers)
+    wall_sec = timings["wall_sec"]
+    result = {
+        **config,
+        "strategy_name": generator.strategy,
+        "primers": num_primers,
+        "num_starting_primers": generator.num_starting_primers,
+        "per": (
+            100 * num_primers / generator.num_starting_primers
+            if generator.num_starting_primers
+            else None
+        ),
+        "wall_sec": wall_sec,
+        "cpu_sec": timings["cpu_sec"],
+        "peak_rss_mb": peak_rss_mb,
+        "primers_per_sec": num_primers / wall_sec if wall_sec else None,
+        "iterations": generator.iterations,
+        # (wall-clock sec since start, number of primers) each time primers were found
+        "found_times": [list(found) for found in generator.primer_found_times],
+        # Time spent in each phase, see profiling.py
+        "phases": timings["spans"],
+    }
+    if "profile" in timings:
+        result["profile"] = timings["profile"]
+    return result
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(runs, path=None):
+    """
+    Writes the runs with some context about the machine and code, returns the path.
+    """
+    if path is None:
+        os.makedirs(BENCHMARK_FOLDER, exist_ok=True)
+        path = os.path.join(BENCHMARK_FOLDER, get_filestamp(suffix="benchmark.json"))
+    results = {
+        "version": RESULTS_FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": get_commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "runs": runs,
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(results, f, indent=1)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_results(path):
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(
+            f"{path}: results format {results.get('version')}, expected {RESULTS_FORMAT_VERSION}"
+        )
+    return results
+
+
+def _get_key(run):
+    return (
+        run["strategy"],
+        run["input_size"],
+        run["target"],
+        run["batch_size"],
+        run["seed"],
+        run["workers"],
+    )
+
+
+def _get_best_runs(runs):
+    """
+    Key -> fastest successful run with that key (repeats of a config are noisy, the fastest is the least disturbed).
+    """
+    best = {}
+    for run in runs:
+        if "error" in run:
+            continue
+        key = _get_key(run)
+        if key not in best or run["wall_sec"] < best[key]["wall_sec"]:
+            best[key] = run
+    return best
+
+
+def compare_results(baseline, new, threshold=REGRESSION_THRESHOLD):
+    """
+    Matches runs of two results (same strategy, input, seed and workers) and returns one row (dict) per match.
+    A row is a regression if the new run is more than /threshold/ slower (relative wall time) or finds fewer primers.
+    """
+    old_runs = _get_best_runs(baseline["runs"])
+    new_runs = _get_best_runs(new["runs"])
+    rows = []
+    for key in sorted(
+        old_runs.keys() & new_runs.keys(), key=lambda key: tuple(map(str, key))
+    ):
+        old, cur = old_runs[key], new_runs[key]
+        wall_ratio = cur["wall_sec"] / old["wall_sec"] if old["wall_sec"] else None
+        rows.append(
+            {
+                "strategy": key[0],
+                "input": key[1] if key[1] is not None else key[2],
+                "seed": key[4],
+                "workers": key[5],
+                "old_wall_sec": old["wall_sec"],
+                "new_wall_sec": cur["wall_sec"],
+                "wall_ratio": wall_ratio,
+                "old_primers": old["primers"],
+                "new_primers": cur["primers"],
+                "old_peak_rss_mb": old["peak_rss_mb"],
+                "new_peak_rss_mb": cur["peak_rss_mb"],
+                "faster": wall_ratio is not None and wall_ratio < 1 - threshold,
+                "regression": (wall_ratio is not None and wall_ratio > 1 + threshold)
+                or cur["primers"] < old["primers"],
+            }
+        )
+    return rows
+
+
+def print_comparison(rows):
+    print(
+        f"{'strategy':<32}{'input':>8}{'seed':>8}{'workers':>8}{'old sec':>10}{'new sec':>10}{'ratio':>8}{'primers':>14}{'rss MB':>16}"
+    )
+    for row in rows:
+        if row["regression"]:
+            verdict = "REGRESSION"
+        elif row["faster"]:
+            verdict = "faster"
+        else:
+            verdict = ""
+        ratio = f"{row['wall_ratio']:.2f}" if row["wall_ratio"] is not None else "-"
+        print(
+            f"{row['strategy']:<32}{str(row['input']):>8}{str(row['seed']):>8}{row['workers']:>8}"
+            f"{row['old_wall_sec']:>10.3f}{row['new_wall_sec']:>10.3f}{ratio:>8}"
+            f"{row['old_primers']:>7}{row['new_primers']:>7}"
+            f"{row['old_peak_rss_mb']:>8.1f}{row['new_peak_rss_mb']:>8.1f}  {verdict}"
+        )
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{len(rows)} runs compared, {regressions} regressions")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m primergen.benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a benchmark sweep")
+    run_parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=list(EXTRACTORS),
+        choices=list(STRATEGIES),
+        metavar="STRATEGY",
+        help=f"extractors and generators to run (default: all extractors), from: {', '.join(STRATEGIES)}",
+    )
+    run_parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=DEFAULT_SIZES,
+        help=f"extractor input sizes, from: {', '.join(map(str, get_input_files()))}",
+    )
+    run_parser.add_argument(
+        "--seeds",
+        nargs="+",
+        type=int,
+        default=[None],
+        help="random seeds (default: the built-in ones)",
+    )
+    run_parser.add_argument("--workers", nargs="+", type=int, default=[1])
+    run_parser.add_argument(
+        "--target",
+        type=int,
+        default=DEFAULT_GENERATOR_TARGET,
+        help="library size generators stop at",
+    )
+    run_parser.add_argument(
+        "--batch-size", type=int, default=None, help="generators' batch size"
+    )
+    run_parser.add_argument(
+        "--repeat", type=int, default=1, help="runs of each configuration"
+    )
+    run_parser.add_argument(
+        "--edge-cache",
+        action="store_true",
+        help="let graph extractors reuse cached conflict edges",
+    )
+    run_parser.add_argument(
+        "--profiler",
+        choices=[profiler for profiler in PROFILERS if profiler],
+        help="also profile each run and add the top functions to its results",
+    )
+    run_parser.add_argument("--output", help="results file (JSON)")
+    run_parser.add_argument(
+        "--verbose", action="store_true", help="show the strategies' own output"
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two results files, exits with 1 on regressions"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        configs = get_configs(
+            args.strategies,
+            args.sizes,
+            args.seeds,
+            args.workers,
+            args.target,
+            args.batch_size,
+            args.repeat,
+        )
+        runs = run_benchmarks(
+            configs,
+            edge_cache=args.edge_cache,
+            verbose=args.verbose,
+            profiler=args.profiler,
+        )
+        path = write_results(runs, args.output)
+        print(f"Wrote {len(runs)} runs to {path}")
+        return 0
+
+    rows = compare_results(
+        load_results(args.baseline), load_results(args.new), args.threshold
+    )
+    print_comparison(rows)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+Batch-then-filter acceptance for the generators: check a whole batch of packed candidates against the accepted library
+with the batched edit distance kernel, then pick a conflict-free subset of the survivors.
+
+The library is scanned in tiles of columns, and candidates that already hit a conflict are dropped from the next tiles,
+so rejected candidates (most of them, once the library is big) only pay for part of the library.
+
+For the parallel mode, the accepted library lives in shared memory (SharedLibrary): worker processes screen batches against
+a prefix of it without copying it, and the process that owns it appends newly accepted primers.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy
+
+from primergen.common.check import MIN_EDIT_DISTANCE, PRIMER_LENGTH
+from primergen.common.edit_kernel import conflicts_block
+
+# Library primers checked against the remaining candidates at a time
+LIBRARY_COLUMNS_PER_TILE = 1024
+# Batches queued per worker process in parallel mode, so workers don't wait on the committer
+BATCHES_IN_FLIGHT_PER_WORKER = 2
+
+# Shared library for the worker processes, attached once per worker by the pool initializer
+_worker_memory = None
+_worker_library = None
+
+
+class SharedLibrary:
+    """
+    Append-only array of packed primers in shared memory, with room for /capacity/ primers.
+    Primers before /size/ never change, so workers can read library.primers[:size] while new primers are appended.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.memory = shared_memory.SharedMemory(create=True, size=max(1, capacity) * 8)
+        self.name = self.memory.name
+        self.primers = numpy.ndarray(
+            (capacity,), dtype=numpy.uint64, buffer=self.memory.buf
+        )
+        self.size = 0
+
+    def extend(self, packed):
+        if self.size + len(packed) > self.capacity:
+            raise ValueError(f"Shared library is full ({self.capacity} primers)")
+        self.primers[self.size : self.size + len(packed)] = packed
+        self.size += len(packed)
+
+    def close(self):
+        # Drop our view first, the memory can't be closed while it's exported
+        self.primers = None
+        self.memory.close()
+        self.memory.unlink()
+
+
+def conflict_free_mask(
+    packed_candidates,
+    packed_library,
+    length=PRIMER_LENGTH,
+    limit=MIN_EDIT_DISTANCE,
+    columns_per_tile=LIBRARY_COLUMNS_PER_TILE,
+):
+    """
+    Boolean mask over the candidates, True for those that are at least /limit/ edit distance away from every library primer.
+    """
+    free = numpy.ones(len(packed_candidates), dtype=bool)
+    for col in range(0, len(packed_library), columns_per_tile):
+        remaining = numpy.nonzero(free)[0]
+        if len(remaining) == 0:
+            break
+        conflicts = conflicts_block(
+            packed_candidates[remaining],
+            packed_library[col : col + columns_per_tile],
+            length=length,
+            limit=limit,
+        )
+        free[remaining[conflicts.any(axis=1)]] = False
+    return free
+
+
+def greedy_independent_mask(packed, length=PRIMER_LENGTH, limit=MIN_EDIT_DISTANCE):
+    """
+    Greedy independent set of the conflict graph inside a batch: goes through the primers in order
+    and keeps each one that isn't too close to a primer kept before it. Returns the boolean mask of kept primers.
+    """
+    conflicts = conflicts_block(packed, packed, length=length, limit=limit)
+    keep = numpy.zeros(len(packed), dtype=bool)
+    for idx in range(len(packed)):
+        keep[idx] = not (conflicts[idx, :idx] & keep[:idx]).any()
+    return keep
+
+
+def iter_screened_batches(sample_batch, batch_size, library, workers):
+    """
+    Yields (packed, library_free, library_size) for batches of candidates drawn with sample_batch(batch_size), in order.
+    library_free is True for candidates that aren't too close to any of the first /library_size/ primers of the SharedLibrary,
+    as screened by a pool of /workers/ processes. The caller appends accepted primers to the library between batches:
+    batches queued after that are screened against the bigger library, batches already queued only need to be checked against the new primers.
+    Closing the generator cancels the batches that haven't started yet.
+    """
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_screen_worker,
+        initargs=(library.name, library.capacity),
+    )
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < workers * BATCHES_IN_FLIGHT_PER_WORKER:
+                packed = sample_batch(batch_size)
+                future = executor.submit(_screen_candidates, packed, library.size)
+                pending.append((packed, library.size, future))
+            packed, library_size, future = pending.popleft()
+            yield (packed, future.result(), library_size)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _init_screen_worker(name, capacity):
+    global _worker_memory, _worker_library
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_library = numpy.ndarray(
+        (capacity,), dtype=numpy.uint64, buffer=_worker_memory.buf
+    )
+
+
+def _screen_candidates(packed_candidates, library_size):
+    return conflict_free_mask(packed_candidates, _worker_library[:library_size])
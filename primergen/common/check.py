@@ -16,39 +16,58 @@ MIN_EDIT_DISTANCE = 8  # int(0.4 * PRIMER_LENGTH)
 MIN_CG_CONTENT = 45
 MAX_CG_CONTENT = 55
 
-# For graph extractors to use a local file of edges instead of recomputing (faster testing)
-USE_EDGES_FILE = False
+# For graph extractors to reuse edges cached in primergen/cache for the same primers instead of recomputing (see edge_cache.py)
+USE_EDGE_CACHE = True
+# For graph extractors to skip pairs that a pigeonhole seed index proves are far enough apart (see seed_index.py).
+# Off by default: at L = 20 and edit distance 8 the seeds are 2-3 nts long and ~97% of pairs are still candidates.
+USE_SEED_INDEX = False
+# How long the final library validation may take before giving up with an UNKNOWN verdict (None = no limit)
+VALIDATION_TIME_BUDGET_SEC = 30 * 60
+# Also write each output library as a binary primer store (see primer_store.py) next to the text file
+WRITE_PRIMER_STORE = True
+# For execute() to return the library a previous run with the same input, strategy, seeds and code found (see result_cache.py)
+USE_RESULT_CACHE = True
+# Where progress goes while a run is going, every PROGRESS_INTERVAL_SEC (see progress.py): "silent", "human" or "jsonl"
+PROGRESS_SINK = "human"
+# Profiler over each run, reported with the phase timings (see profiling.py): None, "cprofile" or "sample"
+PROFILER = None
 
 from Bio.SeqUtils import GC
 import editdistance
 import itertools
-import functools
+import os
+import numpy
 from polyleven import levenshtein
+from primergen.common.packed import (
+    INVALID_CODE,
+    encode_primers,
+    gc_counts,
+    gc_counts_packed,
+)
 
+# Number of processes for parallel work (e.g., building the conflict graph). <= 1 runs everything in this process
+NUM_WORKERS = os.cpu_count() or 1
 
-def are_primers_valid(primers):
+
+def are_primers_valid(
+    primers, report_all=False, workers=NUM_WORKERS, time_budget_sec=None
+):
     """
     Returns a boolean indicating of a list of primers all mutually pass our conditions to be a valid primer library.
-    Exits early if any of them fail.
+    Exits early if any of them fail, unless report_all=True. Returns False if time_budget_sec runs out before all pairs are checked.
+    See validation.validate_primers for the full report.
     """
-    # Run the easy checks first
-    easy_valids = map(is_len_gc_valid, primers)
-    is_all_valid_easy = all(easy_valids)
-    if not is_all_valid_easy:
-        print(
-            f"PRIMER LIBRARY FAILURE: >= 1 primers have wrong length or wrong GC proportion"
-        )
-        return False
-
-    # Run the n-choose-2 valids now
-    for (p1, p2) in itertools.combinations(primers, 2):
-        if not is_primer_pair_valid(p1, p2, limit=MIN_EDIT_DISTANCE):
-            print(
-                f"PRIMER LIBRARY FAILURE: {p1} and {p2} are not {MIN_EDIT_DISTANCE} edit distance apart!"
-            )
-            return False
-
-    return True
+    # Imported here: validation uses the conflict graph builder, which imports this module
+    from primergen.common.validation import validate_primers
+
+    report = validate_primers(
+        primers,
+        report_all=report_all,
+        workers=workers,
+        time_budget_sec=time_budget_sec,
+    )
+    report.print_summary()
+    return report.is_valid()
 
 
 def is_right_length(primer) -> bool:
@@ -64,12 +83,42 @@ def is_len_gc_valid(primer) -> bool:
     return is_right_length(primer) and is_gc_valid(primer)
 
 
-@functools.lru_cache(maxsize=100000)
+def is_len_gc_valid_batch(primers):
+    """
+    Vectorized is_len_gc_valid: returns a boolean numpy array, True where the primer has the right length and GC content.
+    """
+    primers = [str(primer) for primer in primers]
+    valid = numpy.fromiter(map(len, primers), dtype=numpy.int64, count=len(primers))
+    valid = valid == PRIMER_LENGTH
+    right_length = [primer for primer, ok in zip(primers, valid) if ok]
+    codes = encode_primers(right_length, PRIMER_LENGTH)
+    gc_valid = is_gc_count_valid(gc_counts(codes), PRIMER_LENGTH)
+    # Anything that isn't plain ACGT goes through the Biopython check
+    for row in numpy.flatnonzero((codes == INVALID_CODE).any(axis=1)):
+        gc_valid[row] = is_gc_valid(right_length[row])
+    valid[valid] = gc_valid
+    return valid
+
+
+def is_gc_valid_packed(packed, length=PRIMER_LENGTH):
+    """
+    Vectorized is_gc_valid over an array of 2-bit packed primers (see packed.py), returns a boolean numpy array.
+    """
+    return is_gc_count_valid(gc_counts_packed(packed, length), length)
+
+
+def is_gc_count_valid(gc_counts, length):
+    # Same as MIN_CG_CONTENT <= 100 * gc_count / length <= MAX_CG_CONTENT, without floats
+    gc_counts = numpy.asarray(gc_counts) * 100
+    return (MIN_CG_CONTENT * length <= gc_counts) & (
+        gc_counts <= MAX_CG_CONTENT * length
+    )
+
+
 def is_primer_pair_valid(p1, p2, limit=None):
     """
-    Memoized to avoid computing edit distance multiple times for identical string pairs
     Add a limit to use the possibly faster polyleven library (only care about edit distances up to a point, then return early I expect)
-    TODO: is this memoized on value or object ID itself?
+    Not memoized: every pair we check is a new pair, so a cache never hits and just holds on to memory.
     """
     dist = -1
     if limit:
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+"""
+Builds the conflict graph used by the graph extractors.
+Vertices are indices into the initial primer list, edges are pairs of primers that are *too close* in edit distance.
+
+The n-choose-2 pair space is split into blocks of rows (row i is paired with every j > i).
+Blocks are handed to a process pool and their edges are streamed back in block order,
+so the parallel and serial paths produce exactly the same edge list: the same one itertools.combinations would give.
+"""
+
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from primergen.common.check import (
+    MIN_EDIT_DISTANCE,
+    NUM_WORKERS,
+    USE_SEED_INDEX,
+    get_edit_distance_with_limit,
+)
+from primergen.common.edit_kernel import edit_distances_block
+from primergen.common.packed import (
+    INVALID_CODE,
+    MAX_PACKED_LENGTH,
+    encode_primers,
+    pack_codes,
+)
+from primergen.common.primer_store import PrimerStore
+from primergen.common.seed_index import SeedIndex
+
+# Roughly how many pairs each block of rows should contain (bigger blocks = less IPC, coarser progress)
+PAIRS_PER_BLOCK = 2_000_000
+# How many columns the batched edit distance kernel sees at a time for each block of rows
+COLUMNS_PER_TILE = 8192
+
+# Primers (packed, and seed index) for the worker processes, set once per worker by the pool initializer so we don't re-send them per block
+_worker_primers = None
+_worker_packed = None
+_worker_seed_index = None
+
+
+def get_conflict_edges(
+    primers,
+    limit=MIN_EDIT_DISTANCE,
+    workers=NUM_WORKERS,
+    far=False,
+    pairs_per_block=PAIRS_PER_BLOCK,
+    use_seed_index=USE_SEED_INDEX,
+):
+    """
+    Returns the list of (idx1, idx2) edges (idx1 < idx2) between primers that are less than /limit/ edit distance apart.
+    If far=True, returns the complement instead: pairs that are at least /limit/ apart.
+    workers <= 1 computes everything in this process.
+    use_seed_index=True only computes edit distances for pairs the pigeonhole SeedIndex can't rule out (same edges).
+    """
+    return list(
+        iter_conflict_edges(
+            primers,
+            limit=limit,
+            workers=workers,
+            far=far,
+            pairs_per_block=pairs_per_block,
+            use_seed_index=use_seed_index,
+        )
+    )
+
+
+def iter_conflict_edges(
+    primers,
+    limit=MIN_EDIT_DISTANCE,
+    workers=NUM_WORKERS,
+    far=False,
+    pairs_per_block=PAIRS_PER_BLOCK,
+    use_seed_index=USE_SEED_INDEX,
+):
+    """
+    Same as get_conflict_edges, but yields edges as each block of rows finishes.
+    """
+    for _, _, edges in iter_conflict_edge_blocks(
+        primers,
+        limit=limit,
+        workers=workers,
+        far=far,
+        pairs_per_block=pairs_per_block,
+        use_seed_index=use_seed_index,
+    ):
+        yield from edges
+
+
+def iter_conflict_edge_blocks(
+    primers,
+    limit=MIN_EDIT_DISTANCE,
+    workers=NUM_WORKERS,
+    far=False,
+    pairs_per_block=PAIRS_PER_BLOCK,
+    use_seed_index=USE_SEED_INDEX,
+):
+    """
+    Yields (start, stop, edges) for each block of rows [start, stop), in order.
+    If all primers are the same length and only use A, C, G and T, edit distances go through the batched kernel in edit_kernel.py.
+    Closing the generator early cancels the blocks that haven't started yet.
+    """
+    if not isinstance(primers, PrimerStore):
+        primers = list(primers)
+    blocks = get_row_blocks(len(primers), pairs_per_block)
+    # Wall clock, since the work happens in other processes
+    start_time = time.perf_counter()
+
+    if workers <= 1 or len(blocks) <= 1:
+        seed_index = SeedIndex(primers, limit=limit) if use_seed_index else None
+        packed = pack_if_possible(primers)
+        results = (
+            _conflict_edges_for_rows(
+                primers, start, stop, limit, far, seed_index, packed
+            )
+            for (start, stop) in blocks
+        )
+        yield from _report_blocks(len(primers), blocks, results, start_time)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(primers, limit, use_seed_index),
+    )
+    try:
+        results = executor.map(
+            _worker_conflict_edges_for_rows,
+            [start for (start, _) in blocks],
+            [stop for (_, stop) in blocks],
+            [limit] * len(blocks),
+            [far] * len(blocks),
+        )
+        yield from _report_blocks(len(primers), blocks, results, start_time)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def get_row_blocks(n, pairs_per_block=PAIRS_PER_BLOCK):
+    """
+    Splits rows 0..n-1 into [start, stop) blocks with about /pairs_per_block/ pairs each.
+    Early rows pair with more primers than later rows, so blocks get taller as we go down.
+    """
+    blocks = []
+    start = 0
+    while start < n - 1:
+        stop = start
+        pairs = 0
+        while stop < n - 1 and pairs < pairs_per_block:
+            pairs += n - 1 - stop
+            stop += 1
+        blocks.append((start, stop))
+        start = stop
+    return blocks
+
+
+def pack_if_possible(primers):
+    """
+    Packed primers (see packed.py) for the batched kernel, or None if they aren't all the same length and plain ACGT.
+    A PrimerStore is already packed: its memory-mapped records are used as they are.
+    """
+    if not len(primers):
+        return None
+    if isinstance(primers, PrimerStore):
+        return primers.packed
+    length = len(primers[0])
+    if length > MAX_PACKED_LENGTH or any(len(primer) != length for primer in primers):
+        return None
+    codes = encode_primers(primers, length)
+    if (codes == INVALID_CODE).any():
+        return None
+    return pack_codes(codes)
+
+
+def _report_blocks(n, blocks, results, start_time):
+    combinations = math.comb(n, 2)
+    pairs_done = 0
+    for (start, stop), edges in zip(blocks, results):
+        pairs_done += sum(n - 1 - row for row in range(start, stop))
+        elapsed = time.perf_counter() - start_time
+        progress_fraction = pairs_done / combinations
+        eta = (elapsed / progress_fraction) * (1 - progress_fraction)
+        print(
+            f"Computed edit distances for primers {start} to {stop - 1}\t({round(progress_fraction * 100, 2)}%)\tEdges: {len(edges)}\tETA: {int(eta / 60)} m {int(eta % 60)} s"
+        )
+        yield (start, stop, edges)
+
+
+def _conflict_edges_for_rows(
+    primers, start, stop, limit, far, seed_index=None, packed=None
+):
+    if seed_index is None and packed is not None:
+        return _conflict_edges_for_rows_batched(
+            packed, len(primers[0]), start, stop, limit, far
+        )
+    edges = []
+    n = len(primers)
+    for idx1 in range(start, stop):
+        primer1 = primers[idx1]
+        if seed_index is None:
+            candidates = range(idx1 + 1, n)
+        else:
+            # Primers that aren't candidates are definitely far enough apart
+            candidates = [
+                idx2 for idx2 in seed_index.candidates(primer1) if idx2 > idx1
+            ]
+        too_close = [
+            idx2
+            for idx2 in candidates
+            if get_edit_distance_with_limit(primer1, primers[idx2], limit=limit) < limit
+        ]
+        # Conflict graph: keep pairs that are too close (or far enough apart, for the complement)
+        if far:
+            too_close = set(too_close)
+            edges.extend(
+                (idx1, idx2) for idx2 in range(idx1 + 1, n) if idx2 not in too_close
+            )
+        else:
+            edges.extend((idx1, idx2) for idx2 in too_close)
+    return edges
+
+
+def _conflict_edges_for_rows_batched(packed, length, start, stop, limit, far):
+    rows = numpy.arange(start, stop)
+    idx1s = []
+    idx2s = []
+    for col in range(start + 1, len(packed), COLUMNS_PER_TILE):
+        cols = numpy.arange(col, min(col + COLUMNS_PER_TILE, len(packed)))
+        too_close = (
+            edit_distances_block(
+                packed[start:stop], packed[cols], length=length, limit=limit
+            )
+            < limit
+        )
+        # Conflict graph: keep pairs that are too close (or far enough apart, for the complement), only once per pair
+        keep = (~too_close if far else too_close) & (cols[None, :] > rows[:, None])
+        tile_idx1, tile_idx2 = numpy.nonzero(keep)
+        idx1s.append(rows[tile_idx1])
+        idx2s.append(cols[tile_idx2])
+    if not idx1s:
+        return []
+    idx1s = numpy.concatenate(idx1s)
+    idx2s = numpy.concatenate(idx2s)
+    # Same order as the one-pair-at-a-time loop
+    order = numpy.lexsort((idx2s, idx1s))
+    return list(zip(idx1s[order].tolist(), idx2s[order].tolist()))
+
+
+def _init_worker(primers, limit, use_seed_index):
+    global _worker_primers, _worker_packed, _worker_seed_index
+    _worker_primers = primers
+    _worker_packed = pack_if_possible(primers)
+    _worker_seed_index = SeedIndex(primers, limit=limit) if use_seed_index else None
+
+
+def _worker_conflict_edges_for_rows(start, stop, limit, far):
+    return _conflict_edges_for_rows(
+        _worker_primers, start, stop, limit, far, _worker_seed_index, _worker_packed
+    )
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+"""
+Compact conflict graph for the DeLOB extractors, instead of a networkx.Graph (dict of dicts, hundreds of bytes per edge).
+
+Adjacency is stored once in CSR form (indptr/indices NumPy arrays) and never changes.
+Removing a node just clears its bit in an alive mask and decrements the degree of its alive neighbours,
+and the number of edges is kept as a running count.
+
+Nodes are ordered the way networkx would order them for the same edge list (order of first appearance),
+so "first node with the smallest degree" and random.choice(list(g.nodes())) pick the same nodes as with networkx.
+Random DeLOB samples from a pool of nodes instead (random_node), which is O(1) per draw but doesn't keep that order.
+
+Min-degree queries go through a heap of (degree, order, node) entries with lazy invalidation:
+degrees only ever go down, so removing a node pushes one new entry per edge it loses, and entries whose degree is out of date
+are dropped when they reach the top. Extracting a whole library is then O(m log n) instead of rescanning every node each step.
+
+The min-degree-neighbors strategy also needs, for each node, the sum of its neighbours' degrees.
+Those sums are kept up to date on removal (only nodes up to two hops away change, in a couple of array operations),
+so picking the best node only costs one division per minimum-degree node: the key is (degree, average neighbour degree, order).
+"""
+
+import heapq
+import random
+
+import numpy
+
+# Rebuild the min-degree heap once it holds this many times more entries than there are nodes left (stale entries pile up)
+MAX_STALE_HEAP_FACTOR = 4
+
+
+class CSRGraph:
+    def __init__(self, edges, num_nodes=None):
+        """
+        Builds the graph from (idx1, idx2) edges over nodes 0..num_nodes-1.
+        Like networkx.Graph().add_edges_from(edges), only nodes with at least one edge are in the graph.
+        """
+        edges = numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2)
+        if num_nodes is None:
+            num_nodes = int(edges.max()) + 1 if len(edges) else 0
+        self.num_nodes = num_nodes
+
+        # networkx orders nodes by when they first show up in the edge list
+        flat = edges.ravel()
+        nodes, first_seen = numpy.unique(flat, return_index=True)
+        self.order = nodes[numpy.argsort(first_seen)]
+        # Position of each node in that order
+        self.rank = numpy.full(num_nodes, num_nodes, dtype=numpy.int64)
+        self.rank[self.order] = numpy.arange(len(self.order))
+
+        # Each undirected edge once (duplicates and self loops can't be conflicts)
+        edges = numpy.sort(edges, axis=1)
+        edges = numpy.unique(edges[edges[:, 0] != edges[:, 1]], axis=0)
+        sources = numpy.concatenate([edges[:, 0], edges[:, 1]])
+        targets = numpy.concatenate([edges[:, 1], edges[:, 0]])
+        by_source = numpy.lexsort((targets, sources))
+        counts = numpy.bincount(sources, minlength=num_nodes)
+        self.indptr = numpy.zeros(num_nodes + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=self.indptr[1:])
+        self.indices = targets[by_source].astype(numpy.int32)
+
+        self.degrees = counts.astype(numpy.int64)
+        self.alive = numpy.zeros(num_nodes, dtype=bool)
+        self.alive[self.order] = True
+        self.num_alive = len(self.order)
+        self.num_edges = len(edges)
+        # Built on the first min-degree query, so extractors that don't need it don't pay for it
+        self.degree_heap = None
+        # Same for the sum of each node's neighbours' degrees
+        self.neighbor_degree_sums = None
+        # And for the pool of nodes to sample from: node_pool[:node_pool_size] are the nodes left, node_pool_positions maps back
+        self.node_pool = None
+        self.node_pool_positions = None
+        self.node_pool_size = 0
+
+    def nodes(self):
+        """
+        Nodes still in the graph, in networkx order.
+        """
+        return self.order[self.alive[self.order]].tolist()
+
+    def random_node(self):
+        """
+        Uniformly random node still in the graph, in O(1), using the global random module (so it follows random.seed()).
+        Removed nodes are swapped out of the pool, so the pool isn't in networkx order:
+        this draws the same random numbers as random.choice(list(g.nodes())), but not the same nodes.
+        """
+        if self.node_pool is None:
+            self.node_pool = self.order[self.alive[self.order]].tolist()
+            self.node_pool_size = len(self.node_pool)
+            self.node_pool_positions = numpy.full(self.num_nodes, -1, dtype=numpy.int64)
+            self.node_pool_positions[self.node_pool] = numpy.arange(self.node_pool_size)
+        if self.node_pool_size == 0:
+            raise IndexError("Graph has no nodes")
+        return self.node_pool[random.randrange(self.node_pool_size)]
+
+    def neighbors(self, node):
+        """
+        Neighbours of a node that are still in the graph, as a NumPy array.
+        """
+        neighbors = self.indices[self.indptr[node] : self.indptr[node + 1]]
+        return neighbors[self.alive[neighbors]]
+
+    def degree(self, node=None):
+        """
+        Degree of a node, or a list of (node, degree) for all nodes in networkx order (like networkx's g.degree()).
+        """
+        if node is not None:
+            return int(self.degrees[node])
+        nodes = self.nodes()
+        return list(zip(nodes, self.degrees[nodes].tolist()))
+
+    def min_degree_nodes(self):
+        """
+        All nodes with the smallest degree, in networkx order.
+        """
+        heap = self.get_degree_heap()
+        nodes = []
+        entries = []
+        while heap:
+            degree, _, node = heap[0]
+            if not self.is_current(degree, node):
+                heapq.heappop(heap)
+            elif entries and degree > entries[0][0]:
+                break
+            else:
+                entries.append(heapq.heappop(heap))
+                nodes.append(node)
+        # They are still in the graph, put them back
+        for entry in entries:
+            heapq.heappush(heap, entry)
+        return nodes
+
+    def min_degree_node(self):
+        """
+        The first node with the smallest degree (what min(g.degree(), key=lambda x: x[1]) gives with networkx).
+        """
+        heap = self.get_degree_heap()
+        while heap:
+            degree, _, node = heap[0]
+            if self.is_current(degree, node):
+                return node
+            heapq.heappop(heap)
+        raise ValueError("Graph has no nodes")
+
+    def get_degree_heap(self):
+        if self.degree_heap is None or len(self.degree_heap) > (
+            MAX_STALE_HEAP_FACTOR * self.num_alive + len(self.order)
+        ):
+            nodes = self.order[self.alive[self.order]]
+            self.degree_heap = list(
+                zip(
+                    self.degrees[nodes].tolist(),
+                    self.rank[nodes].tolist(),
+                    nodes.tolist(),
+                )
+            )
+            heapq.heapify(self.degree_heap)
+        return self.degree_heap
+
+    def is_current(self, degree, node):
+        return self.alive[node] and self.degrees[node] == degree
+
+    def min_neighbor_degree_node(self):
+        """
+        Among the nodes with the smallest degree, the first one whose neighbours have the lowest average degree.
+        Nodes without neighbours count as average 0.
+        """
+        if self.neighbor_degree_sums is None:
+            self.neighbor_degree_sums = numpy.bincount(
+                numpy.repeat(numpy.arange(self.num_nodes), numpy.diff(self.indptr)),
+                weights=self.degrees[self.indices] * self.alive[self.indices],
+                minlength=self.num_nodes,
+            ).astype(numpy.int64)
+        nodes = numpy.asarray(self.min_degree_nodes(), dtype=numpy.int64)
+        degree = self.degrees[nodes[0]]
+        if degree == 0:
+            return int(nodes[0])
+        # Same floats as sum(degrees) / len(degrees) over the neighbours, argmin keeps the first of equal averages
+        averages = self.neighbor_degree_sums[nodes] / degree
+        return int(nodes[numpy.argmin(averages)])
+
+    def gather_neighbors(self, nodes):
+        """
+        Neighbours (still in the graph) of all the given nodes, concatenated. A node shows up once per edge to the given nodes.
+        """
+        return self.gather_edges(nodes)[1]
+
+    def gather_edges(self, nodes):
+        """
+        (sources, neighbors) arrays: one entry per edge between one of the given nodes and a node still in the graph.
+        """
+        starts = self.indptr[nodes]
+        lengths = self.indptr[nodes + 1] - starts
+        offsets = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths)
+        neighbors = self.indices[offsets + numpy.arange(len(offsets))]
+        alive = self.alive[neighbors]
+        return numpy.repeat(nodes, lengths)[alive], neighbors[alive]
+
+    def has_node(self, node):
+        return 0 <= node < self.num_nodes and bool(self.alive[node])
+
+    def remove_node(self, node):
+        if not self.has_node(node):
+            raise KeyError(f"Node {node} is not in the graph")
+        self.remove_nodes_from([node])
+
+    def remove_nodes_from(self, nodes):
+        """
+        Removes all the given nodes at once (nodes that aren't in the graph are silently skipped, like networkx).
+        Degrees and neighbour degree sums only depend on which nodes are left, so this is the same as removing them one by one.
+        """
+        nodes = numpy.unique(numpy.asarray(list(nodes), dtype=numpy.int64))
+        nodes = nodes[(nodes >= 0) & (nodes < self.num_nodes)]
+        nodes = nodes[self.alive[nodes]]
+        if len(nodes) == 0:
+            return
+        sources, neighbors = self.gather_edges(nodes)
+        self.alive[nodes] = False
+        # Edges between two removed nodes show up twice
+        outside = self.alive[neighbors]
+        self.num_edges -= (len(neighbors) + int(outside.sum())) // 2
+        sources = sources[outside]
+        neighbors = neighbors[outside]
+        if self.neighbor_degree_sums is not None:
+            # Neighbours lose the removed nodes' degrees, their neighbours see them lose one degree per removed edge
+            numpy.subtract.at(
+                self.neighbor_degree_sums, neighbors, self.degrees[sources]
+            )
+            numpy.subtract.at(
+                self.neighbor_degree_sums, self.gather_neighbors(neighbors), 1
+            )
+        numpy.subtract.at(self.degrees, neighbors, 1)
+        self.degrees[nodes] = 0
+        self.num_alive -= len(nodes)
+        if self.node_pool is not None:
+            for node in nodes.tolist():
+                # Swap with the last node in the pool and shrink the pool
+                position = self.node_pool_positions[node]
+                last = self.node_pool[self.node_pool_size - 1]
+                self.node_pool[position] = last
+                self.node_pool_positions[last] = position
+                self.node_pool_size -= 1
+        if self.degree_heap is not None:
+            # Neighbours moved down in degree, the entries they had are now stale
+            touched = numpy.unique(neighbors)
+            for entry in zip(
+                self.degrees[touched].tolist(),
+                self.rank[touched].tolist(),
+                touched.tolist(),
+            ):
+                heapq.heappush(self.degree_heap, entry)
+
+    def number_of_edges(self):
+        return self.num_edges
+
+    def number_of_nodes(self):
+        return self.num_alive
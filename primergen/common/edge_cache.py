@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+On-disk cache of conflict graph edges, so repeated runs on the same primers skip the all-pairs edit distance computation.
+
+Entries are keyed on a hash of the primer list and the thresholds, not on a file name, so a cache entry can never be
+used for a different input. Each entry is an (m, 2) int32 NumPy array saved as .npy and loaded memory-mapped.
+When the cache grows past MAX_CACHE_BYTES, the least recently used entries are deleted.
+"""
+
+import hashlib
+import os
+import shutil
+
+import numpy
+
+from primergen.common.check import (
+    MIN_EDIT_DISTANCE,
+    NUM_WORKERS,
+    PRIMER_LENGTH,
+    USE_SEED_INDEX,
+)
+from primergen.common.edge_shards import get_sharded_conflict_edges
+
+CACHE_FOLDER = "primergen/cache"
+# Total size of all cached edge files before old ones get deleted
+MAX_CACHE_BYTES = 2 * 1024**3
+# Bump if the way edges are computed or stored changes, so old entries aren't reused
+CACHE_FORMAT_VERSION = 1
+
+
+def get_edges_key(primers, limit=MIN_EDIT_DISTANCE, far=False):
+    """
+    Hash identifying the edges of a primer list: same primers in the same order + same thresholds = same key.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        f"v{CACHE_FORMAT_VERSION}-len{PRIMER_LENGTH}-ed{limit}-far{far}\n".encode()
+    )
+    for primer in primers:
+        digest.update(str(primer).encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def get_edges_path(key, cache_folder=CACHE_FOLDER):
+    return os.path.join(cache_folder, f"{key}-edges.npy")
+
+
+def get_shards_path(key, cache_folder=CACHE_FOLDER):
+    return os.path.join(cache_folder, f"{key}-shards")
+
+
+def load_edges(key, cache_folder=CACHE_FOLDER):
+    """
+    Returns the cached (m, 2) int32 edge array (memory-mapped), or None if it isn't cached.
+    """
+    path = get_edges_path(key, cache_folder)
+    if not os.path.exists(path):
+        return None
+    # Mark as recently used for eviction
+    os.utime(path)
+    return numpy.load(path, mmap_mode="r")
+
+
+def save_edges(key, edges, cache_folder=CACHE_FOLDER, max_bytes=MAX_CACHE_BYTES):
+    """
+    Stores edges (list of (idx1, idx2) or an (m, 2) array) in the cache, then evicts old entries if it's too big.
+    """
+    os.makedirs(cache_folder, exist_ok=True)
+    path = get_edges_path(key, cache_folder)
+    # Write to a temporary file first so a killed run never leaves half an entry behind
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        numpy.save(f, edges_to_array(edges))
+    os.replace(tmp_path, path)
+    evict(cache_folder, max_bytes, keep=path)
+
+
+def evict(
+    cache_folder=CACHE_FOLDER, max_bytes=MAX_CACHE_BYTES, keep=None, suffix="-edges.npy"
+):
+    """
+    Deletes least recently used entries (files ending in /suffix/) until they take at most max_bytes (never deletes /keep/).
+    """
+    entries = []
+    for name in os.listdir(cache_folder):
+        if name.endswith(suffix):
+            path = os.path.join(cache_folder, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total_bytes = sum(size for (_, size, _) in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        if path == keep:
+            continue
+        print(f"Cache is over {max_bytes} bytes, deleting {path}")
+        os.remove(path)
+        total_bytes -= size
+
+
+def edges_to_array(edges):
+    return numpy.asarray(edges, dtype=numpy.int32).reshape(-1, 2)
+
+
+def get_cached_conflict_edges(
+    primers,
+    limit=MIN_EDIT_DISTANCE,
+    workers=NUM_WORKERS,
+    far=False,
+    cache_folder=CACHE_FOLDER,
+    use_seed_index=USE_SEED_INDEX,
+):
+    """
+    Same edges as conflict_graph.get_conflict_edges, as an (m, 2) int32 array, computed at most once per input.
+    Edges are computed tile by tile into a shard folder in the cache (see edge_shards.py), so an interrupted run resumes
+    where it stopped. The shards are replaced by a single cache entry once they're all done.
+    """
+    key = get_edges_key(primers, limit=limit, far=far)
+    edges = load_edges(key, cache_folder)
+    if edges is not None:
+        print(
+            f"Loaded {len(edges)} edges from cache {get_edges_path(key, cache_folder)}"
+        )
+        return edges
+    shard_folder = get_shards_path(key, cache_folder)
+    edges = get_sharded_conflict_edges(
+        primers,
+        shard_folder,
+        limit=limit,
+        workers=workers,
+        far=far,
+        use_seed_index=use_seed_index,
+    )
+    save_edges(key, edges, cache_folder)
+    shutil.rmtree(shard_folder)
+    return edges
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+
+"""
+Resumable all-pairs conflict edge computation, for inputs where building the conflict graph takes hours.
+
+The upper triangle of the pair matrix is cut into TILE_SIZE x TILE_SIZE tiles (an i-block of rows x a j-block of columns, i <= j).
+Each finished tile is saved as its own shard file in a shard folder, next to a manifest describing the job, so:
+- a killed or interrupted run skips the tiles that are already done when it's started again,
+- several processes or machines sharing the folder can each compute a part of the tiles (part / parts).
+Once every tile is done, the shards assemble into the same (m, 2) edge array as conflict_graph.get_conflict_edges.
+"""
+
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from primergen.common.check import (
+    MIN_EDIT_DISTANCE,
+    NUM_WORKERS,
+    USE_SEED_INDEX,
+    get_edit_distance_with_limit,
+)
+from primergen.common.conflict_graph import pack_if_possible
+from primergen.common.edit_kernel import edit_distances_block
+from primergen.common.primer_store import PrimerStore, get_primers_hash
+from primergen.common.seed_index import SeedIndex
+
+# Rows and columns per tile: 2048 x 2048 = ~4M pairs, ~40 MB of kernel output per tile
+TILE_SIZE = 2048
+MANIFEST_FILE = "manifest.json"
+# Bump if the way tiles are computed or stored changes, so old shards aren't reused
+SHARD_FORMAT_VERSION = 2
+
+# Primers (and packed primers) for the worker processes, set once per worker by the pool initializer
+_worker_primers = None
+_worker_packed = None
+
+
+def get_tiles(n, tile_size=TILE_SIZE):
+    """
+    (i, j) block indices of every tile in the upper triangle, i <= j, in row-major order.
+    """
+    blocks = math.ceil(n / tile_size)
+    return [(i, j) for i in range(blocks) for j in range(i, blocks)]
+
+
+def get_shard_path(shard_folder, tile):
+    i, j = tile
+    return os.path.join(shard_folder, f"tile-{i}-{j}.npy")
+
+
+def open_shard_folder(
+    shard_folder, primers, limit=MIN_EDIT_DISTANCE, far=False, tile_size=TILE_SIZE
+):
+    """
+    Creates the shard folder and its manifest, or checks that an existing one is for the same job
+    (same primers in the same order, same thresholds and tiles).
+    """
+    num_primers = len(primers)
+    manifest = {
+        "version": SHARD_FORMAT_VERSION,
+        "num_primers": num_primers,
+        "primers_hash": get_primers_hash(primers),
+        "limit": limit,
+        "far": far,
+        "tile_size": tile_size,
+        "num_tiles": len(get_tiles(num_primers, tile_size)),
+    }
+    os.makedirs(shard_folder, exist_ok=True)
+    path = os.path.join(shard_folder, MANIFEST_FILE)
+    if os.path.exists(path):
+        existing = read_manifest(shard_folder)
+        if existing != manifest:
+            raise ValueError(
+                f"{shard_folder} holds shards for a different job: {existing}, expected {manifest}"
+            )
+        return manifest
+    # Several processes may create it at once: all write the same thing, atomically
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def read_manifest(shard_folder):
+    with open(os.path.join(shard_folder, MANIFEST_FILE), "r") as f:
+        return json.load(f)
+
+
+def get_missing_tiles(shard_folder, tiles):
+    return [
+        tile for tile in tiles if not os.path.exists(get_shard_path(shard_folder, tile))
+    ]
+
+
+def compute_edge_shards(
+    primers,
+    shard_folder,
+    limit=MIN_EDIT_DISTANCE,
+    workers=NUM_WORKERS,
+    far=False,
+    tile_size=TILE_SIZE,
+    part=0,
+    parts=1,
+    use_seed_index=USE_SEED_INDEX,
+):
+    """
+    Computes every tile of this /part/ (tiles are dealt round-robin to /parts/ parts) that isn't in /shard_folder/ yet.
+    Each tile is saved as soon as it's done, so interrupting loses at most the tiles in progress.
+    use_seed_index=True only computes edit distances for pairs a SeedIndex over the tile's columns can't rule out (same edges).
+    Returns the number of tiles (of all parts) still missing.
+    """
+    if not isinstance(primers, PrimerStore):
+        primers = list(primers)
+    manifest = open_shard_folder(shard_folder, primers, limit, far, tile_size)
+    tiles = get_tiles(len(primers), tile_size)
+    todo = get_missing_tiles(shard_folder, tiles[part::parts])
+    print(
+        f"Conflict edge shards in {shard_folder}: {manifest['num_tiles'] - len(get_missing_tiles(shard_folder, tiles))} of {manifest['num_tiles']} tiles done, computing {len(todo)}"
+    )
+    # Wall clock, since the work happens in other processes
+    start_time = time.perf_counter()
+    if workers <= 1 or len(todo) <= 1:
+        packed = pack_if_possible(primers)
+        results = (
+            _compute_tile(
+                primers,
+                packed,
+                tile,
+                tile_size,
+                limit,
+                far,
+                shard_folder,
+                use_seed_index,
+            )
+            for tile in todo
+        )
+        _report_tiles(todo, results, start_time, shard_folder)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(primers,)
+        )
+        try:
+            results = executor.map(
+                _worker_compute_tile,
+                todo,
+                [tile_size] * len(todo),
+                [limit] * len(todo),
+                [far] * len(todo),
+                [shard_folder] * len(todo),
+                [use_seed_index] * len(todo),
+            )
+            _report_tiles(todo, results, start_time, shard_folder)
+        finally:
+            executor.shutdown(cancel_futures=True)
+    return len(get_missing_tiles(shard_folder, tiles))
+
+
+def load_sharded_edges(shard_folder):
+    """
+    Assembles the shards into one (m, 2) int32 edge array, in the same order as get_conflict_edges.
+    Raises ValueError if some tiles aren't done yet.
+    """
+    manifest = read_manifest(shard_folder)
+    tiles = get_tiles(manifest["num_primers"], manifest["tile_size"])
+    missing = get_missing_tiles(shard_folder, tiles)
+    if missing:
+        raise ValueError(
+            f"{shard_folder} is missing {len(missing)} of {len(tiles)} tiles, run compute_edge_shards first"
+        )
+    edges = numpy.concatenate(
+        [numpy.zeros((0, 2), dtype=numpy.int32)]
+        + [numpy.load(get_shard_path(shard_folder, tile)) for tile in tiles]
+    )
+    return edges[numpy.lexsort((edges[:, 1], edges[:, 0]))]
+
+
+def get_sharded_conflict_edges(
+    primers,
+    shard_folder,
+    limit=MIN_EDIT_DISTANCE,
+    workers=NUM_WORKERS,
+    far=False,
+    tile_size=TILE_SIZE,
+    use_seed_index=USE_SEED_INDEX,
+):
+    """
+    Same edges as conflict_graph.get_conflict_edges, as an (m, 2) int32 array, resuming from the shards in /shard_folder/.
+    """
+    compute_edge_shards(
+        primers,
+        shard_folder,
+        limit,
+        workers,
+        far,
+        tile_size,
+        use_seed_index=use_seed_index,
+    )
+    return load_sharded_edges(shard_folder)
+
+
+def _conflict_edges_for_tile(
+    primers, packed, tile, tile_size, limit, far, use_seed_index=False
+):
+    i, j = tile
+    rows = numpy.arange(i * tile_size, min((i + 1) * tile_size, len(primers)))
+    cols = numpy.arange(j * tile_size, min((j + 1) * tile_size, len(primers)))
+    # Only pairs above the diagonal (matters for tiles on the diagonal)
+    upper = cols[None, :] > rows[:, None]
+    if packed is not None and not use_seed_index:
+        length = len(primers[0])
+        too_close = (
+            edit_distances_block(
+                packed[rows[0] : rows[-1] + 1],
+                packed[cols[0] : cols[-1] + 1],
+                length=length,
+                limit=limit,
+            )
+            < limit
+        )
+    else:
+        too_close = numpy.zeros(upper.shape, dtype=bool)
+        if use_seed_index:
+            # Pairs the index doesn't return are definitely far enough apart
+            seed_index = SeedIndex([primers[col] for col in cols.tolist()], limit=limit)
+            pairs = [
+                (row, col)
+                for row in range(len(rows))
+                for col in seed_index.candidates(primers[rows[row]])
+                if upper[row, col]
+            ]
+        else:
+            pairs = zip(*numpy.nonzero(upper))
+        for row, col in pairs:
+            too_close[row, col] = (
+                get_edit_distance_with_limit(
+                    primers[rows[row]], primers[cols[col]], limit=limit
+                )
+                < limit
+            )
+    # Conflict graph: keep pairs that are too close (or far enough apart, for the complement)
+    tile_rows, tile_cols = numpy.nonzero((~too_close if far else too_close) & upper)
+    return numpy.stack([rows[tile_rows], cols[tile_cols]], axis=1).astype(numpy.int32)
+
+
+def _compute_tile(
+    primers, packed, tile, tile_size, limit, far, shard_folder, use_seed_index=False
+):
+    edges = _conflict_edges_for_tile(
+        primers, packed, tile, tile_size, limit, far, use_seed_index
+    )
+    path = get_shard_path(shard_folder, tile)
+    # Write to a temporary file first so a killed run never leaves half a shard behind
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        numpy.save(f, edges)
+    os.replace(tmp_path, path)
+    return len(edges)
+
+
+def _report_tiles(tiles, results, start_time, shard_folder):
+    try:
+        for done, (tile, num_edges) in enumerate(zip(tiles, results), start=1):
+            elapsed = time.perf_counter() - start_time
+            eta = elapsed / done * (len(tiles) - done)
+            print(
+                f"Computed tile {tile}\t({done} of {len(tiles)})\tEdges: {num_edges}\tETA: {int(eta / 60)} m {int(eta % 60)} s"
+            )
+    except KeyboardInterrupt:
+        print(
+            f"Interrupted: finished tiles are kept in {shard_folder}, run again to resume"
+        )
+        raise
+
+
+def _init_worker(primers):
+    global _worker_primers, _worker_packed
+    _worker_primers = primers
+    _worker_packed = pack_if_possible(primers)
+
+
+def _worker_compute_tile(tile, tile_size, limit, far, shard_folder, use_seed_index):
+    return _compute_tile(
+        _worker_primers,
+        _worker_packed,
+        tile,
+        tile_size,
+        limit,
+        far,
+        shard_folder,
+        use_seed_index,
+    )
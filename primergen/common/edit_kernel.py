@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+"""
+Batched edit distance between packed primers (see packed.py), for comparing one primer against many, or a block against a block.
+
+Uses Myers' bit-vector algorithm (Hyyro's formulation for global edit distance):
+the whole column of the DP table for a primer of up to 64 nts fits in one machine word, so each text nucleotide is a handful of bit ops.
+Here the bit ops run on NumPy uint64 arrays, one element per pair of primers, so a 20-mer vs N primers is ~20 x 15 array operations.
+If numba is installed, the same algorithm runs as a compiled loop instead (no temporary arrays).
+
+Distances are capped like polyleven's levenshtein(p1, p2, limit): anything above /limit/ is returned as limit + 1.
+get_edit_distance_with_limit in check.py stays the scalar version of this.
+"""
+
+import numpy
+
+from primergen.common.check import MIN_EDIT_DISTANCE, PRIMER_LENGTH
+from primergen.common.packed import unpack_codes
+
+try:
+    import numba
+
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Use the numba kernel when it's available
+USE_NUMBA = HAVE_NUMBA
+# Pairs per NumPy tile: small enough for the temporary arrays to stay in cache
+NUMPY_TILE_PAIRS = 32768
+
+_ONE = numpy.uint64(1)
+
+
+def edit_distances_one_to_many(
+    primer, packed, length=PRIMER_LENGTH, limit=MIN_EDIT_DISTANCE
+):
+    """
+    Edit distances between one packed primer and an (n,) array of packed primers, all /length/ nts long.
+    Returns an (n,) int array, capped at limit + 1.
+    """
+    packed_primer = numpy.asarray([primer], dtype=numpy.uint64)
+    return edit_distances_block(packed_primer, packed, length=length, limit=limit)[0]
+
+
+def edit_distances_block(
+    packed_a, packed_b, length=PRIMER_LENGTH, limit=MIN_EDIT_DISTANCE
+):
+    """
+    Edit distances between every primer in packed_a and every primer in packed_b (all /length/ nts long).
+    Returns an (len(packed_a), len(packed_b)) int array, capped at limit + 1.
+    """
+    peq_a = get_peq(packed_a, length)
+    codes_b = unpack_codes(packed_b, length)
+    if USE_NUMBA:
+        scores = _myers_block_numba(peq_a, codes_b, length)
+    else:
+        scores = numpy.empty((len(peq_a), len(codes_b)), dtype=numpy.int64)
+        cols = max(1, min(len(codes_b), NUMPY_TILE_PAIRS))
+        rows = max(1, NUMPY_TILE_PAIRS // cols)
+        for row in range(0, len(peq_a), rows):
+            for col in range(0, len(codes_b), cols):
+                scores[row : row + rows, col : col + cols] = _myers_block_numpy(
+                    peq_a[row : row + rows], codes_b[col : col + cols], length
+                )
+    return numpy.minimum(scores, limit + 1)
+
+
+def conflicts_block(packed_a, packed_b, length=PRIMER_LENGTH, limit=MIN_EDIT_DISTANCE):
+    """
+    Boolean (len(packed_a), len(packed_b)) array, True where the two primers are less than /limit/ edit distance apart.
+    """
+    return edit_distances_block(packed_a, packed_b, length=length, limit=limit) < limit
+
+
+def get_peq(packed, length):
+    """
+    Pattern match masks for Myers' algorithm: (n, 4) uint64 array, bit i of peq[k, c] is set if primer k has nucleotide c at position i.
+    """
+    codes = unpack_codes(packed, length)
+    bits = _ONE << numpy.arange(length, dtype=numpy.uint64)
+    peq = numpy.zeros((len(codes), 4), dtype=numpy.uint64)
+    for code in range(4):
+        peq[:, code] = numpy.bitwise_or.reduce(
+            numpy.where(codes == code, bits, numpy.uint64(0)),
+            axis=1,
+            dtype=numpy.uint64,
+        )
+    return peq
+
+
+def _myers_block_numpy(peq_a, codes_b, length):
+    # Bits above /length/ hold garbage, but carries and shifts only move bits upwards, so they never reach the low bits
+    shift = numpy.uint64(length - 1)
+    pv = numpy.full((len(peq_a), len(codes_b)), numpy.uint64(2**64 - 1))
+    mv = numpy.zeros_like(pv)
+    scores = numpy.full_like(pv, length)
+    xh = numpy.empty_like(pv)
+    ph = numpy.empty_like(pv)
+    mh = numpy.empty_like(pv)
+    for pos in range(codes_b.shape[1]):
+        # Match mask for each pattern against nucleotide /pos/ of each text
+        eq = peq_a.take(codes_b[:, pos], axis=1)
+        # Xh = (((Eq & Pv) + Pv) ^ Pv) | Eq
+        numpy.bitwise_and(eq, pv, out=xh)
+        xh += pv
+        xh ^= pv
+        xh |= eq
+        # Xv = Eq | Mv (reuses eq)
+        eq |= mv
+        # Ph = Mv | ~(Xh | Pv), Mh = Pv & Xh
+        numpy.bitwise_or(xh, pv, out=ph)
+        numpy.invert(ph, out=ph)
+        ph |= mv
+        numpy.bitwise_and(pv, xh, out=mh)
+        # Score of the last row goes up/down with the top bits
+        scores += (ph >> shift) & _ONE
+        scores -= (mh >> shift) & _ONE
+        # Global distance: the top row of the DP table goes up by 1 every column
+        ph <<= _ONE
+        ph |= _ONE
+        mh <<= _ONE
+        # Pv = Mh | ~(Xv | Ph), Mv = Ph & Xv
+        numpy.bitwise_or(eq, ph, out=pv)
+        numpy.invert(pv, out=pv)
+        pv |= mh
+        numpy.bitwise_and(ph, eq, out=mv)
+    return scores.astype(numpy.int64)
+
+
+if HAVE_NUMBA:
+
+    @numba.njit(cache=True)
+    def _myers_block_numba(peq_a, codes_b, length):
+        num_a, num_b = peq_a.shape[0], codes_b.shape[0]
+        one = numpy.uint64(1)
+        high_bit = one << numpy.uint64(length - 1)
+        scores = numpy.empty((num_a, num_b), dtype=numpy.int64)
+        for a in range(num_a):
+            for b in range(num_b):
+                pv = ~numpy.uint64(0)
+                mv = numpy.uint64(0)
+                score = length
+                for pos in range(codes_b.shape[1]):
+                    eq = peq_a[a, codes_b[b, pos]]
+                    xv = eq | mv
+                    xh = (((eq & pv) + pv) ^ pv) | eq
+                    ph = mv | ~(xh | pv)
+                    mh = pv & xh
+                    if ph & high_bit:
+                        score += 1
+                    elif mh & high_bit:
+                        score -= 1
+                    ph = (ph << one) | one
+                    mh = mh << one
+                    pv = mh | ~(xv | ph)
+                    mv = ph & xv
+                scores[a, b] = score
+        return scores
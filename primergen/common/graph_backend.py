@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Adjacency lists of the conflict graph on a pluggable graph backend, and independent set algorithms over them.
+
+Graphs are given as an (m, 2) edge array (see edge_cache.py) over nodes 0..num_nodes-1.
+The backend only decides how the adjacency lists are built:
+- "igraph" (default when installed): from a C igraph.Graph, built straight from the edge array,
+- "networkx": from a networkx graph.
+Both give the same neighbor sets, and the algorithms below run the same Python code on them,
+so results don't depend on which backend is installed.
+"""
+
+import networkx as nx
+
+try:
+    import igraph
+
+    HAVE_IGRAPH = True
+except ImportError:
+    HAVE_IGRAPH = False
+
+# Which backend the extractors use
+GRAPH_BACKEND = "igraph" if HAVE_IGRAPH else "networkx"
+
+
+def build_igraph(edges, num_nodes):
+    graph = igraph.Graph(n=num_nodes)
+    graph.add_edges(edges.tolist())
+    return graph
+
+
+def get_adjacency(edges, num_nodes, backend=GRAPH_BACKEND):
+    """
+    List of neighbor sets, one per node.
+    """
+    if backend == "igraph":
+        return [set(nbrs) for nbrs in build_igraph(edges, num_nodes).get_adjlist()]
+    g = nx.Graph()
+    g.add_nodes_from(range(num_nodes))
+    g.add_edges_from(edges.tolist())
+    return [set(g.adj[node]) for node in range(num_nodes)]
+
+
+def approx_maximum_independent_set(edges, backend=GRAPH_BACKEND):
+    """
+    Approximate (n / (log n)^2) maximum independent set of the graph made of /edges/, as a sorted list of nodes:
+    Boppana and Halldorsson's clique removal (networkx's algorithm, without its recursion).
+    Nodes without any edges aren't part of the graph, so they're left out.
+    """
+    if not len(edges):
+        return []
+    nodes = set(edges.ravel().tolist())
+    adjacency = get_adjacency(edges, max(nodes) + 1, backend)
+    return _clique_removal(adjacency, nodes)
+
+
+def _non_neighbors(adjacency, node, nodes):
+    result = nodes - adjacency[node]
+    result.discard(node)
+    return result
+
+
+def _clique_removal(adjacency, nodes):
+    """
+    networkx's clique_removal, over neighbor sets: keep taking out the clique found by ramsey_R2,
+    the largest independent set ramsey_R2 found along the way wins.
+    """
+    nodes = set(nodes)
+    clique, best = _ramsey_r2(adjacency, nodes)
+    while nodes:
+        nodes -= clique
+        clique, independent_set = _ramsey_r2(adjacency, nodes)
+        if len(independent_set) > len(best):
+            best = independent_set
+    return sorted(best)
+
+
+def _ramsey_r2(adjacency, nodes):
+    """
+    networkx's ramsey_R2 without recursion: returns a clique and an independent set (as sets) of the subgraph on /nodes/.
+    Picks the smallest node at each step, so the result doesn't depend on set order.
+    """
+    # Sets being built are (size, node, rest) linked lists, so adding a node to one of the two results is O(1)
+    empty = (0, None, None)
+    results = []
+    work = [nodes]
+    while work:
+        item = work.pop()
+        if isinstance(item, int):
+            # Both halves for this node are done: it extends the clique of its neighbors and the independent set of the rest
+            clique_rest, independent_rest = results.pop()
+            clique_nbrs, independent_nbrs = results.pop()
+            clique_nbrs = (clique_nbrs[0] + 1, item, clique_nbrs)
+            independent_rest = (independent_rest[0] + 1, item, independent_rest)
+            results.append(
+                (
+                    max(clique_nbrs, clique_rest, key=lambda s: s[0]),
+                    max(independent_nbrs, independent_rest, key=lambda s: s[0]),
+                )
+            )
+        elif not item:
+            results.append((empty, empty))
+        else:
+            node = min(item)
+            work.append(node)
+            # Popped first: neighbors, then the rest
+            work.append(_non_neighbors(adjacency, node, item))
+            work.append(item & adjacency[node])
+    clique, independent_set = results.pop()
+    return _linked_to_set(clique), _linked_to_set(independent_set)
+
+
+def _linked_to_set(linked):
+    result = set()
+    while linked[1] is not None:
+        result.add(linked[1])
+        linked = linked[2]
+    return result
@@ -1,4 +1,7 @@
 #!/usr/bin/env python3
+import numpy
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 
 
 def get_no_conflict_primers(g, initial_primers):
@@ -10,7 +13,7 @@ def get_no_conflict_primers(g, initial_primers):
     3. Add each primer in R into the valid primer set
     """
     print("Finding primers with 0 conflicts with rest of set.")
-    all_nodes_in_graph = set(g.nodes)
+    all_nodes_in_graph = set(g.nodes())
     all_possible_nodes = set(range(0, len(initial_primers)))
     valid_nodes_with_no_conflicts = list(
         map(
@@ -20,3 +23,40 @@ def get_no_conflict_primers(g, initial_primers):
     )
     print(f"{len(valid_nodes_with_no_conflicts)} no-conflict primers found.")
     return valid_nodes_with_no_conflicts
+
+
+def split_into_components(edges, num_nodes):
+    """
+    Connected components of the graph made of /edges/ over nodes 0..num_nodes-1, biggest first.
+    Returns a list of (nodes, local_edges): the component's nodes (sorted), and its edges as positions in /nodes/.
+    Nodes without edges are components of their own.
+    """
+    edges = numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2)
+    adjacency = coo_matrix(
+        (numpy.ones(len(edges), dtype=numpy.int8), (edges[:, 0], edges[:, 1])),
+        shape=(num_nodes, num_nodes),
+    )
+    num_components, labels = connected_components(adjacency, directed=False)
+    # Nodes and edges grouped by component
+    node_order = numpy.argsort(labels, kind="stable")
+    node_bounds = numpy.searchsorted(
+        labels[node_order], numpy.arange(num_components + 1)
+    )
+    edge_labels = labels[edges[:, 0]]
+    edge_order = numpy.argsort(edge_labels, kind="stable")
+    edge_bounds = numpy.searchsorted(
+        edge_labels[edge_order], numpy.arange(num_components + 1)
+    )
+    # Position of each node within its component
+    positions = numpy.empty(num_nodes, dtype=numpy.int64)
+    positions[node_order] = numpy.arange(num_nodes) - node_bounds[labels[node_order]]
+
+    components = []
+    for label in range(num_components):
+        nodes = node_order[node_bounds[label] : node_bounds[label + 1]]
+        local_edges = positions[
+            edges[edge_order[edge_bounds[label] : edge_bounds[label + 1]]]
+        ]
+        components.append((nodes, local_edges.astype(numpy.int32)))
+    components.sort(key=lambda component: -len(component[0]))
+    return components
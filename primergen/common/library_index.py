@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Index over a growing library of accepted primers, answering "does this candidate conflict with anything in the library?"
+
+Metric trees (BK-trees) don't help here: library primers sit 10-14 edits apart and the search radius is 7,
+so almost no subtree can be ruled out. What does help is checking the most likely conflicts first.
+Every primer is indexed by its q-grams and their positions. A candidate's library primers are ranked by how many
+q-grams they share near the same position, and distances are computed in that order.
+A conflicting primer usually comes up within the first few checks, so rejecting a candidate takes a handful of
+levenshtein calls instead of a scan over the whole library.
+Answers are exact: primers that share no q-gram with the candidate are still checked (last), before accepting it.
+"""
+
+from collections import Counter, defaultdict
+
+from primergen.common.check import MIN_EDIT_DISTANCE, get_edit_distance_with_limit
+
+# Length of the q-grams used to rank library primers
+GRAM_LENGTH = 4
+# How far (in positions) a shared q-gram may be shifted and still count
+GRAM_WINDOW = 2
+
+
+class LibraryIndex:
+    def __init__(
+        self,
+        primers=(),
+        limit=MIN_EDIT_DISTANCE,
+        gram_length=GRAM_LENGTH,
+        window=GRAM_WINDOW,
+    ):
+        """
+        Primers are in conflict if they are less than /limit/ edit distance apart.
+        """
+        self.limit = limit
+        self.gram_length = gram_length
+        self.window = window
+        self.primers = []
+        # (q-gram, position) -> indices of library primers with that q-gram at that position
+        self.postings = defaultdict(list)
+        # Number of edit distances computed so far, to see how well the ranking works
+        self.distance_evaluations = 0
+        for primer in primers:
+            self.add(primer)
+
+    def __len__(self):
+        return len(self.primers)
+
+    def add(self, primer):
+        """
+        Adds a primer to the library, returns its index.
+        """
+        idx = len(self.primers)
+        self.primers.append(primer)
+        for pos in range(len(primer) - self.gram_length + 1):
+            self.postings[(primer[pos : pos + self.gram_length], pos)].append(idx)
+        return idx
+
+    def ranked(self, candidate):
+        """
+        Returns the indices of library primers sharing q-grams with the candidate, most shared q-grams first.
+        """
+        shared = Counter()
+        for pos in range(len(candidate) - self.gram_length + 1):
+            gram = candidate[pos : pos + self.gram_length]
+            for other_pos in range(pos - self.window, pos + self.window + 1):
+                shared.update(self.postings.get((gram, other_pos), ()))
+        return [idx for idx, _ in shared.most_common()]
+
+    def conflicts(self, candidate, radius=None, first_only=False):
+        """
+        Returns the library primers within /radius/ edit distance of the candidate (default: limit - 1, i.e. too close).
+        first_only=True stops at the first one found.
+        """
+        if radius is None:
+            radius = self.limit - 1
+        found = []
+        for idx in self.iter_check_order(candidate):
+            self.distance_evaluations += 1
+            other = self.primers[idx]
+            if (
+                get_edit_distance_with_limit(candidate, other, limit=radius + 1)
+                <= radius
+            ):
+                found.append(other)
+                if first_only:
+                    break
+        return found
+
+    def has_conflict(self, candidate, radius=None):
+        """
+        True if any library primer is within /radius/ edit distance of the candidate.
+        """
+        return len(self.conflicts(candidate, radius=radius, first_only=True)) > 0
+
+    def iter_check_order(self, candidate):
+        """
+        All library indices: likely conflicts first, then everything that shares no q-gram with the candidate.
+        """
+        ranked = self.ranked(candidate)
+        yield from ranked
+        seen = set(ranked)
+        for idx in range(len(self.primers)):
+            if idx not in seen:
+                yield idx
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+"""
+Exact (given enough time) maximum independent set of the conflict graph, with a wall-clock budget.
+
+1. Kernelization: rules that shrink the graph without losing optimality, applied until none applies:
+   - degree 0 and degree 1 nodes are always in some maximum independent set: take them, drop their neighbor,
+   - dominance: if N[v] is a subset of N[u] for neighbors u and v, some maximum independent set avoids u: drop u,
+   - degree 2 folding: v with non-adjacent neighbors u and w is merged with them into one node (MIS size goes down by exactly 1).
+2. What's left is split into connected components, solved separately (smallest first).
+3. Each component starts from the min-degree greedy solution (DeLOB-mindegree) and is improved by branch-and-reduce:
+   branch on the node with the most neighbors (leave it out / take it), re-apply the rules on both sides,
+   and prune a branch when a greedy cover of what's left by cliques (at most one node per clique) can't beat the best so far.
+
+When the budget runs out, the best solution found so far is returned with the upper bound proven so far
+(the largest bound among the branches not explored yet), so the gap says how far from optimal the library can be.
+A gap of 0 means the library is optimal.
+"""
+
+import itertools
+import time
+
+import numpy
+
+from primergen.common.csr_graph import CSRGraph
+
+# Default wall-clock budget for the whole solve (None = no limit)
+EXACT_MIS_TIME_BUDGET_SEC = 10 * 60
+
+
+class MisResult:
+    def __init__(self, nodes, upper_bound, elapsed_sec):
+        # Nodes of the independent set
+        self.nodes = nodes
+        # No independent set of the graph is bigger than this
+        self.upper_bound = upper_bound
+        self.elapsed_sec = elapsed_sec
+
+    def gap(self):
+        return self.upper_bound - len(self.nodes)
+
+    def is_optimal(self):
+        return self.gap() == 0
+
+
+def solve_mis(adjacency, time_budget_sec=EXACT_MIS_TIME_BUDGET_SEC, verbose=True):
+    """
+    Maximum independent set of the graph given as a list of neighbor sets (node i's neighbors are adjacency[i]).
+    Returns a MisResult, optimal unless the time budget ran out first.
+    verbose=False skips the progress output (e.g., for many tiny graphs).
+    """
+    start_time = time.perf_counter()
+    deadline = None if time_budget_sec is None else start_time + time_budget_sec
+
+    # New node ids for degree 2 folds, unique across every branch
+    new_nodes = itertools.count(len(adjacency))
+    kernel = _Kernel(
+        {node: set(nbrs) for node, nbrs in enumerate(adjacency)}, new_nodes
+    )
+    kernel.reduce()
+    if verbose:
+        print(
+            f"Kernel: {len(kernel.adj)} of {len(adjacency)} nodes left, {len(kernel.taken)} taken, {len(kernel.folds)} degree 2 folds"
+        )
+
+    solution = list(kernel.taken)
+    upper_bound = kernel.size()
+    components = sorted(_get_components(kernel.adj), key=len)
+    for num, component in enumerate(components, start=1):
+        nodes, bound, finished = _solve_component(
+            kernel.adj, component, new_nodes, deadline
+        )
+        solution.extend(nodes)
+        upper_bound += bound
+        if verbose:
+            print(
+                f"Component {num} of {len(components)}: {len(component)} nodes, independent set of {len(nodes)}"
+                + ("" if finished else f", at most {bound} (out of time)")
+            )
+
+    return MisResult(
+        kernel.unfold(solution), upper_bound, time.perf_counter() - start_time
+    )
+
+
+class _Kernel:
+    """
+    A graph (dict of neighbor sets) that the reduction rules and branching decisions shrink,
+    with the nodes taken so far and the folds needed to map a solution back.
+    """
+
+    def __init__(self, adj, new_nodes, taken=(), folds=()):
+        self.adj = adj
+        self.new_nodes = new_nodes
+        # Nodes in the solution
+        self.taken = list(taken)
+        # (merged node, v, u, w) for each degree 2 fold, in the order they were done
+        self.folds = list(folds)
+
+    def copy(self):
+        return _Kernel(
+            {node: set(nbrs) for node, nbrs in self.adj.items()},
+            self.new_nodes,
+            self.taken,
+            self.folds,
+        )
+
+    def size(self):
+        """
+        Size of the solution so far, once unfolded (each fold adds one node).
+        """
+        return len(self.taken) + len(self.folds)
+
+    def remove(self, node):
+        for nbr in self.adj.pop(node):
+            self.adj[nbr].discard(node)
+
+    def take(self, node):
+        self.taken.append(node)
+        for nbr in list(self.adj[node]):
+            self.remove(nbr)
+        self.remove(node)
+
+    def fold(self, node):
+        u, w = self.adj[node]
+        merged = next(self.new_nodes)
+        nbrs = (self.adj[u] | self.adj[w]) - {node, u, w}
+        for old in (node, u, w):
+            self.remove(old)
+        self.adj[merged] = nbrs
+        for nbr in nbrs:
+            self.adj[nbr].add(merged)
+        self.folds.append((merged, node, u, w))
+        return merged
+
+    def reduce(self, todo=None):
+        """
+        Applies the rules until none applies, starting from the nodes in /todo/ (None = all of them).
+        """
+        todo = set(self.adj) if todo is None else todo & self.adj.keys()
+        while todo:
+            node = todo.pop()
+            if node not in self.adj:
+                continue
+            nbrs = self.adj[node]
+            degree = len(nbrs)
+            if degree <= 1:
+                # Whatever loses an edge may now reduce too
+                touched = set().union(*(self.adj[nbr] for nbr in nbrs))
+                self.take(node)
+                todo |= touched & self.adj.keys()
+                continue
+            dominated = [
+                nbr
+                for nbr in nbrs
+                if len(self.adj[nbr]) >= degree and nbrs - {nbr} <= self.adj[nbr]
+            ]
+            if dominated:
+                for nbr in dominated:
+                    todo |= self.adj[nbr]
+                    self.remove(nbr)
+                todo.add(node)
+                continue
+            if degree == 2:
+                u, w = nbrs
+                if w not in self.adj[u]:
+                    merged = self.fold(node)
+                    todo |= self.adj[merged] | {merged}
+
+    def clique_cover_size(self):
+        """
+        Number of cliques in a greedy cover of the graph: an upper bound on its independent set size.
+        """
+        cliques = []
+        for node in sorted(self.adj, key=lambda node: -len(self.adj[node])):
+            nbrs = self.adj[node]
+            for clique in cliques:
+                # Joins the first clique it's adjacent to all of
+                if clique <= nbrs:
+                    clique.add(node)
+                    break
+            else:
+                cliques.append({node})
+        return len(cliques)
+
+    def unfold(self, solution):
+        """
+        Solution of the reduced graph (plus taken nodes) -> solution of the graph before folding.
+        """
+        solution = set(solution)
+        for merged, node, u, w in reversed(self.folds):
+            if merged in solution:
+                solution.remove(merged)
+                solution |= {u, w}
+            else:
+                solution.add(node)
+        return sorted(solution)
+
+
+def _get_components(adj):
+    seen = set()
+    components = []
+    for start in adj:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = [start]
+        frontier = [start]
+        while frontier:
+            node = frontier.pop()
+            for nbr in adj[node]:
+                if nbr not in seen:
+                    seen.add(nbr)
+                    component.append(nbr)
+                    frontier.append(nbr)
+        components.append(component)
+    return components
+
+
+def _solve_component(adj, component, new_nodes, deadline):
+    """
+    Returns (independent set, upper bound, finished) for one connected component.
+    """
+    root = _Kernel({node: set(adj[node]) for node in component}, new_nodes)
+    best = _greedy_min_degree(root.adj)
+    # Branches left to explore, with an upper bound on what they can reach (their parent's)
+    stack = [(root, len(component))]
+    while stack:
+        if deadline is not None and time.perf_counter() > deadline:
+            upper_bound = max(len(best), max(bound for (_, bound) in stack))
+            return best, upper_bound, False
+        kernel, _ = stack.pop()
+        if kernel.adj:
+            bound = kernel.size() + kernel.clique_cover_size()
+            if bound <= len(best):
+                continue
+            node = max(kernel.adj, key=lambda node: len(kernel.adj[node]))
+            # Take it (explored second)
+            take = kernel.copy()
+            nbrs = set(take.adj[node])
+            touched = set().union(*(take.adj[nbr] for nbr in nbrs))
+            take.take(node)
+            take.reduce(touched)
+            stack.append((take, bound))
+            # Leave it out (explored first: nodes with many conflicts are rarely in a maximum independent set)
+            nbrs = kernel.adj[node]
+            kernel.remove(node)
+            kernel.reduce(nbrs)
+            stack.append((kernel, bound))
+        elif kernel.size() > len(best):
+            best = kernel.unfold(kernel.taken)
+    return best, len(best), True
+
+
+def _greedy_min_degree(adj):
+    """
+    DeLOB-mindegree: take the node with the fewest neighbors left, drop its neighbors, repeat.
+    """
+    nodes = list(adj)
+    index = {node: idx for idx, node in enumerate(nodes)}
+    edges = [
+        (index[node], index[nbr])
+        for node in nodes
+        for nbr in adj[node]
+        if index[node] < index[nbr]
+    ]
+    g = CSRGraph(numpy.asarray(edges, dtype=numpy.int64), len(nodes))
+    chosen = []
+    while g.number_of_edges():
+        node = g.min_degree_node()
+        chosen.append(node)
+        g.remove_nodes_from(list(g.neighbors(node)) + [node])
+    chosen.extend(g.nodes())
+    return [nodes[idx] for idx in chosen]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""
+Compact NumPy representations of primers, for checking many primers at once instead of one Python string at a time.
+
+1. Codes: (n, L) uint8 array, one code per nucleotide: A = 0, C = 1, G = 2, T = 3.
+2. Packed: (n,) uint64 array, 2 bits per nucleotide, nucleotide i in bits 2i and 2i + 1 (so up to 32 nts per primer).
+
+With this code order a nucleotide is G or C exactly when its two bits differ, so GC content is a couple of bit ops.
+"""
+
+import numpy
+
+NUCLEOTIDES = "ACGT"
+# Code for anything that isn't A, C, G or T (can't be packed)
+INVALID_CODE = 255
+# Most nucleotides that fit into one packed uint64
+MAX_PACKED_LENGTH = 32
+
+# Byte -> nucleotide code lookup table
+_CODE_TABLE = numpy.full(256, INVALID_CODE, dtype=numpy.uint8)
+for _code, _nt in enumerate(NUCLEOTIDES):
+    _CODE_TABLE[ord(_nt)] = _code
+    _CODE_TABLE[ord(_nt.lower())] = _code
+# Nucleotide code -> byte
+_NT_BYTES = numpy.frombuffer(NUCLEOTIDES.encode("ascii"), dtype=numpy.uint8)
+
+_M1 = numpy.uint64(0x5555555555555555)
+_M2 = numpy.uint64(0x3333333333333333)
+_M4 = numpy.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = numpy.uint64(0x0101010101010101)
+
+
+def encode_primers(primers, length):
+    """
+    Returns an (n, length) uint8 array of nucleotide codes. Every primer must be /length/ long.
+    Characters other than A, C, G, T (either case) get INVALID_CODE.
+    """
+    primers = [str(primer) for primer in primers]
+    for primer in primers:
+        if len(primer) != length:
+            raise ValueError(f"Primer {primer} is not {length} nucleotides long")
+    # Unencodable characters become a single "?", so every character is still exactly one byte
+    buffer = "".join(primers).encode("ascii", errors="replace")
+    return _CODE_TABLE[numpy.frombuffer(buffer, dtype=numpy.uint8)].reshape(
+        len(primers), length
+    )
+
+
+def decode_primers(codes):
+    """
+    Inverse of encode_primers (for valid codes): returns a list of primer strings.
+    """
+    codes = numpy.asarray(codes, dtype=numpy.uint8)
+    n, length = codes.shape
+    text = _NT_BYTES[codes].tobytes().decode("ascii")
+    return [text[i * length : (i + 1) * length] for i in range(n)]
+
+
+def pack_codes(codes):
+    """
+    Packs an (n, L) array of nucleotide codes into an (n,) uint64 array, 2 bits per nucleotide.
+    """
+    codes = numpy.asarray(codes, dtype=numpy.uint8)
+    if codes.shape[1] > MAX_PACKED_LENGTH:
+        raise ValueError(f"Can only pack up to {MAX_PACKED_LENGTH} nucleotides")
+    if (codes > 3).any():
+        raise ValueError("Can only pack primers made of A, C, G and T")
+    shifts = (2 * numpy.arange(codes.shape[1])).astype(numpy.uint64)
+    return numpy.bitwise_or.reduce(
+        codes.astype(numpy.uint64) << shifts, axis=1, dtype=numpy.uint64
+    )
+
+
+def unpack_codes(packed, length):
+    """
+    Inverse of pack_codes: returns the (n, length) uint8 codes.
+    """
+    packed = numpy.asarray(packed, dtype=numpy.uint64)
+    shifts = (2 * numpy.arange(length)).astype(numpy.uint64)
+    return ((packed[:, None] >> shifts) & numpy.uint64(3)).astype(numpy.uint8)
+
+
+def pack_primers(primers, length):
+    """
+    Primer strings -> (n,) uint64 packed array.
+    """
+    return pack_codes(encode_primers(primers, length))
+
+
+def unpack_primers(packed, length):
+    """
+    (n,) uint64 packed array -> primer strings.
+    """
+    return decode_primers(unpack_codes(packed, length))
+
+
+def gc_counts(codes):
+    """
+    Number of G and C nucleotides in each row of an (n, L) codes array.
+    """
+    codes = numpy.asarray(codes)
+    return ((codes == 1) | (codes == 2)).sum(axis=1)
+
+
+def gc_counts_packed(packed, length):
+    """
+    Number of G and C nucleotides in each packed primer of /length/ nucleotides.
+    """
+    packed = numpy.asarray(packed, dtype=numpy.uint64)
+    # G (10) and C (01) are the codes whose two bits differ: leaves a 1 in the low bit of each G/C slot
+    low_bits = _M1 >> numpy.uint64(2 * (MAX_PACKED_LENGTH - length))
+    return popcount((packed ^ (packed >> numpy.uint64(1))) & low_bits)
+
+
+def popcount(values):
+    """
+    Number of set bits in each element of a uint64 array.
+    """
+    x = numpy.asarray(values, dtype=numpy.uint64)
+    x = x - ((x >> numpy.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> numpy.uint64(2)) & _M2)
+    x = (x + (x >> numpy.uint64(4))) & _M4
+    return ((x * _H01) >> numpy.uint64(56)).astype(numpy.int64)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+"""
+Binary primer store: a file of fixed-length primers, 2-bit packed (see packed.py) into one uint64 record each, after a small header.
+
+Opening a store memory-maps the records (numpy.memmap), so it is instant whatever the size and slicing never copies.
+A PrimerStore is pickled as its path and slice, so worker processes map the same file instead of receiving a copy.
+PrimerStore behaves like a read-only list of primer strings (decoded on access), and code that knows about it uses .packed directly.
+
+Header (HEADER_BYTES, little-endian): magic, format version, primer length, number of primers,
+edit distance / GC thresholds the library was made for, sha256 of the records.
+"""
+
+import collections.abc
+import copy
+import hashlib
+import itertools
+import os
+import struct
+
+import numpy
+
+from primergen.common.check import (
+    MAX_CG_CONTENT,
+    MIN_CG_CONTENT,
+    MIN_EDIT_DISTANCE,
+    PRIMER_LENGTH,
+)
+from primergen.common.packed import pack_primers, unpack_primers
+
+STORE_SUFFIX = ".primers"
+STORE_MAGIC = b"PRIMERS\0"
+STORE_FORMAT_VERSION = 1
+# Header size on disk, records start right after (padded so records are 8-byte aligned)
+HEADER_BYTES = 128
+# Primers packed (or decoded) at a time when importing, exporting and iterating
+STORE_CHUNK_SIZE = 1_000_000
+
+# magic, version, length, count, min edit distance, min GC %, max GC %, sha256 of records
+_HEADER = struct.Struct("<8sIIQIII4x32s")
+
+
+class PrimerStore(collections.abc.Sequence):
+    def __init__(self, path, start=0, stop=None):
+        """
+        Opens the store at /path/ (read-only). start/stop select a slice of its records.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+        if len(header) < HEADER_BYTES or not header.startswith(STORE_MAGIC):
+            raise ValueError(f"{path} is not a primer store")
+        (
+            _,
+            version,
+            self.length,
+            self.total_count,
+            self.min_edit_distance,
+            self.min_gc_content,
+            self.max_gc_content,
+            self.records_hash,
+        ) = _HEADER.unpack(header[: _HEADER.size])
+        if version != STORE_FORMAT_VERSION:
+            raise ValueError(
+                f"{path} has store format {version}, expected {STORE_FORMAT_VERSION}"
+            )
+        self.start, self.stop, _ = slice(start, stop).indices(self.total_count)
+        self.stop = max(self.start, self.stop)
+        if self.total_count:
+            records = numpy.memmap(
+                path,
+                dtype="<u8",
+                mode="r",
+                offset=HEADER_BYTES,
+                shape=(self.total_count,),
+            )
+        else:
+            records = numpy.zeros(0, dtype=numpy.uint64)
+        # Packed primers of this slice (a view, nothing is read until used)
+        self.packed = records[self.start : self.stop]
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step != 1:
+                return unpack_primers(self.packed[idx], self.length)
+            # Same mapping, no copy and no new file handle
+            part = copy.copy(self)
+            part.start, part.stop = self.start + start, self.start + max(start, stop)
+            part.packed = self.packed[start:stop]
+            return part
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Primer {idx} out of range for {len(self)} primers")
+        return unpack_primers(self.packed[idx : idx + 1], self.length)[0]
+
+    def __iter__(self):
+        for start in range(0, len(self), STORE_CHUNK_SIZE):
+            yield from unpack_primers(
+                self.packed[start : start + STORE_CHUNK_SIZE], self.length
+            )
+
+    def __copy__(self):
+        # Shares the mapping: the default copy would go through __reduce__ and open the file again
+        part = object.__new__(PrimerStore)
+        part.__dict__.update(self.__dict__)
+        return part
+
+    def __reduce__(self):
+        # Pickled as the path, so other processes map the file themselves
+        return (PrimerStore, (self.path, self.start, self.stop))
+
+    def verify(self):
+        """
+        True if the records match the hash in the header (reads the whole file).
+        """
+        whole = PrimerStore(self.path)
+        return _hash_records(whole.packed) == self.records_hash
+
+
+def write_primer_store(
+    path,
+    primers,
+    length=PRIMER_LENGTH,
+    min_edit_distance=MIN_EDIT_DISTANCE,
+    min_gc_content=MIN_CG_CONTENT,
+    max_gc_content=MAX_CG_CONTENT,
+):
+    """
+    Writes primers (any iterable of strings, or a packed uint64 array) to a store at /path/, a chunk at a time.
+    Every primer must be /length/ nts of A, C, G and T (ValueError otherwise, and nothing is written).
+    """
+    if isinstance(primers, numpy.ndarray):
+        chunks = (
+            primers[i : i + STORE_CHUNK_SIZE]
+            for i in range(0, len(primers), STORE_CHUNK_SIZE)
+        )
+    else:
+        primers = iter(primers)
+        chunks = (
+            pack_primers(chunk, length)
+            for chunk in iter(
+                lambda: list(itertools.islice(primers, STORE_CHUNK_SIZE)), []
+            )
+        )
+    # Write to a temporary file first so a killed run never leaves half a store behind
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    digest = hashlib.sha256()
+    count = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(b"\0" * HEADER_BYTES)
+            for chunk in chunks:
+                records = numpy.ascontiguousarray(chunk, dtype="<u8")
+                digest.update(records.tobytes())
+                f.write(records.tobytes())
+                count += len(records)
+            f.seek(0)
+            f.write(
+                _HEADER.pack(
+                    STORE_MAGIC,
+                    STORE_FORMAT_VERSION,
+                    length,
+                    count,
+                    min_edit_distance,
+                    min_gc_content,
+                    max_gc_content,
+                    digest.digest(),
+                )
+            )
+    except BaseException:
+        # e.g., a primer that can't be packed
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+def import_text_file(text_path, store_path, length=PRIMER_LENGTH):
+    """
+    Converts a text file (one primer per line) to a store, without loading the whole file. Returns the number of primers.
+    """
+    with open(text_path, "r") as f:
+        primers = (line.strip() for line in f)
+        return write_primer_store(
+            store_path, (primer for primer in primers if primer), length
+        )
+
+
+def export_text_file(store, text_path):
+    """
+    Writes a store (PrimerStore or path) as a text file, one primer per line.
+    """
+    if not isinstance(store, PrimerStore):
+        store = PrimerStore(store)
+    with open(text_path, "w") as f:
+        for start in range(0, len(store), STORE_CHUNK_SIZE):
+            chunk = unpack_primers(
+                store.packed[start : start + STORE_CHUNK_SIZE], store.length
+            )
+            f.write("\n".join(chunk))
+            f.write("\n")
+
+
+def is_primer_store(path):
+    with open(path, "rb") as f:
+        return f.read(len(STORE_MAGIC)) == STORE_MAGIC
+
+
+def load_primers(path):
+    """
+    Primers from either kind of file: a PrimerStore for stores, a list of strings for text files.
+    """
+    if is_primer_store(path):
+        return PrimerStore(path)
+    with open(path, "r") as f:
+        return f.read().splitlines()
+
+
+def get_primers_hash(primers):
+    """
+    Hash of a primer list: same primers in the same order = same hash.
+    """
+    digest = hashlib.sha256()
+    for primer in primers:
+        digest.update(str(primer).encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def _hash_records(packed):
+    digest = hashlib.sha256()
+    for start in range(0, len(packed), STORE_CHUNK_SIZE):
+        digest.update(
+            numpy.ascontiguousarray(
+                packed[start : start + STORE_CHUNK_SIZE], dtype="<u8"
+            ).tobytes()
+        )
+    return digest.digest()
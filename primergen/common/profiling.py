@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""
+Phase timers: named spans (e.g., edges, graph, validation) that add up wall-clock time, CPU time and number of calls,
+plus an optional profiler over the whole run:
+- "cprofile": deterministic profiler (cProfile), exact call counts but slows down hot Python loops,
+- "sample": every SAMPLE_INTERVAL_SEC of wall-clock time, records the main thread's stack (Unix only, low overhead).
+Everything can be exported as JSON (see PhaseTimer.to_dict / write_json).
+"""
+
+import collections
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import resource
+import signal
+import threading
+import time
+
+PROFILERS = (None, "cprofile", "sample")
+# Time between two stack samples of the sampling profiler
+SAMPLE_INTERVAL_SEC = 0.005
+# Functions (and stacks, for the sampling profiler) listed in the exported profile
+PROFILE_TOP_N = 40
+
+
+class PhaseTimer:
+    """
+    Adds up the time spent in named spans. Spans may nest (e.g., edge computation inside generate), so their times can overlap.
+    CPU time counts this process and, separately, worker processes that exited during the span (pools shut down in it).
+    """
+
+    def __init__(self, profiler=None):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler} (have: {PROFILERS})")
+        self.profiler = profiler
+        # Name -> {"wall_sec", "cpu_sec", "worker_cpu_sec", "calls"}, in the order spans were first seen
+        self.spans = {}
+        self.start_wall_time = None
+        self.start_cpu_time = None
+        self.start_worker_cpu_time = None
+        self.stop_wall_time = None
+        self.stop_cpu_sec = None
+        self._profile = None
+        self._sampler = None
+
+    def start(self):
+        self.start_wall_time = time.perf_counter()
+        self.start_cpu_time = time.process_time()
+        self.start_worker_cpu_time = _get_worker_cpu_time()
+        self.stop_wall_time = None
+        self.stop_cpu_sec = None
+        if self.profiler == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.profiler == "sample":
+            self._sampler = _StackSampler()
+            self._sampler.start()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.stop_wall_time = time.perf_counter()
+        self.stop_cpu_sec = self.cpu_sec()
+
+    def elapsed_sec(self):
+        """
+        Wall-clock time since start() (until stop(), once stopped).
+        """
+        end = (
+            self.stop_wall_time
+            if self.stop_wall_time is not None
+            else time.perf_counter()
+        )
+        return end - self.start_wall_time
+
+    def cpu_sec(self):
+        """
+        CPU time since start() (until stop(), once stopped) of this process and of the worker processes that exited since.
+        """
+        if self.stop_cpu_sec is not None:
+            return self.stop_cpu_sec
+        return (
+            time.process_time()
+            - self.start_cpu_time
+            + _get_worker_cpu_time()
+            - self.start_worker_cpu_time
+        )
+
+    @contextlib.contextmanager
+    def span(self, name):
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        start_worker_cpu = _get_worker_cpu_time()
+        try:
+            yield
+        finally:
+            self.add(
+                name,
+                wall_sec=time.perf_counter() - start_wall,
+                cpu_sec=time.process_time() - start_cpu,
+                worker_cpu_sec=_get_worker_cpu_time() - start_worker_cpu,
+            )
+
+    def add(self, name, wall_sec=0.0, cpu_sec=0.0, worker_cpu_sec=0.0, calls=1):
+        """
+        Adds to a span directly, for hot paths where a context manager per call costs too much.
+        """
+        span = self.spans.get(name)
+        if span is None:
+            span = self.spans[name] = {
+                "wall_sec": 0.0,
+                "cpu_sec": 0.0,
+                "worker_cpu_sec": 0.0,
+                "calls": 0,
+            }
+        span["wall_sec"] += wall_sec
+        span["cpu_sec"] += cpu_sec
+        span["worker_cpu_sec"] += worker_cpu_sec
+        span["calls"] += calls
+
+    def to_dict(self):
+        result = {
+            "wall_sec": (
+                self.elapsed_sec() if self.start_wall_time is not None else None
+            ),
+            "cpu_sec": self.cpu_sec() if self.start_cpu_time is not None else None,
+            "spans": {name: dict(span) for name, span in self.spans.items()},
+            "profiler": self.profiler,
+        }
+        if self._profile is not None:
+            result["profile"] = _summarize_cprofile(self._profile)
+        if self._sampler is not None:
+            result["profile"] = self._sampler.summarize()
+        return result
+
+    def write_json(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        print(
+            f"Wall time: {self.elapsed_sec():.3f} sec, CPU time: {self.cpu_sec():.3f} sec"
+        )
+        for name, span in self.spans.items():
+            print(
+                f"  {name:<20}{span['wall_sec']:>10.3f} sec wall{span['cpu_sec']:>10.3f} sec cpu{span['worker_cpu_sec']:>10.3f} sec workers{span['calls']:>10} calls"
+            )
+
+
+def _get_worker_cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _get_function_name(filename, lineno, function):
+    return f"{os.path.basename(filename)}:{lineno}({function})"
+
+
+def _summarize_cprofile(profile):
+    stats = pstats.Stats(profile)
+    functions = [
+        {
+            "function": _get_function_name(*func),
+            "calls": calls,
+            "self_sec": self_sec,
+            "cumulative_sec": cumulative_sec,
+        }
+        for func, (_, calls, self_sec, cumulative_sec, _) in stats.stats.items()
+    ]
+    # Where the time is actually spent first
+    functions.sort(key=lambda func: -func["self_sec"])
+    return {"type": "cprofile", "functions": functions[:PROFILE_TOP_N]}
+
+
+class _StackSampler:
+    """
+    Records the main thread's stack on a wall-clock timer signal (SIGALRM), so time waiting on workers or I/O shows up too.
+    """
+
+    def __init__(self, interval_sec=SAMPLE_INTERVAL_SEC):
+        self.interval_sec = interval_sec
+        # Folded stack ("outer;...;inner") -> number of samples
+        self.stacks = collections.Counter()
+        self.num_samples = 0
+        self._previous_handler = None
+
+    def start(self):
+        if not hasattr(signal, "setitimer"):
+            raise ValueError("The sampling profiler needs Unix interval timers")
+        if threading.current_thread() is not threading.main_thread():
+            raise ValueError("The sampling profiler only runs from the main thread")
+        self._previous_handler = signal.signal(signal.SIGALRM, self._sample)
+        signal.setitimer(signal.ITIMER_REAL, self.interval_sec, self.interval_sec)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self._previous_handler or signal.SIG_DFL)
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                _get_function_name(code.co_filename, code.co_firstlineno, code.co_name)
+            )
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+        self.num_samples += 1
+
+    def summarize(self):
+        # Samples where a function is on top of the stack (self) or anywhere on it (total)
+        self_samples = collections.Counter()
+        total_samples = collections.Counter()
+        for stack, count in self.stacks.items():
+            functions = stack.split(";")
+            self_samples[functions[-1]] += count
+            for func in set(functions):
+                total_samples[func] += count
+        # Where the time is actually spent first, then the callers
+        functions = sorted(
+            total_samples, key=lambda func: (-self_samples[func], -total_samples[func])
+        )
+        return {
+            "type": "sample",
+            "interval_sec": self.interval_sec,
+            "samples": self.num_samples,
+            "functions": [
+                {
+                    "function": func,
+                    "self_samples": self_samples[func],
+                    "total_samples": total_samples[func],
+                }
+                for func in functions[:PROFILE_TOP_N]
+            ],
+            # Folded stacks, the input format of flame graph tools
+            "stacks": dict(self.stacks.most_common(PROFILE_TOP_N)),
+        }
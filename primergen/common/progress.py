@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+"""
+Progress reporting off the hot path: loops only update plain counters (e.g., self.iterations, len(self.primers)),
+and a background thread reads them every PROGRESS_INTERVAL_SEC and hands a snapshot to a sink:
+- "silent": nothing (no thread either),
+- "human": one readable line per interval,
+- "jsonl": one JSON object per line, for other programs to parse.
+Reading an int or a list length is atomic in CPython, so the loops never lock, format or write anything.
+"""
+
+import json
+import sys
+import threading
+import time
+import weakref
+
+SINKS = ("silent", "human", "jsonl")
+# Time between two progress reports
+PROGRESS_INTERVAL_SEC = 1
+
+
+class HumanSink:
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, state):
+        line = f"[{state['strategy']}] Elapsed: {int(state['elapsed_sec'] / 60)} min {int(state['elapsed_sec'] % 60)} sec\tIteration: {state['iterations']}\tPrimers: {state['primers']}\tPPS: {state['primers_per_sec']}\tPPI%: {round(state['primers'] / max(state['iterations'], 1) * 100, 5)}\tGC invalid: {state['gc_errors']}\tEdit invalid: {state['edit_errors']} ({round(state['edit_errors'] / max(state['iterations'], 1) * 100, 5)}%)"
+        if state["total"]:
+            line += f"\t{state['done']} of {state['total']} ({round(state['done'] / state['total'] * 100, 2)}%)"
+        if state["eta_sec"] is not None:
+            line += (
+                f"\tETA: {int(state['eta_sec'] / 60)} m {int(state['eta_sec'] % 60)} s"
+            )
+        # Looked up when writing, so redirected stdout is respected
+        stream = self.stream or sys.stdout
+        stream.write(line + "\n")
+        stream.flush()
+
+
+class JsonLinesSink:
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, state):
+        stream = self.stream or sys.stdout
+        stream.write(json.dumps(state) + "\n")
+        stream.flush()
+
+
+def get_sink(name, stream=None):
+    """
+    Sink by name (see SINKS), None for "silent".
+    """
+    if name not in SINKS:
+        raise ValueError(f"Unknown progress sink {name} (have: {SINKS})")
+    if name == "human":
+        return HumanSink(stream)
+    if name == "jsonl":
+        return JsonLinesSink(stream)
+    return None
+
+
+class ProgressReporter:
+    """
+    Reports the progress of a generator (anything with get_progress_state(), see BasePrimerGenerator) from a background thread.
+    Only holds a weak reference to it: the thread ends by itself once the generator is gone, even if stop() is never called.
+    """
+
+    def __init__(self, generator, sink, interval_sec=PROGRESS_INTERVAL_SEC):
+        self.generator = weakref.ref(generator)
+        self.sink = sink
+        self.interval_sec = interval_sec
+        # Serializes emits from the thread and from report()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.prev_time = time.perf_counter()
+        self.prev_primers = 0
+        self.prev_done = 0
+        self.primers_per_sec = 0
+        self.done_per_sec = 0
+
+    def start(self):
+        self.prev_time = time.perf_counter()
+        self.prev_primers = 0
+        self.prev_done = 0
+        if self.sink is None or self.thread is not None:
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self._run, name="primergen-progress", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, report=True):
+        """
+        Stops the thread, then reports the final state unless /report/ is False.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if report:
+            self.report()
+
+    def report(self):
+        """
+        Emits the current state right away.
+        """
+        generator = self.generator()
+        if self.sink is None or generator is None:
+            return
+        with self.lock:
+            self.sink.emit(self.get_state(generator))
+
+    def get_state(self, generator):
+        state = generator.get_progress_state()
+        # Rates over the last interval
+        cur_time = time.perf_counter()
+        elapsed = cur_time - self.prev_time
+        if elapsed > 0:
+            self.primers_per_sec = round(
+                (state["primers"] - self.prev_primers) / elapsed, 2
+            )
+            self.done_per_sec = (state["done"] - self.prev_done) / elapsed
+        self.prev_time = cur_time
+        self.prev_primers = state["primers"]
+        self.prev_done = state["done"]
+        state["primers_per_sec"] = self.primers_per_sec
+        state["eta_sec"] = None
+        if state["total"] and self.done_per_sec > 0:
+            state["eta_sec"] = (state["total"] - state["done"]) / self.done_per_sec
+        return state
+
+    def _run(self):
+        while not self.stopped.wait(self.interval_sec):
+            generator = self.generator()
+            if generator is None:
+                return
+            with self.lock:
+                self.sink.emit(self.get_state(generator))
+            # Don't keep the generator alive between reports
+            del generator
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+"""
+On-disk cache of finished libraries, so running a strategy again on the same input returns the library it found last time.
+
+Entries are keyed on a hash of everything that decides the result: the input primers, the strategy and its parameters,
+the random seeds, the thresholds and the code itself (a hash of primergen's source files), so changing any of them
+means computing the library again. Only libraries that passed validation, from strategies that finished (not, e.g., a solver
+that ran out of time), are stored, as primer stores (see primer_store.py).
+When the cache grows past MAX_RESULT_CACHE_BYTES, the least recently used entries are deleted.
+"""
+
+import functools
+import hashlib
+import json
+import os
+
+from primergen.common.check import (
+    MAX_CG_CONTENT,
+    MIN_CG_CONTENT,
+    MIN_EDIT_DISTANCE,
+    PRIMER_LENGTH,
+)
+from primergen.common.edge_cache import evict
+from primergen.common.primer_store import (
+    STORE_SUFFIX,
+    PrimerStore,
+    get_primers_hash,
+    write_primer_store,
+)
+
+RESULT_CACHE_FOLDER = "primergen/results"
+# Total size of all cached libraries before old ones get deleted
+MAX_RESULT_CACHE_BYTES = 1024**3
+# Bump if the way keys are computed or libraries are stored changes, so old entries aren't reused
+RESULT_CACHE_FORMAT_VERSION = 1
+
+RESULT_SUFFIX = f"-library{STORE_SUFFIX}"
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_version():
+    """
+    Hash of primergen's Python source files: any code change gives a new hash.
+    """
+    package_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for folder, subfolders, files in os.walk(package_folder):
+        # Same order every time
+        subfolders[:] = sorted(name for name in subfolders if name != "__pycache__")
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(folder, name)
+            digest.update(os.path.relpath(path, package_folder).encode())
+            digest.update(b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def get_result_key(primers, params):
+    """
+    Hash identifying a library: /primers/ is the input list (None for generators),
+    /params/ (JSON-serializable) everything else about the run that changes the library (strategy, seeds, ...).
+    """
+    digest = hashlib.sha256()
+    settings = {
+        "version": RESULT_CACHE_FORMAT_VERSION,
+        "code": get_code_version(),
+        "length": PRIMER_LENGTH,
+        "min_edit_distance": MIN_EDIT_DISTANCE,
+        "min_gc_content": MIN_CG_CONTENT,
+        "max_gc_content": MAX_CG_CONTENT,
+        "params": params,
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    digest.update(b"\n")
+    if primers is not None:
+        digest.update(get_primers_hash(primers).encode())
+    return digest.hexdigest()
+
+
+def get_result_path(key, cache_folder=RESULT_CACHE_FOLDER):
+    return os.path.join(cache_folder, f"{key}{RESULT_SUFFIX}")
+
+
+def load_result(key, cache_folder=RESULT_CACHE_FOLDER):
+    """
+    Returns the cached library (list of primers), or None if it isn't cached (or the entry is damaged).
+    """
+    path = get_result_path(key, cache_folder)
+    if not os.path.exists(path):
+        return None
+    try:
+        store = PrimerStore(path)
+        intact = store.verify()
+    except ValueError:
+        intact = False
+    if not intact:
+        print(f"Result cache entry {path} is damaged, deleting it")
+        os.remove(path)
+        return None
+    # Mark as recently used for eviction
+    os.utime(path)
+    return list(store)
+
+
+def save_result(
+    key, primers, cache_folder=RESULT_CACHE_FOLDER, max_bytes=MAX_RESULT_CACHE_BYTES
+):
+    """
+    Stores a library in the cache, then evicts old entries if it's too big. Returns the entry's path.
+    ValueError (and nothing stored) if the primers can't be packed.
+    """
+    os.makedirs(cache_folder, exist_ok=True)
+    path = get_result_path(key, cache_folder)
+    write_primer_store(path, primers)
+    evict(cache_folder, max_bytes, keep=path, suffix=RESULT_SUFFIX)
+    return path
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""
+NumPy batch versions of the random primer samplers in util.py, for the generators.
+Each call draws a whole batch of candidates as packed primers (see packed.py) instead of one Python string at a time.
+
+Randomness comes from /rng/: numpy.random by default (seeded by the generators), or any numpy RandomState / Generator.
+Batches follow the same distributions as the one-at-a-time samplers, not the same random streams.
+"""
+
+import numpy
+
+from primergen.common.check import PRIMER_LENGTH
+from primergen.common.packed import NUCLEOTIDES, gc_counts, pack_codes
+
+# How many candidates the generators draw at a time (at most)
+CANDIDATE_BATCH_SIZE = 1024
+# Smallest batch, for generators that throw away the rest of a batch whenever they accept a primer
+MIN_CANDIDATE_BATCH_SIZE = 16
+
+_A, _C, _G, _T = (NUCLEOTIDES.index(nt) for nt in "ACGT")
+# Default GC bounds, same as util.random_primer_with_balanced_gc
+MIN_GC = 9
+MAX_GC = 11
+
+
+def random_primers_batch(n=CANDIDATE_BATCH_SIZE, length=PRIMER_LENGTH, rng=None):
+    """
+    /n/ uniformly random packed primers (like util.random_primer).
+    """
+    rng = rng or numpy.random
+    codes = (rng.random((n, length)) * 4).astype(numpy.uint8)
+    return pack_codes(codes)
+
+
+def random_primers_with_balanced_gc_batch(
+    n=CANDIDATE_BATCH_SIZE, length=PRIMER_LENGTH, min_gc=MIN_GC, max_gc=MAX_GC, rng=None
+):
+    """
+    /n/ packed primers with between min_gc and max_gc Gs and Cs (like util.random_primer_with_balanced_gc):
+    pick how many GCs, pick that many positions at random, make them G or C and everything else A or T.
+    """
+    rng = rng or numpy.random
+    num_gc = min_gc + (rng.random(n) * (max_gc - min_gc + 1)).astype(numpy.int64)
+    # Rank of each position in a random permutation of the row: the num_gc lowest ranks become G/C
+    ranks = rng.random((n, length)).argsort(axis=1).argsort(axis=1)
+    is_gc = ranks < num_gc[:, None]
+    coin = rng.random((n, length)) < 0.5
+    codes = numpy.where(
+        is_gc, numpy.where(coin, _G, _C), numpy.where(coin, _A, _T)
+    ).astype(numpy.uint8)
+    return pack_codes(codes)
+
+
+def primers_from_frequencies_batch(
+    frequencies,
+    n=CANDIDATE_BATCH_SIZE,
+    alphabet="ATGC",
+    min_gc=MIN_GC,
+    max_gc=MAX_GC,
+    reroll=False,
+    rng=None,
+):
+    """
+    /n/ packed primers where nucleotide i is drawn with relative weights frequencies[i] (one weight per nt of /alphabet/).
+    reroll=False fixes the GC count afterwards like util.generate_primer_from_frequencies_and_balanced_gc,
+    reroll=True throws away primers with the wrong GC count and draws again, like the _by_rerolling version.
+    """
+    rng = rng or numpy.random
+    weights = numpy.asarray(frequencies, dtype=numpy.float64)
+    # Reorder the weight columns to nucleotide codes
+    weights = weights[:, [alphabet.index(nt) for nt in NUCLEOTIDES]]
+    cumulative = numpy.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+    if reroll:
+        batches = []
+        found = 0
+        while found < n:
+            codes = _draw_categorical(cumulative, n, rng)
+            num_gc = gc_counts(codes)
+            codes = codes[(num_gc >= min_gc) & (num_gc <= max_gc)]
+            batches.append(codes)
+            found += len(codes)
+        return pack_codes(numpy.concatenate(batches)[:n])
+    codes = _draw_categorical(cumulative, n, rng)
+    return pack_codes(fix_gc_counts(codes, min_gc, max_gc, rng))
+
+
+def fix_gc_counts(codes, min_gc=MIN_GC, max_gc=MAX_GC, rng=None):
+    """
+    For each row of an (n, L) codes array with too few (too many) Gs and Cs,
+    turns just enough random A/T (G/C) positions into random G/C (A/T) nucleotides. Returns a new array.
+    """
+    rng = rng or numpy.random
+    codes = numpy.array(codes, dtype=numpy.uint8)
+    n, length = codes.shape
+    is_gc = (codes == _G) | (codes == _C)
+    num_gc = is_gc.sum(axis=1)
+    too_few = num_gc < min_gc
+    too_many = num_gc > max_gc
+    # Rows that need changes and how many positions each of them needs changed
+    to_change = numpy.where(too_few, min_gc - num_gc, 0) + numpy.where(
+        too_many, num_gc - max_gc, 0
+    )
+    # Positions that can change: A/T in rows with too few GCs, G/C in rows with too many
+    changeable = (is_gc & too_many[:, None]) | (~is_gc & too_few[:, None])
+    # Random order among the changeable positions of each row, change the first /to_change/ ones
+    keys = numpy.where(changeable, rng.random((n, length)), 2.0)
+    ranks = keys.argsort(axis=1).argsort(axis=1)
+    change = ranks < to_change[:, None]
+    coin = rng.random((n, length)) < 0.5
+    replacements = numpy.where(
+        is_gc, numpy.where(coin, _A, _T), numpy.where(coin, _G, _C)
+    )
+    codes[change] = replacements[change]
+    return codes
+
+
+def _draw_categorical(cumulative, n, rng):
+    """
+    (n, L) codes where code of position i is drawn from the cumulative distribution cumulative[i].
+    """
+    draws = rng.random((n, cumulative.shape[0]))
+    codes = (draws[:, :, None] >= cumulative[None, :, :-1]).sum(axis=2)
+    return codes.astype(numpy.uint8)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""
+Pigeonhole seed index for "which primers could be within edit distance k of this one?" queries.
+
+If ed(p, q) <= k, split p into k + 1 pieces: the k edits can touch at most k of them, so at least one piece
+appears unchanged in q. The insertions/deletions before that piece shift it by at most k positions.
+So only primers containing one of p's pieces within k positions of where it sits in p can be too close to p.
+
+The index stores every substring of q (of each piece length) with its position, and a query looks up p's pieces.
+This is exact: every pair within distance k is returned as a candidate, the levenshtein check then filters the rest.
+How much it prunes depends on the piece length: with PRIMER_LENGTH = 20 and MIN_EDIT_DISTANCE = 8 pieces are
+only 2-3 nucleotides long and most pairs still end up as candidates.
+"""
+
+from collections import defaultdict
+
+from primergen.common.check import MIN_EDIT_DISTANCE
+
+
+class SeedIndex:
+    def __init__(self, primers=(), limit=MIN_EDIT_DISTANCE):
+        """
+        Finds candidate pairs of primers that may be less than /limit/ edit distance apart.
+        """
+        self.limit = limit
+        # Largest edit distance that still counts as too close
+        self.max_edits = limit - 1
+        self.primers = []
+        # (substring, position) -> indices of primers with that substring at that position
+        self.postings = defaultdict(list)
+        # Piece lengths we have indexed substrings for
+        self.seed_lengths = set()
+        for primer in primers:
+            self.add(primer)
+
+    def __len__(self):
+        return len(self.primers)
+
+    def add(self, primer):
+        """
+        Adds a primer to the index, returns its index.
+        """
+        for length in self.get_seed_lengths(len(primer)):
+            if length not in self.seed_lengths:
+                self.reindex(length)
+        idx = len(self.primers)
+        self.primers.append(primer)
+        for length in self.seed_lengths:
+            for pos in range(len(primer) - length + 1):
+                self.postings[(primer[pos : pos + length], pos)].append(idx)
+        return idx
+
+    def get_seeds(self, primer):
+        """
+        Splits a primer into max_edits + 1 pieces, as even as possible.
+        Returns a list of (position, piece).
+        """
+        num_pieces = self.max_edits + 1
+        seeds = []
+        pos = 0
+        for piece_num in range(num_pieces):
+            length = len(primer) // num_pieces + (
+                1 if piece_num < len(primer) % num_pieces else 0
+            )
+            seeds.append((pos, primer[pos : pos + length]))
+            pos += length
+        return seeds
+
+    def get_seed_lengths(self, primer_length):
+        num_pieces = self.max_edits + 1
+        lengths = {primer_length // num_pieces}
+        if primer_length % num_pieces:
+            lengths.add(primer_length // num_pieces + 1)
+        # Empty pieces match anywhere, there's nothing to index for them
+        lengths.discard(0)
+        return lengths
+
+    def candidates(self, primer):
+        """
+        Returns the sorted indices of all indexed primers that could be less than /limit/ edit distance from primer.
+        """
+        found = set()
+        for pos, seed in self.get_seeds(primer):
+            if not seed:
+                # Primer is too short to split into enough pieces: anything could be close
+                return list(range(len(self.primers)))
+            if len(seed) not in self.seed_lengths:
+                self.reindex(len(seed))
+            for other_pos in range(pos - self.max_edits, pos + self.max_edits + 1):
+                found.update(self.postings.get((seed, other_pos), ()))
+        return sorted(found)
+
+    def candidate_pairs(self):
+        """
+        Yields every (idx1, idx2) pair (idx1 < idx2) of indexed primers that could be less than /limit/ apart,
+        in the same order itertools.combinations would visit them.
+        """
+        for idx1, primer in enumerate(self.primers):
+            for idx2 in self.candidates(primer):
+                if idx2 > idx1:
+                    yield (idx1, idx2)
+
+    def reindex(self, length):
+        """
+        Index substrings of a new piece length (e.g. a query primer is a different length than the indexed ones).
+        """
+        self.seed_lengths.add(length)
+        for idx, primer in enumerate(self.primers):
+            for pos in range(len(primer) - length + 1):
+                self.postings[(primer[pos : pos + length], pos)].append(idx)
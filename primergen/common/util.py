@@ -5,6 +5,9 @@ import os
 import random
 from importlib import resources
 
+from primergen.common.check import WRITE_PRIMER_STORE
+from primergen.common.primer_store import STORE_SUFFIX, write_primer_store
+
 DATA_FOLDER = "primergen/output"
 ALPHABET = ["A", "T", "C", "G"]
 GC = ["G", "C"]
@@ -36,13 +39,19 @@ def write_primers(
             f"Number of initial primers we cut down from (-1 if doesn't apply):\t{num_starting_primers}\n"
         )
         f.write("\n".join(primers))
-        # Write the times we found each primer to graph it later
+    if WRITE_PRIMER_STORE:
+        try:
+            write_primer_store(path_without_ext + STORE_SUFFIX, primers)
+        except ValueError as e:
+            print(f"Not writing a primer store: {e}")
+    # Write the times we found each primer to graph it later
     with open(
         path_without_ext + "-primertimes.txt",
         "w",
     ) as f:
         for (time, num_primers) in primer_found_times:
             f.write(f"{time},{num_primers}\n")
+    return path_without_ext
 
 
 def random_primer(length=20):
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Validates a whole primer library: length and GC content for every primer (vectorized), edit distance for every pair.
+Pairs are checked block by block through the conflict graph builder (batched kernel + process pool), so this is
+the same cost as building the conflict graph of the library, which is almost always empty for a valid library.
+
+Can stop at the first violation or collect all of them, and can stop after a time budget with an "unknown" verdict
+instead of running for as long as it takes.
+"""
+
+import math
+import time
+
+from primergen.common.check import (
+    MIN_EDIT_DISTANCE,
+    NUM_WORKERS,
+    PRIMER_LENGTH,
+    is_gc_valid_packed,
+    is_len_gc_valid_batch,
+)
+from primergen.common.conflict_graph import PAIRS_PER_BLOCK, iter_conflict_edge_blocks
+from primergen.common.primer_store import PrimerStore
+
+VALID = "valid"
+INVALID = "invalid"
+# Ran out of time before checking every pair: no violations found so far, but not proven valid either
+UNKNOWN = "unknown"
+
+# Don't flood the terminal when reporting every violation
+MAX_VIOLATIONS_PRINTED = 10
+
+
+class ValidationReport:
+    def __init__(self, primers, limit=MIN_EDIT_DISTANCE):
+        self.primers = primers
+        self.limit = limit
+        self.verdict = VALID
+        # Indices of primers with the wrong length or GC content
+        self.bad_primers = []
+        # (idx1, idx2) pairs of primers that are less than /limit/ edit distance apart
+        self.too_close_pairs = []
+        self.pairs_checked = 0
+        self.total_pairs = math.comb(len(primers), 2)
+        self.elapsed_sec = 0
+
+    def is_valid(self):
+        return self.verdict == VALID
+
+    def print_summary(self):
+        for idx in self.bad_primers[:MAX_VIOLATIONS_PRINTED]:
+            print(
+                f"PRIMER LIBRARY FAILURE: {self.primers[idx]} has wrong length or wrong GC proportion"
+            )
+        for idx1, idx2 in self.too_close_pairs[:MAX_VIOLATIONS_PRINTED]:
+            print(
+                f"PRIMER LIBRARY FAILURE: {self.primers[idx1]} and {self.primers[idx2]} are not {self.limit} edit distance apart!"
+            )
+        if self.verdict == INVALID:
+            print(
+                f"PRIMER LIBRARY INVALID: {len(self.bad_primers)} primers with wrong length or GC proportion, {len(self.too_close_pairs)} pairs too close (checked {self.pairs_checked} of {self.total_pairs} pairs in {round(self.elapsed_sec, 2)} sec)"
+            )
+        elif self.verdict == UNKNOWN:
+            print(
+                f"PRIMER LIBRARY UNVERIFIED: ran out of time after checking {self.pairs_checked} of {self.total_pairs} pairs in {round(self.elapsed_sec, 2)} sec, no violations found so far"
+            )
+        else:
+            print(
+                f"PRIMER LIBRARY VALID: checked all {self.total_pairs} pairs in {round(self.elapsed_sec, 2)} sec"
+            )
+
+
+def validate_primers(
+    primers,
+    report_all=False,
+    workers=NUM_WORKERS,
+    time_budget_sec=None,
+    limit=MIN_EDIT_DISTANCE,
+    pairs_per_block=PAIRS_PER_BLOCK,
+):
+    """
+    Checks a list of primers (or a PrimerStore, whose packed records are used directly), returns a ValidationReport.
+    report_all=False stops at the first problem found, report_all=True collects every bad primer and every pair that is too close.
+    time_budget_sec stops checking pairs (verdict UNKNOWN) once it's used up, None means no limit.
+    """
+    start_time = time.perf_counter()
+    if not isinstance(primers, PrimerStore):
+        primers = [str(primer) for primer in primers]
+    report = ValidationReport(primers, limit=limit)
+
+    # Run the easy checks first
+    if isinstance(primers, PrimerStore):
+        # All the same length and packed already, only GC content to check
+        valid = is_gc_valid_packed(primers.packed, primers.length)
+        if primers.length != PRIMER_LENGTH:
+            valid[:] = False
+    else:
+        valid = is_len_gc_valid_batch(primers)
+    report.bad_primers = [int(idx) for idx, ok in enumerate(valid) if not ok]
+    if report.bad_primers:
+        report.verdict = INVALID
+        if not report_all:
+            report.bad_primers = report.bad_primers[:1]
+            report.elapsed_sec = time.perf_counter() - start_time
+            return report
+
+    # Run the n-choose-2 checks now: any edge in the conflict graph is a violation
+    blocks = iter_conflict_edge_blocks(
+        primers, limit=limit, workers=workers, pairs_per_block=pairs_per_block
+    )
+    try:
+        for start, stop, edges in blocks:
+            report.pairs_checked += sum(
+                len(primers) - 1 - row for row in range(start, stop)
+            )
+            report.too_close_pairs.extend(edges)
+            if edges:
+                report.verdict = INVALID
+                if not report_all:
+                    report.too_close_pairs = report.too_close_pairs[:1]
+                    break
+            if (
+                time_budget_sec is not None
+                and time.perf_counter() - start_time > time_budget_sec
+                and report.pairs_checked < report.total_pairs
+            ):
+                if report.verdict == VALID:
+                    report.verdict = UNKNOWN
+                break
+    finally:
+        blocks.close()
+
+    report.elapsed_sec = time.perf_counter() - start_time
+    return report
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 import random
 import numpy
-import re
-import pickle
+import math
 
 from importlib import resources
-from primergen.generators.generic import BasePrimerGenerator
+from primergen.generators.base import BasePrimerGenerator
 from primergen.common.check import *
+from primergen.common.batch_filter import conflict_free_mask
+from primergen.common.conflict_graph import get_conflict_edges, pack_if_possible
+from primergen.common.edge_cache import edges_to_array, get_cached_conflict_edges
+from primergen.common.primer_store import load_primers
+from primergen.common.result_cache import get_result_key
 
 
 # OG Seed
@@ -32,15 +36,26 @@ class BasePrimerExtractor(BasePrimerGenerator):
     Is passed a list of GC-valid primers (pre-generated), goal is to find the maximum size valid primer library within it.
     """
 
-    def __init__(self, initial_primers=None, target=TARGET_PRIMERS, strategy="base"):
+    def __init__(
+        self,
+        initial_primers=None,
+        target=TARGET_PRIMERS,
+        strategy="base",
+        workers=NUM_WORKERS,
+    ):
         super().__init__(target=target, strategy=strategy)
+        # Number of processes used to compute edit distances between all pairs
+        self.workers = workers
         if initial_primers:
             self.initial_primers = initial_primers
         else:
             self.initial_primers = self.get_primers()
         self.num_starting_primers = len(self.initial_primers)
+        # Conflict edges known in advance (e.g., for one component of a bigger graph, see components.py), used instead of computing them
+        self.edges = None
 
         # Seed random same for all extractors
+        self.seeds = (RANDOM_SEED, NP_RANDOM_SEED)
         random.seed(RANDOM_SEED)
         numpy.random.seed(NP_RANDOM_SEED)
 
@@ -50,28 +65,62 @@ class BasePrimerExtractor(BasePrimerGenerator):
         """
         raise NotImplementedError
 
-    def get_primers(self):
-        initial_primers = []
-        with resources.open_text("primergen.input", PRIMER_FILE) as f:
-            # with open(PRIMER_FILE, "r") as f:
-            initial_primers = f.read().splitlines()
-            return initial_primers
+    def extend(self, library):
+        """
+        Adds to an existing library (see BasePrimerGenerator.extend): candidates too close to a library primer are dropped
+        up front (each candidate against the library, with the batched kernel), and the strategy only runs on the rest.
+        """
+        super().extend(library)
+        with self.timer.span("library-filter"):
+            packed = pack_if_possible(self.initial_primers)
+            if packed is not None and self.num_library_primers:
+                free = conflict_free_mask(packed, self.get_packed_primers()).tolist()
+            else:
+                # Primers the kernel can't take (or nothing to check against)
+                free = [
+                    not self.conflicts_with_primers(primer)
+                    for primer in self.initial_primers
+                ]
+        num_candidates = len(self.initial_primers)
+        self.initial_primers = [
+            primer for primer, ok in zip(self.initial_primers, free) if ok
+        ]
+        self.num_starting_primers = len(self.initial_primers)
+        print(
+            f"{self.num_starting_primers} of {num_candidates} candidates are far enough from the library"
+        )
+        return self
 
-    def get_edges_file_txt(self):
-        edges_filename = PRIMER_FILE.split(".")[0] + "-edges.txt"
-        with resources.open_text("primergen.input", edges_filename) as f:
-            edges_str = f.read()
-            edges_ints = list(map(int, re.sub("[ [\\]\(\)]", "", edges_str).split(",")))
-            edges = [
-                (edges_ints[i], edges_ints[i + 1]) for i in range(0, len(edges_ints), 2)
-            ]
-            # print(edges)
-            del edges_str
-            del edges_ints
-            # print(edges)
-            return edges
+    def get_result_cache_key(self):
+        # Candidates that aren't loaded up front (e.g., streamed from a file) would have to be read just to hash them
+        if not len(self.initial_primers):
+            return None
+        return get_result_key(self.initial_primers, self.get_result_cache_params())
 
-    def get_edges_file_pkl(self):
-        edges_filename = PRIMER_FILE.split(".")[0] + "-edges.pkl"
-        with resources.open_binary("primergen.input", edges_filename) as f:
-            return pickle.load(f)
+    def compute_edges(self, far=False):
+        """
+        Edges of the conflict graph as an (m, 2) int32 array: (idx1, idx2) pairs of primers that are too close in edit distance.
+        far=True gives the complement graph (pairs that are far enough apart) instead.
+        """
+        if self.edges is not None and not far:
+            return self.edges
+        with self.timer.span("edges"):
+            if USE_EDGE_CACHE:
+                edges = get_cached_conflict_edges(
+                    self.initial_primers, workers=self.workers, far=far
+                )
+            else:
+                edges = edges_to_array(
+                    get_conflict_edges(
+                        self.initial_primers, workers=self.workers, far=far
+                    )
+                )
+        self.iterations += math.comb(self.num_starting_primers, 2)
+        return edges
+
+    def get_primers(self):
+        # PRIMER_FILE is either a text file (one primer per line) or a primer store, which is memory-mapped instead of read
+        with resources.as_file(
+            resources.files("primergen.input") / PRIMER_FILE
+        ) as path:
+            return load_primers(path)
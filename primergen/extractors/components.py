@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+
+from primergen.common.check import *
+from primergen.common.graph_utils import split_into_components
+from primergen.common.mis_solver import solve_mis
+
+from .base import BasePrimerExtractor
+from .delob_min_degree import DelobMinDegreePrimerExtractor
+
+# Components with at most this many primers are solved exactly (see mis_solver.py), bigger ones go to the heuristic
+MAX_EXACT_COMPONENT_SIZE = 64
+
+
+class ComponentsPrimerExtractor(BasePrimerExtractor):
+    """
+    Primers in different connected components of the conflict graph never conflict, so each component can be solved on its own.
+    Splits the graph, takes primers without conflicts as they are, solves small components exactly,
+    runs /extractor_class/ (any graph extractor) on each big component in a process pool, and merges the results.
+    """
+
+    def __init__(
+        self,
+        initial_primers=None,
+        target=TARGET_PRIMERS,
+        strategy=None,
+        workers=NUM_WORKERS,
+        extractor_class=DelobMinDegreePrimerExtractor,
+        max_exact_size=MAX_EXACT_COMPONENT_SIZE,
+    ):
+        if strategy is None:
+            # e.g., components-delob-min-degree
+            heuristic = inspect.signature(extractor_class).parameters["strategy"]
+            strategy = f"components-{heuristic.default}"
+        super().__init__(initial_primers, target, strategy, workers)
+        self.extractor_class = extractor_class
+        self.max_exact_size = max_exact_size
+
+    def generate(self):
+        # DeLOB: edges are between primers that are too close
+        edges = self.compute_edges()
+        with self.timer.span("graph"):
+            components = split_into_components(edges, len(self.initial_primers))
+        del edges
+        large = [c for c in components if len(c[0]) > self.max_exact_size]
+        small = [c for c in components if 1 < len(c[0]) <= self.max_exact_size]
+        singles = [c for c in components if len(c[0]) == 1]
+        print(
+            f"{len(components)} components: {len(singles)} primers without conflicts, {len(small)} solved exactly, {len(large)} for {self.extractor_class.__name__} (biggest: {len(components[0][0]) if components else 0} primers)"
+        )
+
+        # Add primers that aren't in any conflict to the final list
+        self.found_new_primers(
+            [self.initial_primers[int(nodes[0])] for nodes, _ in singles]
+        )
+
+        for nodes, local_edges in small:
+            adjacency = [set() for _ in nodes]
+            for idx1, idx2 in local_edges.tolist():
+                adjacency[idx1].add(idx2)
+                adjacency[idx2].add(idx1)
+            with self.timer.span("mis"):
+                result = solve_mis(adjacency, verbose=False)
+            self.found_new_primers(
+                [self.initial_primers[int(nodes[idx])] for idx in result.nodes]
+            )
+        self.print_metrics()
+
+        jobs = [
+            ([self.initial_primers[idx] for idx in nodes.tolist()], local_edges)
+            for nodes, local_edges in large
+        ]
+        if self.workers <= 1 or len(jobs) <= 1:
+            results = (
+                _extract_component(self.extractor_class, primers, local_edges)
+                for primers, local_edges in jobs
+            )
+            for primers in results:
+                self.found_new_primers(primers)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(
+                _extract_component,
+                [self.extractor_class] * len(jobs),
+                [primers for primers, _ in jobs],
+                [local_edges for _, local_edges in jobs],
+            )
+            for primers in results:
+                self.found_new_primers(primers)
+
+
+def _extract_component(extractor_class, primers, edges):
+    """
+    Runs an extractor on one component: its primers and its edges (as positions in /primers/), returns the primers it keeps.
+    """
+    extractor = extractor_class(primers, workers=1)
+    extractor.edges = edges
+    extractor.start()
+    extractor.generate()
+    extractor.progress.stop(report=False)
+    return extractor.primers
+
+
+if __name__ == "__main__":
+    ComponentsPrimerExtractor().execute()
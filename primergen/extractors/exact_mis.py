@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+from primergen.common.check import *
+from primergen.common.graph_backend import get_adjacency
+from primergen.common.mis_solver import EXACT_MIS_TIME_BUDGET_SEC, solve_mis
+
+from .base import BasePrimerExtractor
+
+
+class ExactMisPrimerExtractor(BasePrimerExtractor):
+    """
+    Maximum independent set of the conflict graph, proven optimal if the solver finishes within the time budget.
+    Otherwise it keeps the best library found and reports how many primers short of optimal it might be.
+    """
+
+    def __init__(
+        self,
+        initial_primers=None,
+        target=TARGET_PRIMERS,
+        strategy="exact-mis",
+        workers=NUM_WORKERS,
+        time_budget_sec=EXACT_MIS_TIME_BUDGET_SEC,
+    ):
+        super().__init__(initial_primers, target, strategy, workers)
+        self.time_budget_sec = time_budget_sec
+        # Filled in by generate(): no library from this input has more primers than this
+        self.upper_bound = None
+
+    def generate(self):
+        # DeLOB: edges are between primers that are too close
+        edges = self.compute_edges()
+        with self.timer.span("graph"):
+            adjacency = get_adjacency(edges, len(self.initial_primers))
+        del edges
+
+        print(
+            f"Computing maximum independent set (time budget: {self.time_budget_sec} sec)..."
+        )
+        with self.timer.span("mis"):
+            result = solve_mis(adjacency, self.time_budget_sec)
+        self.upper_bound = result.upper_bound
+        if result.is_optimal():
+            print(f"Optimal: {len(result.nodes)} primers")
+        else:
+            print(
+                f"Ran out of time: {len(result.nodes)} primers, optimal is at most {result.upper_bound} (gap {result.gap()})"
+            )
+        self.found_new_primers([self.initial_primers[idx] for idx in result.nodes])
+
+    def is_result_complete(self):
+        # The solver didn't prove its library optimal if it ran out of time (the library's primers aren't part of the bound)
+        return (
+            self.upper_bound is None
+            or self.upper_bound <= len(self.primers) - self.num_library_primers
+        )
+
+
+if __name__ == "__main__":
+    ExactMisPrimerExtractor().execute()
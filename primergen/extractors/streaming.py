@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import itertools
+import math
+from importlib import resources
+
+import numpy
+from primergen.common.batch_filter import (
+    LIBRARY_COLUMNS_PER_TILE,
+    conflict_free_mask,
+    greedy_independent_mask,
+)
+from primergen.common.check import *
+from primergen.common.packed import INVALID_CODE, encode_primers, pack_codes
+from primergen.common.primer_store import PrimerStore, is_primer_store
+
+from .base import PRIMER_FILE, BasePrimerExtractor
+
+# Memory for the candidates being checked and the kernel's temporary arrays (the accepted library comes on top: 8 bytes per primer + the strings)
+MEMORY_BUDGET_BYTES = 256 * 1024**2
+# Rough memory per candidate read from the file: Python string and list slot, codes, packed primer
+BYTES_PER_CANDIDATE = 160
+# Memory per (candidate, library primer) pair in the kernel: int64 distance + bool
+BYTES_PER_PAIR = 9
+
+
+class StreamingGreedyPrimerExtractor(BasePrimerExtractor):
+    """
+    Same result as GreedyPrimerExtractor (keep each candidate that isn't too close to the ones kept before it, in order),
+    but reads candidates in chunks from a file or any iterable instead of loading them all, and never builds a conflict graph.
+    Memory is the accepted library plus a fixed budget, so candidate pools much bigger than RAM can be processed.
+    """
+
+    def __init__(
+        self,
+        source=None,
+        target=TARGET_PRIMERS,
+        strategy="streaming-greedy",
+        workers=NUM_WORKERS,
+        memory_budget_bytes=MEMORY_BUDGET_BYTES,
+    ):
+        """
+        source: path to a file with one primer per line or a primer store, or an iterable of primers (None = PRIMER_FILE).
+        """
+        self.source = source
+        super().__init__(None, target, strategy, workers)
+        # Half the budget for candidate chunks, half for the kernel
+        self.chunk_size = max(1, memory_budget_bytes // 2 // BYTES_PER_CANDIDATE)
+        # Candidates checked at a time: the biggest kernel call is rows x max(rows, library tile) pairs
+        self.batch_rows = max(
+            1,
+            min(
+                math.isqrt(memory_budget_bytes // 2 // BYTES_PER_PAIR),
+                memory_budget_bytes // 2 // (LIBRARY_COLUMNS_PER_TILE * BYTES_PER_PAIR),
+            ),
+        )
+
+    def get_primers(self):
+        # Candidates are streamed in generate(), nothing to load up front
+        return []
+
+    def iter_candidates(self):
+        if self.source is None:
+            with resources.open_text("primergen.input", PRIMER_FILE) as f:
+                yield from (line.strip() for line in f)
+        elif isinstance(self.source, str) and is_primer_store(self.source):
+            yield from PrimerStore(self.source)
+        elif isinstance(self.source, str):
+            with open(self.source, "r") as f:
+                yield from (line.strip() for line in f)
+        else:
+            yield from (str(primer) for primer in self.source)
+
+    def generate(self):
+        # Candidates read so far, out of all of them when the source knows its size (see progress.py)
+        if not isinstance(self.source, str) and hasattr(self.source, "__len__"):
+            self.progress_total = len(self.source)
+        candidates = self.iter_candidates()
+        while len(self.primers) < self.target:
+            chunk = [
+                primer
+                for primer in itertools.islice(candidates, self.chunk_size)
+                if primer
+            ]
+            if not chunk:
+                break
+            self.num_starting_primers += len(chunk)
+            self.iterations += len(chunk)
+            self.progress_done = self.num_starting_primers
+
+            # Only primers with the right length and GC content, made of ACGT (so they can be packed)
+            valid = is_len_gc_valid_batch(chunk)
+            chunk = [primer for primer, ok in zip(chunk, valid) if ok]
+            codes = encode_primers(chunk, PRIMER_LENGTH)
+            packable = ~(codes == INVALID_CODE).any(axis=1)
+            self.gc_errors += len(valid) - int(packable.sum())
+            chunk = [primer for primer, ok in zip(chunk, packable) if ok]
+            packed = pack_codes(codes[packable])
+
+            # Greedy in file order: not too close to the accepted library (including earlier batches), nor to earlier primers in the batch
+            for row in range(0, len(packed), self.batch_rows):
+                if len(self.primers) >= self.target:
+                    break
+                batch = packed[row : row + self.batch_rows]
+                with self.timer.span("edit-distance"):
+                    survivors = numpy.flatnonzero(
+                        conflict_free_mask(batch, self.get_packed_primers())
+                    )
+                    survivors = survivors[greedy_independent_mask(batch[survivors])]
+                survivors = survivors[: self.target - len(self.primers)]
+                self.edit_errors += len(batch) - len(survivors)
+                if len(survivors):
+                    super().found_new_primers(
+                        [chunk[row + idx] for idx in survivors.tolist()]
+                    )
+
+
+if __name__ == "__main__":
+    StreamingGreedyPrimerExtractor().execute()
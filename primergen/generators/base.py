@@ -1,12 +1,36 @@
 #!/usr/bin/env python3
 import time
 import random
+import inspect
 import numpy
 from primergen.common.check import *
 from primergen.common.util import write_primers, random_primer
+from primergen.common.library_index import LibraryIndex
+from primergen.common.batch_filter import (
+    SharedLibrary,
+    conflict_free_mask,
+    greedy_independent_mask,
+    iter_screened_batches,
+)
+from primergen.common.packed import pack_primers, unpack_primers
+from primergen.common.primer_store import PrimerStore, load_primers
+from primergen.common.profiling import PhaseTimer
+from primergen.common.progress import ProgressReporter, get_sink
+from primergen.common.result_cache import (
+    get_primers_hash,
+    get_result_key,
+    get_result_path,
+    load_result,
+    save_result,
+)
+from primergen.common.sampling import CANDIDATE_BATCH_SIZE, MIN_CANDIDATE_BATCH_SIZE
+from primergen.common.validation import INVALID, UNKNOWN, VALID, validate_primers
 
-
-PRIMERS_PER_SECOND_PERIOD_SEC = 1
+# Seed every generator starts from (extractors have their own, see extractors/base.py)
+RANDOM_SEED = 246
+NP_RANDOM_SEED = 4812
+# Constructor arguments that don't change the library a strategy finds, left out of its result cache key
+RESULT_CACHE_IGNORED_ARGS = ("initial_primers", "source", "workers")
 
 
 class BasePrimerGenerator:
@@ -15,45 +39,157 @@ class BasePrimerGenerator:
     Helps to unify metrics to compare different primer generation methods, saving to file, etc.
     """
 
-    def __init__(self, target=TARGET_PRIMERS, strategy="base"):
+    def __init__(
+        self, target=TARGET_PRIMERS, strategy="base", batch_size=None, workers=1
+    ):
         self.target = target
+        # Batch-then-filter mode: check /batch_size/ candidates at a time against the library (None = one at a time)
+        self.batch_size = batch_size
+        # Processes screening batches in batch-then-filter mode (1 = all in this process)
+        self.workers = workers
+        if batch_size:
+            strategy += f"-batch{batch_size}"
+            if workers > 1:
+                strategy += f"-workers{workers}"
         # Subclass updates this if they start with a big list of primers and cut them down to find the final list
         self.num_starting_primers = 0
         self.primers = []
+        # Index over self.primers to check new candidates against the accepted library quickly, see get_primer_index
+        self.primer_index = LibraryIndex()
         self.iterations = 1
         self.gc_errors = 0
         self.edit_errors = 0
         self.strategy = strategy
-        # Tracking primers per second
-        self.prev_primers_time = 0
-        self.prev_primers_count = 0
-        self.primers_per_second = 0
         # Times that primers were found
-        # Expect list of tuples, each tuple is (time, number of primers)
+        # Expect list of tuples, each tuple is (wall-clock sec since start, number of primers)
         self.primer_found_times = []
+        # Time spent in each phase (e.g., edges, graph, edit-distance, validation), see profiling.py
+        self.timer = PhaseTimer(PROFILER)
+        # Progress of the current loop (e.g., nodes removed out of all nodes), for the ETA. Plain ints: the loops only assign them
+        self.progress_done = 0
+        self.progress_total = None
+        # Reports progress from a background thread (see progress.py)
+        self.progress = ProgressReporter(self, get_sink(PROGRESS_SINK))
+        # Current batch of candidates from a batch sampler (see next_candidate)
+        self.candidates = []
+        self.candidates_gc_valid = []
+        self.next_candidate_idx = 0
+        self.candidate_batch_size = MIN_CANDIDATE_BATCH_SIZE
+        # Packed copy of self.primers for the batched kernel, see get_packed_primers
+        self.packed_primers = numpy.zeros(0, dtype=numpy.uint64)
+        # Existing library this run adds to (see extend): its size and hash
+        self.num_library_primers = 0
+        self.library_hash = None
 
         # Seed random same for all extractors
-        random.seed(246)
-        numpy.random.seed(4812)
+        self.seeds = (RANDOM_SEED, NP_RANDOM_SEED)
+        random.seed(RANDOM_SEED)
+        numpy.random.seed(NP_RANDOM_SEED)
 
-    def execute(self):
+    def execute(self, recompute=False):
         """
         Method to call by any runners (e.g., main methods).
-        Starts stats, runs generate(), then finishes up and writes to file
+        Starts stats, runs generate(), then finishes up and writes to file. Returns the primers.
+        If the result cache (USE_RESULT_CACHE) has the library of an earlier run with the same input, strategy, seeds and code,
+        returns that one right away instead (it was validated before it was stored). recompute=True runs anyway and replaces it.
         """
+        key = self.get_result_cache_key() if USE_RESULT_CACHE else None
+        if key is not None and not recompute:
+            primers = load_result(key)
+            if primers is not None:
+                print(
+                    f"Loaded {len(primers)} primers from result cache {get_result_path(key)}, not running {self.strategy}"
+                )
+                self.primers = primers
+                return self.primers
+
         self.start()
+        interrupted = False
         try:
-            self.generate()
+            with self.timer.span("generate"):
+                self.generate()
         except KeyboardInterrupt:
             print(f"Exited early with {len(self.primers)} primers!")
-        self.finish()
+            interrupted = True
+        report = self.finish()
+
+        # Only complete, valid libraries are worth reusing
+        if (
+            key is not None
+            and not interrupted
+            and self.is_result_complete()
+            and report.verdict == VALID
+        ):
+            try:
+                path = save_result(key, self.primers)
+                print(f"Saved primers to result cache {path}")
+            except ValueError as e:
+                print(f"Not saving primers to result cache: {e}")
+        return self.primers
+
+    def is_result_complete(self):
+        """
+        False if the strategy stopped before it was done (e.g., a solver that ran out of time): that library depends on
+        the machine's speed, so execute() doesn't store it in the result cache. Subclasses that can stop early override this.
+        """
+        return True
+
+    def extend(self, library):
+        """
+        Adds to an existing (valid) library instead of starting from an empty one: /library/ is a list of primers,
+        or the path of a text file (one primer per line) or primer store. Call before execute(), returns self.
+        The library is indexed once, new primers are checked against it, and it's part of the final library
+        (generators stop once the whole library has /target/ primers).
+        """
+        if isinstance(library, str):
+            library = load_primers(library)
+        with self.timer.span("library-index"):
+            if isinstance(library, PrimerStore):
+                # Already packed
+                self.packed_primers = numpy.asarray(library.packed)
+            self.primers = list(library)
+            self.primer_index = LibraryIndex()
+            self.get_packed_primers()
+        self.num_library_primers = len(self.primers)
+        self.library_hash = get_primers_hash(self.primers)
+        print(f"Extending a library of {self.num_library_primers} primers")
+        return self
+
+    def get_result_cache_params(self):
+        """
+        Everything about this run that changes the library it finds, except the input (see get_result_cache_key)
+        """
+        params = {
+            "strategy": self.strategy,
+            "class": f"{type(self).__module__}.{type(self).__name__}",
+            "target": self.target,
+            "seeds": list(self.seeds),
+            "library": self.library_hash,
+        }
+        # Strategy options, e.g., batch_size or time_budget_sec, stored on the instance under the argument's name
+        for name in inspect.signature(type(self)).parameters:
+            if name in RESULT_CACHE_IGNORED_ARGS or name in params:
+                continue
+            value = getattr(self, name, None)
+            if not isinstance(value, (bool, int, float, str, type(None))):
+                value = repr(value)
+            params[name] = value
+        return params
+
+    def get_result_cache_key(self):
+        """
+        Key of this run in the result cache (see result_cache.py), None if it can't be cached
+        """
+        return get_result_key(None, self.get_result_cache_params())
 
     def start(self):
         """
         Call just before starting primer generation
         """
-        self.start_time = time.process_time()
-        self.prev_primers_time = self.start_time
+        self.timer.start()
+        # Wall clock: graph extractors and batch generators do most of their work in other processes
+        self.start_time = self.timer.start_wall_time
+        self.progress.start()
         # Log the start time of the algorithm so algorithms that generate primers MUCH later in the cycle don't look unfairly good
         self.log_new_primer_time()
 
@@ -65,38 +201,53 @@ class BasePrimerGenerator:
 
     def finish(self):
         """
-        Call after filling up primer list
+        Call after filling up primer list, returns the validation report
         """
         # Timing stats
-        end_time = time.process_time()
-        total_time = end_time - self.start_time
+        total_time = time.perf_counter() - self.start_time
+        self.progress.stop()
 
         # Print stats
-        print(f"Total time (sec): {total_time}")
+        print(f"Total time (sec): {total_time} (CPU: {self.timer.cpu_sec()})")
         print("Primers:")
         print(self.primers)
 
         # Write all primers and the times they were found to file
-        write_primers(
-            self.primers,
-            self.primer_found_times,
-            num_starting_primers=self.num_starting_primers,
-            total_time_sec=total_time,
-            strategy=self.strategy,
-        )
+        with self.timer.span("write"):
+            path_without_ext = write_primers(
+                self.primers,
+                self.primer_found_times,
+                num_starting_primers=self.num_starting_primers,
+                total_time_sec=total_time,
+                strategy=self.strategy,
+            )
 
         # Check the primers for errors (after writing, so we can check it ourselves later)
         print(f"Validating primers after saving...")
-        valid = are_primers_valid(self.primers)
-        if not valid:
+        with self.timer.span("validation"):
+            report = validate_primers(
+                self.primers, time_budget_sec=VALIDATION_TIME_BUDGET_SEC
+            )
+        report.print_summary()
+
+        # Where the time went, next to the primers
+        self.timer.stop()
+        self.timer.print_summary()
+        self.timer.write_json(path_without_ext + "-phases.json")
+        if report.verdict == INVALID:
             print(
                 "ERROR: Found invalid primers in final library! Error with algorithm."
             )
+        elif report.verdict == UNKNOWN:
+            print(
+                f"WARNING: Could not check all primer pairs in {VALIDATION_TIME_BUDGET_SEC} sec, library is unverified."
+            )
         else:
             print("Primers validated (all good) before writing!")
             print(
                 f"Produced {len(self.primers)} primers in {total_time} in {self.strategy} mode"
             )
+        return report
 
     def found_new_primer(self, primer):
         """
@@ -112,6 +263,145 @@ class BasePrimerGenerator:
         self.primers.extend(primers)
         self.log_new_primer_time()
 
+    def conflicts_with_primers(self, primer):
+        """
+        True if the primer is too close in edit distance to any primer found so far
+        """
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        conflict = self.get_primer_index().has_conflict(primer)
+        self.timer.add(
+            "edit-distance",
+            wall_sec=time.perf_counter() - start_wall,
+            cpu_sec=time.process_time() - start_cpu,
+        )
+        return conflict
+
+    def generate_in_batches(self, sample_batch, on_accepted=None):
+        """
+        Batch-then-filter generation loop: draws /batch_size/ packed candidates with sample_batch(n),
+        drops the ones with invalid GC content or too close to the library, resolves conflicts inside the batch greedily (in batch order),
+        then accepts all the survivors at once and calls on_accepted(primers) with them.
+        With workers > 1, batches are screened against the library in worker processes (see generate_in_batches_parallel).
+        Deterministic for a given batch size, number of workers and seed.
+        """
+        if self.workers > 1:
+            self.generate_in_batches_parallel(sample_batch, on_accepted)
+            return
+        while len(self.primers) < self.target:
+            with self.timer.span("sampling"):
+                packed = sample_batch(self.batch_size)
+            self.accept_batch(packed, on_accepted=on_accepted)
+
+    def generate_in_batches_parallel(self, sample_batch, on_accepted=None):
+        """
+        Worker processes screen batches against a snapshot of the library in shared memory (the expensive part),
+        this process draws the batches (cheap) and commits: it only checks the survivors against primers accepted since their snapshot.
+        """
+        library = SharedLibrary(max(self.target, len(self.primers)))
+        library.extend(self.get_packed_primers())
+        batches = iter_screened_batches(
+            sample_batch, self.batch_size, library, self.workers
+        )
+        try:
+            for packed, library_free, library_size in batches:
+                library.extend(
+                    self.accept_batch(packed, library_free, library_size, on_accepted)
+                )
+                if len(self.primers) >= self.target:
+                    break
+        finally:
+            batches.close()
+            library.close()
+
+    def accept_batch(self, packed, library_free=None, library_size=0, on_accepted=None):
+        """
+        Filters a batch of packed candidates and accepts the survivors, returns them (packed).
+        library_free (optional) marks the candidates already known not to conflict with the first /library_size/ primers,
+        so only the primers after those are checked here.
+        """
+        self.iterations += len(packed)
+
+        # Check for GC content
+        gc_valid = is_gc_valid_packed(packed)
+        self.gc_errors += int((~gc_valid).sum())
+        if library_free is not None:
+            packed = packed[gc_valid & library_free]
+        else:
+            packed = packed[gc_valid]
+        # Check for edit distance, against the library then inside the batch
+        with self.timer.span("edit-distance"):
+            packed = packed[
+                conflict_free_mask(packed, self.get_packed_primers()[library_size:])
+            ]
+            packed = packed[greedy_independent_mask(packed)]
+        packed = packed[: self.target - len(self.primers)]
+        self.edit_errors += int(gc_valid.sum()) - len(packed)
+
+        primers = unpack_primers(packed, PRIMER_LENGTH)
+        if primers:
+            self.found_new_primers(primers)
+            if on_accepted:
+                on_accepted(primers)
+        return packed
+
+    def get_primer_index(self):
+        """
+        Index over self.primers (see library_index.py), only indexing the ones added since the last call.
+        Built on first use: strategies that never call conflicts_with_primers (e.g., graph extractors) don't pay for it.
+        """
+        for primer in self.primers[len(self.primer_index) :]:
+            self.primer_index.add(primer)
+        return self.primer_index
+
+    def get_packed_primers(self):
+        """
+        self.primers as packed primers (see packed.py), only packing the ones added since the last call
+        """
+        if len(self.packed_primers) < len(self.primers):
+            self.packed_primers = numpy.concatenate(
+                [
+                    self.packed_primers,
+                    pack_primers(
+                        self.primers[len(self.packed_primers) :], PRIMER_LENGTH
+                    ),
+                ]
+            )
+        return self.packed_primers
+
+    def next_candidate(self, sample_batch):
+        """
+        Returns (primer, whether its GC content is valid) for the next candidate of the current batch.
+        When the batch runs out, draws a new one with sample_batch(n), which returns n packed primers (see sampling.py).
+        Batches double in size (up to CANDIDATE_BATCH_SIZE) each time one gets used up.
+        """
+        if self.next_candidate_idx >= len(self.candidates):
+            if self.candidates:
+                self.candidate_batch_size = min(
+                    CANDIDATE_BATCH_SIZE, 2 * self.candidate_batch_size
+                )
+            with self.timer.span("sampling"):
+                packed = sample_batch(self.candidate_batch_size)
+            self.candidates = unpack_primers(packed, PRIMER_LENGTH)
+            self.candidates_gc_valid = is_gc_valid_packed(packed).tolist()
+            self.next_candidate_idx = 0
+        idx = self.next_candidate_idx
+        self.next_candidate_idx += 1
+        return self.candidates[idx], self.candidates_gc_valid[idx]
+
+    def discard_candidates(self):
+        """
+        Drops the rest of the current batch, e.g. when the distribution candidates are drawn from changed.
+        The next batch is sized after how much of this one was used, so we don't keep drawing candidates we throw away.
+        """
+        self.candidate_batch_size = max(
+            MIN_CANDIDATE_BATCH_SIZE,
+            min(CANDIDATE_BATCH_SIZE, 2 * self.next_candidate_idx),
+        )
+        self.candidates = []
+        self.candidates_gc_valid = []
+        self.next_candidate_idx = 0
+
     def new_iteration(self):
         self.iterations += 1
 
@@ -123,27 +413,26 @@ class BasePrimerGenerator:
 
     def log_new_primer_time(self):
         # Add the new observation to the list
-        cur_time = time.process_time()
-        total_time = cur_time - self.start_time
-        self.primer_found_times.append((cur_time, len(self.primers)))
+        elapsed_sec = time.perf_counter() - self.start_time
+        self.primer_found_times.append((elapsed_sec, len(self.primers)))
 
     def print_metrics(self):
-        # Elapsed
-        cur_time = time.process_time()
-        elapsed_sec = cur_time - self.start_time
-        elapsed_min = int(elapsed_sec / 60)
-        elapsed_min_sec = int(elapsed_sec % 60)
-        # Count primers per second
-        if cur_time - self.prev_primers_time > PRIMERS_PER_SECOND_PERIOD_SEC:
-            # We've passed the period we want to compute PPS for
-            current_num_primers = len(self.primers)
-            self.primers_per_second = round(
-                (current_num_primers - self.prev_primers_count)
-                / (cur_time - self.prev_primers_time),
-                2,
-            )
-            self.prev_primers_time = cur_time
-            self.prev_primers_count = current_num_primers
-        print(
-            f"Strategy:{self.strategy}\nCPU Elapsed: {elapsed_min} min {elapsed_min_sec} sec\tIteration: {self.iterations}\tPrimers: {len(self.primers)}\tPPS: {self.primers_per_second}\tPPI%: {round(len(self.primers)/self.iterations * 100, 5)}\tGC invalid: {self.gc_errors}\tEdit invalid\t{self.edit_errors} ({round(self.edit_errors /  self.iterations * 100, 5)}%)\n"
-        )
+        """
+        Reports progress right away (the progress thread also does every PROGRESS_INTERVAL_SEC)
+        """
+        self.progress.report()
+
+    def get_progress_state(self):
+        """
+        Snapshot of the counters, read by the progress thread
+        """
+        return {
+            "strategy": self.strategy,
+            "elapsed_sec": time.perf_counter() - self.start_time,
+            "iterations": self.iterations,
+            "primers": len(self.primers),
+            "gc_errors": self.gc_errors,
+            "edit_errors": self.edit_errors,
+            "done": self.progress_done,
+            "total": self.progress_total,
+        }
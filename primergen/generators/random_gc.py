@@ -7,40 +7,42 @@ import re
 
 import networkx as nx
 from primergen.common.check import *
-from primergen.common.util import (
-    random_primer_with_balanced_gc,
-)
+from primergen.common.sampling import random_primers_with_balanced_gc_batch
 from primergen.common.graph_utils import *
 
 from .base import BasePrimerGenerator
 
 
 class RandomBalancedGCPrimerGenerator(BasePrimerGenerator):
-    def __init__(self, target=TARGET_PRIMERS):
-        super().__init__(target=target, strategy="random-balanced-gc")
+    def __init__(self, target=TARGET_PRIMERS, batch_size=None, workers=1):
+        super().__init__(
+            target=target,
+            strategy="random-balanced-gc",
+            batch_size=batch_size,
+            workers=workers,
+        )
 
     def generate(self):
+        if self.batch_size:
+            super().generate_in_batches(random_primers_with_balanced_gc_batch)
+            return
         while len(self.primers) < self.target:
             # Stats
             super().new_iteration()
             self.iterations += 1
-            super().print_metrics()
 
             # Create new primer
-            primer = random_primer_with_balanced_gc()
-            print(primer)
+            primer, gc_valid = super().next_candidate(
+                random_primers_with_balanced_gc_batch
+            )
 
             # Check for GC content
-            if not is_gc_valid(primer):
+            if not gc_valid:
                 super().new_gc_error()
                 continue
             # Check for edit distance
-            for other_primer in self.primers:
-                if not is_primer_pair_valid(
-                    primer, other_primer, limit=MIN_EDIT_DISTANCE
-                ):
-                    super().new_edit_error()
-                    break
+            if super().conflicts_with_primers(primer):
+                super().new_edit_error()
             else:
                 super().found_new_primer(primer)
 
@@ -7,14 +7,14 @@ import re
 
 import networkx as nx
 from primergen.common.check import *
-from primergen.common.util import (
-    generate_primer_from_frequencies_and_balanced_gc,
-    generate_primer_from_frequencies_and_balanced_gc_by_rerolling,
-)
+from primergen.common.sampling import primers_from_frequencies_batch
 from primergen.common.graph_utils import *
 
 from .base import BasePrimerGenerator
 
+# Nucleotide order of the weights from counts_to_inverse_frequencies
+INVERSE_FREQUENCIES_ORDER = "ATGC"
+
 """
 TODO: New strings are generated based on the inverse of the current frequencies for each position. Fix GC after.
 The hope is that we get a string that is as different as possible from the rest.
@@ -32,43 +32,55 @@ TODO: store all the primer to primer distances in a file so we can plot a force
 
 
 class RandomBalancedGCFrequenciesPrimerGenerator(BasePrimerGenerator):
-    def __init__(self, target=TARGET_PRIMERS):
-        super().__init__(target=target, strategy="random-balanced-gc-frequencies")
+    def __init__(self, target=TARGET_PRIMERS, batch_size=None, workers=1):
+        super().__init__(
+            target=target,
+            strategy="random-balanced-gc-frequencies",
+            batch_size=batch_size,
+            workers=workers,
+        )
         # Frequencies for each position in the primer
         self.counts = [{"A": 1, "T": 1, "G": 1, "C": 1} for i in range(PRIMER_LENGTH)]
 
     def generate(self):
+        if self.batch_size:
+            super().generate_in_batches(
+                lambda n: primers_from_frequencies_batch(
+                    self.counts_to_inverse_frequencies(),
+                    n=n,
+                    alphabet=INVERSE_FREQUENCIES_ORDER,
+                    reroll=True,
+                ),
+                on_accepted=self.update_counts_from_new_primers,
+            )
+            return
         while len(self.primers) < self.target:
             # Stats
             self.iterations += 1
-            super().print_metrics()
-
-            # Get an inverse of the current frequencies so we can generate an "as different as possible" primer
-            inv_frequencies = self.counts_to_inverse_frequencies()
-            # print(self.counts)
-            # print(inv_frequencies)
 
-            # Create new primer
-            primer = generate_primer_from_frequencies_and_balanced_gc_by_rerolling(
-                frequencies=inv_frequencies
+            # Create new primer, from a batch drawn with the inverse of the current frequencies so we can generate an "as different as possible" primer
+            primer, gc_valid = super().next_candidate(
+                lambda n: primers_from_frequencies_batch(
+                    self.counts_to_inverse_frequencies(),
+                    n=n,
+                    alphabet=INVERSE_FREQUENCIES_ORDER,
+                    reroll=True,
+                )
             )
-            print(primer)
 
             # Check for GC content
-            if not is_gc_valid(primer):
+            if not gc_valid:
                 super().new_gc_error()
                 continue
             # Check for edit distance
-            for other_primer in self.primers:
-                if not is_primer_pair_valid(
-                    primer, other_primer, limit=MIN_EDIT_DISTANCE
-                ):
-                    super().new_edit_error()
-                    break
+            if super().conflicts_with_primers(primer):
+                super().new_edit_error()
             else:
                 super().found_new_primer(primer)
                 # Update frequency counts for each position from the new primer
                 self.update_counts_from_new_primer(primer)
+                # The rest of the batch was drawn from the old frequencies
+                super().discard_candidates()
 
     def update_counts_from_new_primer(self, primer):
         # Increase the count for the nucleotide in each position as necessary
@@ -77,6 +89,16 @@ class RandomBalancedGCFrequenciesPrimerGenerator(BasePrimerGenerator):
             self.counts[idx][nt] = self.counts[idx][nt] + 1
         # print(f"Finished updating, final result {self.counts}")
 
+    def update_counts_from_new_primers(self, primers):
+        for primer in primers:
+            self.update_counts_from_new_primer(primer)
+
+    def extend(self, library):
+        super().extend(library)
+        # New primers should differ from the library's too
+        self.update_counts_from_new_primers(self.primers)
+        return self
+
     def counts_to_inverse_frequencies(self):
         """
         Given the raw frequency counts, generate weights for random.choice that prefers the /least/ frequent elements.
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from primergen.common.batch_filter import (
+    SharedLibrary,
+    conflict_free_mask,
+    greedy_independent_mask,
+    iter_screened_batches,
+)
+from primergen.common.check import get_edit_distance_with_limit
+from primergen.common.packed import pack_primers
+from primergen.common.validation import validate_primers
+from primergen.generators.random_gc import RandomBalancedGCPrimerGenerator
+from importlib import resources
+import unittest
+
+
+class TestBatchFilter(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.packed = pack_primers(self.primers, 20)
+
+    def too_close(self, p1, p2):
+        return get_edit_distance_with_limit(p1, p2, limit=8) < 8
+
+    def test_conflict_free_mask(self):
+        candidates, library = self.primers[:80], self.primers[80:]
+        mask = conflict_free_mask(
+            self.packed[:80], self.packed[80:], columns_per_tile=16
+        )
+        for candidate, free in zip(candidates, mask.tolist()):
+            self.assertEqual(
+                free, not any(self.too_close(candidate, p) for p in library)
+            )
+        # Empty library: everything is free
+        self.assertTrue(conflict_free_mask(self.packed, self.packed[:0]).all())
+
+    def test_greedy_independent_mask(self):
+        keep = greedy_independent_mask(self.packed)
+        kept = []
+        for primer, kept_primer in zip(self.primers, keep.tolist()):
+            # Kept exactly when it doesn't conflict with an earlier kept primer
+            self.assertEqual(
+                kept_primer, not any(self.too_close(primer, p) for p in kept)
+            )
+            if kept_primer:
+                kept.append(primer)
+
+    def test_generator_batch_mode(self):
+        libraries = []
+        for _ in range(2):
+            generator = RandomBalancedGCPrimerGenerator(target=300, batch_size=128)
+            generator.start()
+            generator.generate()
+            libraries.append(generator.primers)
+        self.assertEqual(len(libraries[0]), 300)
+        self.assertTrue(validate_primers(libraries[0], workers=1).is_valid())
+        # Same batch size and seed, same library
+        self.assertEqual(libraries[0], libraries[1])
+
+    def test_screened_batches_match_serial(self):
+        library = SharedLibrary(len(self.packed))
+        library.extend(self.packed[:50])
+        batches = iter(
+            [self.packed[50:100], self.packed[100:150], self.packed[150:200]] * 2
+        )
+        screened = iter_screened_batches(lambda n: next(batches), 50, library, 2)
+        try:
+            for _ in range(3):
+                packed, library_free, library_size = next(screened)
+                self.assertEqual(library_size, 50)
+                self.assertEqual(
+                    library_free.tolist(),
+                    conflict_free_mask(packed, self.packed[:50]).tolist(),
+                )
+        finally:
+            screened.close()
+            library.close()
+
+    def test_generator_parallel_mode(self):
+        libraries = []
+        for _ in range(2):
+            generator = RandomBalancedGCPrimerGenerator(
+                target=300, batch_size=128, workers=2
+            )
+            generator.start()
+            generator.generate()
+            libraries.append(generator.primers)
+        self.assertEqual(len(libraries[0]), 300)
+        self.assertTrue(validate_primers(libraries[0], workers=1).is_valid())
+        self.assertEqual(libraries[0], libraries[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+from primergen.benchmark import (
+    compare_results,
+    get_configs,
+    load_results,
+    run_benchmarks,
+    write_results,
+)
+import copy
+import os
+import tempfile
+import unittest
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_configs(self):
+        configs = get_configs(
+            ["greedy", "random_gc"],
+            sizes=[100, 200],
+            seeds=[1, 2],
+            workers=[1, 2],
+            target=10,
+            batch_size=None,
+            repeat=1,
+        )
+        # Extractors: 2 sizes x 2 seeds x 2 workers, generators ignore sizes
+        self.assertEqual(len(configs), 8 + 4)
+        self.assertEqual(
+            {
+                config["input_size"]
+                for config in configs
+                if config["kind"] == "generator"
+            },
+            {None},
+        )
+        with self.assertRaises(ValueError):
+            get_configs(["greedy"], [123], [None], [1], 10, None, 1)
+
+    def test_run_and_compare(self):
+        configs = get_configs(["greedy", "random_gc"], [100], [7], [1], 10, None, 1)
+        runs = run_benchmarks(configs)
+        self.assertFalse([run for run in runs if "error" in run])
+        greedy, generator = runs
+        self.assertEqual(greedy["primers"], 96)
+        self.assertEqual(greedy["per"], 96.0)
+        self.assertEqual(generator["primers"], 10)
+        self.assertIsNone(generator["per"])
+        for run in runs:
+            self.assertGreater(run["wall_sec"], 0)
+            self.assertGreater(run["peak_rss_mb"], 0)
+            self.assertEqual(run["found_times"][-1][1], run["primers"])
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = write_results(runs, os.path.join(folder, "results.json"))
+            baseline = load_results(path)
+        self.assertEqual(baseline["runs"], runs)
+        rows = compare_results(baseline, baseline)
+        self.assertEqual(len(rows), 2)
+        self.assertFalse([row for row in rows if row["regression"]])
+
+        slower = copy.deepcopy(baseline)
+        slower["runs"][0]["wall_sec"] *= 2
+        fewer = copy.deepcopy(baseline)
+        fewer["runs"][1]["primers"] -= 1
+        for new in (slower, fewer):
+            rows = compare_results(baseline, new)
+            self.assertEqual(sum(row["regression"] for row in rows), 1)
+        self.assertTrue(compare_results(slower, baseline)[0]["faster"])
+
+
+if __name__ == "__main__":
+    unittest.main()
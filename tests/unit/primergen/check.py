@@ -1,7 +1,18 @@
 #!/usr/bin/env python3
 
-from primergen.check import is_right_length, is_gc_valid, are_primers_valid
+from primergen.common.check import (
+    is_right_length,
+    is_gc_valid,
+    is_len_gc_valid,
+    is_len_gc_valid_batch,
+    is_gc_valid_packed,
+    are_primers_valid,
+)
+from primergen.common.packed import pack_primers, unpack_primers
+from primergen.common.validation import INVALID, UNKNOWN, VALID, validate_primers
+from primergen.common.util import random_primer
 from Bio.Seq import Seq
+import random
 import unittest
 
 
@@ -41,6 +52,51 @@ class TestCheckMethods(unittest.TestCase):
         s2 = Seq("ATGC" * 5)
         self.assertFalse(are_primers_valid([s1, s2]))
 
+    def test_batch_matches_single(self):
+        random.seed(1)
+        primers = [random_primer() for _ in range(2000)]
+        primers += [
+            "ATGCA" * 3,
+            "ATGCA" * 5,
+            "atgcgcatgcatgcatatgc",
+            "ATGCNNATGCATGCATATGC",
+        ]
+        expected = [is_len_gc_valid(primer) for primer in primers]
+        self.assertEqual(list(is_len_gc_valid_batch(primers)), expected)
+
+    def test_packed_gc_matches_single(self):
+        random.seed(2)
+        primers = [random_primer() for _ in range(2000)]
+        packed = pack_primers(primers, 20)
+        self.assertEqual(unpack_primers(packed, 20), primers)
+        expected = [is_gc_valid(primer) for primer in primers]
+        self.assertEqual(list(is_gc_valid_packed(packed)), expected)
+
+    def test_report_all_violations(self):
+        s1 = "ATGC" * 5
+        s2 = "GCTA" * 5
+        primers = [s1, s2, s1, "A" * 20, s2]
+        report = validate_primers(primers, report_all=True)
+        self.assertEqual(report.verdict, INVALID)
+        self.assertEqual(report.bad_primers, [3])
+        self.assertEqual(report.too_close_pairs, [(0, 2), (1, 4)])
+
+    def test_first_violation_only(self):
+        s1 = "ATGC" * 5
+        s2 = "GCTA" * 5
+        report = validate_primers([s1, s2, s1, s2])
+        self.assertEqual(report.verdict, INVALID)
+        self.assertEqual(report.too_close_pairs, [(0, 2)])
+
+    def test_time_budget(self):
+        primers = ["ATGC" * 5, "GCTA" * 5, "CGTA" * 5]
+        report = validate_primers(primers, time_budget_sec=0, pairs_per_block=1)
+        self.assertEqual(report.verdict, UNKNOWN)
+        self.assertLess(report.pairs_checked, report.total_pairs)
+        report = validate_primers(primers)
+        self.assertEqual(report.verdict, VALID)
+        self.assertEqual(report.pairs_checked, report.total_pairs)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.edge_cache import edges_to_array
+from primergen.common.graph_utils import split_into_components
+from primergen.common.validation import validate_primers
+from primergen.extractors.components import ComponentsPrimerExtractor
+from primergen.extractors.delob_min_degree import DelobMinDegreePrimerExtractor
+from tests.unit.primergen.scratch import ScratchDirTestCase
+from importlib import resources
+import unittest
+
+
+class TestComponents(ScratchDirTestCase):
+    def setUp(self):
+        super().setUp()
+        with resources.open_text(
+            "primergen.input", "20211206-101224-500-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.edges = edges_to_array(get_conflict_edges(self.primers, workers=1))
+
+    def run_extractor(self, extractor):
+        extractor.start()
+        extractor.generate()
+        return extractor.primers
+
+    def test_split_into_components(self):
+        components = split_into_components(self.edges, len(self.primers))
+        sizes = [len(nodes) for nodes, _ in components]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertEqual(sum(sizes), len(self.primers))
+        # Every edge ends up in exactly one component, in the same order
+        global_edges = []
+        for nodes, local_edges in components:
+            self.assertEqual(nodes.tolist(), sorted(nodes.tolist()))
+            global_edges.extend(map(tuple, nodes[local_edges].tolist()))
+        self.assertEqual(sorted(global_edges), list(map(tuple, self.edges.tolist())))
+
+    def test_extractor(self):
+        expected = self.run_extractor(
+            DelobMinDegreePrimerExtractor(self.primers, workers=1)
+        )
+        libraries = []
+        for workers in (1, 2):
+            # Small exact limit, so big components go through the heuristic too
+            extractor = ComponentsPrimerExtractor(
+                self.primers, workers=workers, max_exact_size=6
+            )
+            self.assertEqual(extractor.strategy, "components-delob-min-degree")
+            libraries.append(self.run_extractor(extractor))
+        self.assertEqual(libraries[0], libraries[1])
+        self.assertTrue(validate_primers(libraries[0], workers=1).is_valid())
+        # By default every component here is small enough to be solved exactly
+        optimal = self.run_extractor(ComponentsPrimerExtractor(self.primers, workers=1))
+        self.assertEqual(len(optimal), 388)
+        self.assertGreaterEqual(len(optimal), len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+from primergen.common.check import MIN_EDIT_DISTANCE, get_edit_distance_with_limit
+from primergen.common.conflict_graph import get_conflict_edges, get_row_blocks
+from importlib import resources
+import itertools
+import unittest
+
+
+def brute_force_edges(primers, far=False):
+    return [
+        (i, j)
+        for (i, p1), (j, p2) in itertools.combinations(enumerate(primers), 2)
+        if (
+            get_edit_distance_with_limit(p1, p2, MIN_EDIT_DISTANCE) >= MIN_EDIT_DISTANCE
+        )
+        == far
+    ]
+
+
+class TestConflictGraph(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+
+    def test_row_blocks_cover_all_rows(self):
+        blocks = get_row_blocks(200, pairs_per_block=1000)
+        self.assertEqual(blocks[0][0], 0)
+        self.assertEqual(blocks[-1][1], 199)
+        for (_, stop), (start, _) in zip(blocks, blocks[1:]):
+            self.assertEqual(stop, start)
+
+    def test_serial_matches_brute_force(self):
+        edges = get_conflict_edges(self.primers, workers=1, pairs_per_block=1000)
+        self.assertEqual(edges, brute_force_edges(self.primers))
+
+    def test_parallel_matches_serial(self):
+        serial = get_conflict_edges(self.primers, workers=1)
+        parallel = get_conflict_edges(self.primers, workers=3, pairs_per_block=1000)
+        self.assertEqual(serial, parallel)
+
+    def test_far_edges_are_complement(self):
+        far = get_conflict_edges(
+            self.primers, workers=2, far=True, pairs_per_block=1000
+        )
+        self.assertEqual(far, brute_force_edges(self.primers, far=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.csr_graph import CSRGraph
+from importlib import resources
+import random
+import unittest
+
+import networkx as nx
+
+
+class TestCSRGraph(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.edges = get_conflict_edges(self.primers, workers=1)
+
+    def assert_same_graph(self, g, nx_g):
+        self.assertEqual(g.nodes(), list(nx_g.nodes()))
+        self.assertEqual(g.degree(), list(nx_g.degree()))
+        self.assertEqual(g.number_of_edges(), nx_g.number_of_edges())
+        self.assertEqual(g.number_of_nodes(), nx_g.number_of_nodes())
+        for node in g.nodes():
+            self.assertEqual(
+                sorted(g.neighbors(node).tolist()), sorted(nx_g.neighbors(node))
+            )
+
+    def test_matches_networkx_while_removing_nodes(self):
+        g = CSRGraph(self.edges, len(self.primers))
+        nx_g = nx.Graph()
+        nx_g.add_edges_from(self.edges)
+        self.assert_same_graph(g, nx_g)
+
+        rng = random.Random(0)
+        while nx_g.number_of_edges() != 0:
+            node = rng.choice(list(nx_g.nodes()))
+            neighbors = list(nx_g.neighbors(node))
+            self.assertEqual(sorted(g.neighbors(node).tolist()), sorted(neighbors))
+            g.remove_node(node)
+            g.remove_nodes_from(neighbors)
+            nx_g.remove_node(node)
+            nx_g.remove_nodes_from(neighbors)
+            self.assert_same_graph(g, nx_g)
+
+    def test_min_degree_matches_networkx(self):
+        g = CSRGraph(self.edges, len(self.primers))
+        nx_g = nx.Graph()
+        nx_g.add_edges_from(self.edges)
+        while nx_g.number_of_edges() != 0:
+            node = min(nx_g.degree(), key=lambda x: x[1])[0]
+            min_degree = nx_g.degree(node)
+            self.assertEqual(g.min_degree_node(), node)
+            self.assertEqual(
+                g.min_degree_nodes(),
+                [n for (n, degree) in nx_g.degree() if degree == min_degree],
+            )
+            neighbors = list(nx_g.neighbors(node))
+            g.remove_node(node)
+            g.remove_nodes_from(neighbors)
+            nx_g.remove_node(node)
+            nx_g.remove_nodes_from(neighbors)
+            self.assertEqual(g.number_of_edges(), nx_g.number_of_edges())
+
+    def test_min_neighbor_degree_matches_brute_force(self):
+        g = CSRGraph(self.edges, len(self.primers))
+        while g.number_of_edges() != 0:
+            best_node = None
+            lowest = float("inf")
+            for node in g.min_degree_nodes():
+                degrees = [g.degree(n) for n in g.neighbors(node).tolist()]
+                average = sum(degrees) / len(degrees) if degrees else 0
+                if average < lowest:
+                    lowest = average
+                    best_node = node
+            self.assertEqual(g.min_neighbor_degree_node(), best_node)
+            neighbors = g.neighbors(best_node)
+            g.remove_node(best_node)
+            g.remove_nodes_from(neighbors)
+            for node in g.nodes():
+                self.assertEqual(
+                    g.neighbor_degree_sums[node],
+                    sum(g.degree(n) for n in g.neighbors(node).tolist()),
+                )
+
+    def test_random_node_pool(self):
+        g = CSRGraph(self.edges, len(self.primers))
+        random.seed(1)
+        picked = []
+        while g.number_of_edges() != 0:
+            node = g.random_node()
+            self.assertTrue(g.has_node(node))
+            picked.append(node)
+            neighbors = g.neighbors(node)
+            g.remove_node(node)
+            g.remove_nodes_from(neighbors)
+            self.assertEqual(sorted(g.node_pool[: g.node_pool_size]), sorted(g.nodes()))
+
+        # Same seed, same picks
+        g = CSRGraph(self.edges, len(self.primers))
+        random.seed(1)
+        for node in picked:
+            self.assertEqual(g.random_node(), node)
+            neighbors = g.neighbors(node)
+            g.remove_node(node)
+            g.remove_nodes_from(neighbors)
+
+    def test_min_degree_tie_break(self):
+        # Star around 5 plus a separate edge: 3, 5's leaves and 9 all have degree 1, 3 was seen first
+        g = CSRGraph([(3, 9), (5, 1), (5, 2), (0, 5)], 10)
+        self.assertEqual(g.nodes(), [3, 9, 5, 1, 2, 0])
+        self.assertEqual(g.min_degree_node(), 3)
+        self.assertEqual(g.min_degree_nodes(), [3, 9, 1, 2, 0])
+        g.remove_node(3)
+        # 9 stays in the graph with no edges left
+        self.assertEqual(g.degree(9), 0)
+        self.assertEqual(g.min_degree_node(), 9)
+        self.assertEqual(g.number_of_edges(), 3)
+
+    def test_duplicate_edges_counted_once(self):
+        g = CSRGraph([(0, 1), (1, 0), (0, 1)])
+        self.assertEqual(g.number_of_edges(), 1)
+        self.assertEqual(g.degree(0), 1)
+        with self.assertRaises(KeyError):
+            g.remove_node(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
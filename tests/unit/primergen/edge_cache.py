@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.edge_cache import (
+    evict,
+    get_cached_conflict_edges,
+    get_edges_key,
+    get_edges_path,
+    load_edges,
+    save_edges,
+)
+from importlib import resources
+import os
+import tempfile
+import unittest
+
+
+class TestEdgeCache(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_primers_and_thresholds(self):
+        key = get_edges_key(self.primers)
+        self.assertEqual(key, get_edges_key(list(self.primers)))
+        self.assertNotEqual(key, get_edges_key(self.primers[1:]))
+        self.assertNotEqual(key, get_edges_key(self.primers, limit=7))
+        self.assertNotEqual(key, get_edges_key(self.primers, far=True))
+
+    def test_cached_edges_match_computed(self):
+        expected = get_conflict_edges(self.primers, workers=1)
+        first = get_cached_conflict_edges(
+            self.primers, workers=1, cache_folder=self.folder
+        )
+        key = get_edges_key(self.primers)
+        self.assertTrue(os.path.exists(get_edges_path(key, self.folder)))
+        second = get_cached_conflict_edges(
+            self.primers, workers=1, cache_folder=self.folder
+        )
+        self.assertEqual([tuple(edge) for edge in first.tolist()], expected)
+        self.assertEqual(second.tolist(), first.tolist())
+
+    def test_evicts_least_recently_used(self):
+        save_edges("old", [(0, 1)] * 100, cache_folder=self.folder)
+        save_edges("new", [(0, 1)] * 100, cache_folder=self.folder)
+        old_path = get_edges_path("old", self.folder)
+        os.utime(old_path, (0, 0))
+        evict(self.folder, max_bytes=os.path.getsize(old_path) + 1)
+        self.assertIsNone(load_edges("old", self.folder))
+        self.assertIsNotNone(load_edges("new", self.folder))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.edge_shards import (
+    compute_edge_shards,
+    get_missing_tiles,
+    get_shard_path,
+    get_sharded_conflict_edges,
+    get_tiles,
+    load_sharded_edges,
+)
+from importlib import resources
+import os
+import tempfile
+import unittest
+
+
+class TestEdgeShards(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "shards")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tiles_cover_upper_triangle(self):
+        tiles = get_tiles(200, 64)
+        self.assertEqual(len(tiles), 10)
+        self.assertEqual(tiles[:4], [(0, 0), (0, 1), (0, 2), (0, 3)])
+        self.assertEqual(get_tiles(0, 64), [])
+
+    def test_same_edges_as_conflict_graph(self):
+        for far in (False, True):
+            expected = get_conflict_edges(self.primers, workers=1, far=far)
+            for workers in (1, 2):
+                folder = os.path.join(self.tmp.name, f"{far}-{workers}")
+                edges = get_sharded_conflict_edges(
+                    self.primers, folder, workers=workers, far=far, tile_size=48
+                )
+                self.assertEqual(list(map(tuple, edges.tolist())), expected)
+
+    def test_seed_index(self):
+        for limit, far in ((4, False), (8, True)):
+            folder = os.path.join(self.tmp.name, f"{limit}-{far}")
+            for workers in (1, 2):
+                edges = get_sharded_conflict_edges(
+                    self.primers,
+                    os.path.join(folder, str(workers)),
+                    limit=limit,
+                    workers=workers,
+                    far=far,
+                    tile_size=48,
+                    use_seed_index=True,
+                )
+                self.assertEqual(
+                    list(map(tuple, edges.tolist())),
+                    get_conflict_edges(self.primers, limit=limit, workers=1, far=far),
+                )
+
+    def test_resumes_and_splits_into_parts(self):
+        tiles = get_tiles(len(self.primers), 48)
+        # First part only, as if another machine had the other one
+        missing = compute_edge_shards(
+            self.primers, self.folder, workers=1, tile_size=48, part=0, parts=2
+        )
+        self.assertEqual(missing, len(tiles[1::2]))
+        with self.assertRaises(ValueError):
+            load_sharded_edges(self.folder)
+        # Done tiles are not recomputed
+        done = get_shard_path(self.folder, tiles[0])
+        mtime = os.stat(done).st_mtime_ns
+        self.assertEqual(
+            compute_edge_shards(self.primers, self.folder, workers=1, tile_size=48), 0
+        )
+        self.assertEqual(os.stat(done).st_mtime_ns, mtime)
+        self.assertEqual(get_missing_tiles(self.folder, tiles), [])
+        self.assertEqual(
+            list(map(tuple, load_sharded_edges(self.folder).tolist())),
+            get_conflict_edges(self.primers, workers=1),
+        )
+
+    def test_rejects_other_job(self):
+        compute_edge_shards(self.primers[:50], self.folder, workers=1, tile_size=48)
+        with self.assertRaises(ValueError):
+            compute_edge_shards(self.primers, self.folder, workers=1, tile_size=48)
+        # Same number of primers, but not the same ones
+        with self.assertRaises(ValueError):
+            compute_edge_shards(
+                self.primers[50:100], self.folder, workers=1, tile_size=48
+            )
+
+    def test_unpackable_primers(self):
+        primers = self.primers[:60] + ["NNNNNNNNNNGGGGGGGGGG"]
+        edges = get_sharded_conflict_edges(
+            primers, self.folder, workers=1, tile_size=16
+        )
+        self.assertEqual(
+            list(map(tuple, edges.tolist())), get_conflict_edges(primers, workers=1)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
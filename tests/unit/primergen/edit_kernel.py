@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+from primergen.common import edit_kernel
+from primergen.common.edit_kernel import (
+    edit_distances_block,
+    edit_distances_one_to_many,
+)
+from primergen.common.packed import pack_primers
+from primergen.common.util import random_primer
+from polyleven import levenshtein
+import random
+import unittest
+
+
+class TestEditKernel(unittest.TestCase):
+    def setUp(self):
+        random.seed(3)
+        self.primers_a = [random_primer() for _ in range(60)]
+        self.primers_b = [random_primer() for _ in range(70)]
+        # A few close pairs so small distances get checked too
+        self.primers_b += [a[1:] + "A" for a in self.primers_a[:10]]
+        self.packed_a = pack_primers(self.primers_a, 20)
+        self.packed_b = pack_primers(self.primers_b, 20)
+        self.use_numba = edit_kernel.USE_NUMBA
+
+    def tearDown(self):
+        edit_kernel.USE_NUMBA = self.use_numba
+
+    def check_block(self, limit):
+        distances = edit_distances_block(self.packed_a, self.packed_b, limit=limit)
+        for i, a in enumerate(self.primers_a):
+            for j, b in enumerate(self.primers_b):
+                self.assertEqual(distances[i, j], levenshtein(a, b, limit))
+
+    def test_numpy_block(self):
+        edit_kernel.USE_NUMBA = False
+        self.check_block(limit=8)
+        self.check_block(limit=20)
+
+    @unittest.skipUnless(edit_kernel.HAVE_NUMBA, "numba not installed")
+    def test_numba_block(self):
+        edit_kernel.USE_NUMBA = True
+        self.check_block(limit=8)
+        self.check_block(limit=20)
+
+    def test_one_to_many(self):
+        distances = edit_distances_one_to_many(self.packed_a[0], self.packed_b)
+        expected = [levenshtein(self.primers_a[0], b, 8) for b in self.primers_b]
+        self.assertEqual(list(distances), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+from primergen.common.library_index import LibraryIndex
+from primergen.common.primer_store import write_primer_store
+from primergen.common.validation import validate_primers
+from primergen.extractors.delob_min_degree import DelobMinDegreePrimerExtractor
+from primergen.extractors.greedy import GreedyPrimerExtractor
+from primergen.generators.random_gc_frequencies import (
+    RandomBalancedGCFrequenciesPrimerGenerator,
+)
+from tests.unit.primergen.scratch import ScratchDirTestCase
+from importlib import resources
+import os
+import tempfile
+import unittest
+
+
+class TestExtend(ScratchDirTestCase):
+    def setUp(self):
+        super().setUp()
+        with resources.open_text(
+            "primergen.input", "20211206-101224-500-primers.txt"
+        ) as f:
+            primers = f.read().splitlines()
+        self.library = self.run_extractor(
+            DelobMinDegreePrimerExtractor(primers[:250], workers=1)
+        )
+        self.candidates = primers[250:]
+
+    def run_extractor(self, extractor):
+        extractor.start()
+        extractor.generate()
+        return extractor.primers
+
+    def test_filters_candidates_first(self):
+        extractor = DelobMinDegreePrimerExtractor(self.candidates, workers=1)
+        extractor.extend(self.library)
+        index = LibraryIndex(self.library)
+        expected = [
+            primer for primer in self.candidates if not index.has_conflict(primer)
+        ]
+        # The strategy only sees candidates that fit next to the library
+        self.assertEqual(extractor.initial_primers, expected)
+        self.assertEqual(extractor.num_starting_primers, len(expected))
+        primers = self.run_extractor(extractor)
+        self.assertEqual(primers[: len(self.library)], self.library)
+        self.assertGreater(len(primers), len(self.library))
+        self.assertTrue(validate_primers(primers, workers=1).is_valid())
+
+    def test_same_as_greedy_from_scratch(self):
+        # Greedy over library + candidates keeps the library, then the same candidates as extending it
+        library = self.run_extractor(GreedyPrimerExtractor(self.candidates[:100]))
+        expected = self.run_extractor(GreedyPrimerExtractor(self.candidates))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "library.primers")
+            write_primer_store(path, library)
+            extended = self.run_extractor(
+                GreedyPrimerExtractor(self.candidates[100:]).extend(path)
+            )
+        self.assertEqual(extended, expected)
+
+    def test_generator(self):
+        generator = RandomBalancedGCFrequenciesPrimerGenerator(
+            target=len(self.library) + 20
+        ).extend(self.library)
+        # Counts include the library
+        self.assertEqual(sum(generator.counts[0].values()), 4 + len(self.library))
+        primers = self.run_extractor(generator)
+        self.assertEqual(len(primers), len(self.library) + 20)
+        self.assertEqual(primers[: len(self.library)], self.library)
+        self.assertTrue(validate_primers(primers, workers=1).is_valid())
+        # An extended run doesn't share its result cache entry with a run from scratch
+        self.assertNotEqual(
+            generator.get_result_cache_key(),
+            RandomBalancedGCFrequenciesPrimerGenerator(
+                target=len(self.library) + 20
+            ).get_result_cache_key(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
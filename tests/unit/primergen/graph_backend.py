@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.edge_cache import edges_to_array
+from primergen.common.graph_backend import (
+    HAVE_IGRAPH,
+    approx_maximum_independent_set,
+    get_adjacency,
+)
+from primergen.common.validation import validate_primers
+from primergen.extractors.approx_mis import ApproxMisPrimerExtractor
+from primergen.extractors.naive_clique import NaiveCliquePrimerExtractor
+from tests.unit.primergen.scratch import ScratchDirTestCase
+from importlib import resources
+import networkx as nx
+import unittest
+
+
+class TestGraphBackend(ScratchDirTestCase):
+    def setUp(self):
+        super().setUp()
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.edges = edges_to_array(get_conflict_edges(self.primers, workers=1))
+
+    def assertIndependent(self, nodes):
+        adjacency = get_adjacency(self.edges, len(self.primers), backend="networkx")
+        self.assertEqual(len(set(nodes)), len(nodes))
+        for node in nodes:
+            self.assertFalse(adjacency[node] & set(nodes))
+
+    def test_backends_agree(self):
+        approx = approx_maximum_independent_set(self.edges, backend="networkx")
+        self.assertIndependent(approx)
+        # Nodes without conflicts aren't part of the graph
+        self.assertTrue(set(approx) <= set(self.edges.ravel().tolist()))
+        if HAVE_IGRAPH:
+            # The backend only builds the adjacency lists: same graph, same result
+            self.assertEqual(
+                get_adjacency(self.edges, len(self.primers), "igraph"),
+                get_adjacency(self.edges, len(self.primers), "networkx"),
+            )
+            self.assertEqual(
+                approx_maximum_independent_set(self.edges, backend="igraph"), approx
+            )
+
+    def test_extractors(self):
+        found = []
+        for extractor in (
+            ApproxMisPrimerExtractor(self.primers[:100], workers=1),
+            NaiveCliquePrimerExtractor(self.primers[:100], workers=1),
+        ):
+            extractor.start()
+            extractor.generate()
+            self.assertTrue(validate_primers(extractor.primers, workers=1).is_valid())
+            found.append(len(extractor.primers))
+        # The clique is optimal (largest clique of the far graph), the approximation can't beat it
+        self.assertLessEqual(found[0], found[1])
+        far_edges = get_conflict_edges(self.primers[:100], workers=1, far=True)
+        g = nx.Graph()
+        g.add_nodes_from(range(100))
+        g.add_edges_from(far_edges)
+        self.assertEqual(found[1], max(map(len, nx.find_cliques(g))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+from primergen.common.check import MIN_EDIT_DISTANCE, get_edit_distance_with_limit
+from primergen.common.library_index import LibraryIndex
+from primergen.generators.random_gc import RandomBalancedGCPrimerGenerator
+from importlib import resources
+import unittest
+
+
+class TestLibraryIndex(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-101224-500-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+
+    def test_conflicts_match_linear_scan(self):
+        library = self.primers[:250]
+        index = LibraryIndex(library)
+        for candidate in self.primers[250:]:
+            expected = [
+                other
+                for other in library
+                if get_edit_distance_with_limit(candidate, other, MIN_EDIT_DISTANCE)
+                < MIN_EDIT_DISTANCE
+            ]
+            self.assertEqual(sorted(index.conflicts(candidate)), sorted(expected))
+            self.assertEqual(index.has_conflict(candidate), len(expected) > 0)
+
+    def test_radius(self):
+        index = LibraryIndex(["AAAAAAAAAACCCCCCCCCC"])
+        self.assertTrue(index.has_conflict("AAAAAAAAAACCCCCCCCGG", radius=2))
+        self.assertFalse(index.has_conflict("AAAAAAAAAACCCCCCCCGG", radius=1))
+
+    def test_add(self):
+        index = LibraryIndex()
+        self.assertFalse(index.has_conflict(self.primers[0]))
+        index.add(self.primers[0])
+        self.assertEqual(len(index), 1)
+        self.assertTrue(index.has_conflict(self.primers[0]))
+
+    def test_generator_indexes_lazily(self):
+        generator = RandomBalancedGCPrimerGenerator(target=10)
+        generator.start()
+        generator.found_new_primers(self.primers[:5])
+        # Nothing indexed until a candidate is checked
+        self.assertEqual(len(generator.primer_index), 0)
+        self.assertTrue(generator.conflicts_with_primers(self.primers[0]))
+        self.assertEqual(len(generator.primer_index), 5)
+        generator.found_new_primer(self.primers[5])
+        self.assertTrue(generator.conflicts_with_primers(self.primers[5]))
+        self.assertEqual(generator.primer_index.primers, self.primers[:6])
+        generator.progress.stop(report=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
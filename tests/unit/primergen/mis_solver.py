@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.edge_cache import edges_to_array
+from primergen.common.graph_backend import get_adjacency
+from primergen.common.mis_solver import solve_mis
+from primergen.common.validation import validate_primers
+from primergen.extractors.exact_mis import ExactMisPrimerExtractor
+from tests.unit.primergen.scratch import ScratchDirTestCase
+from importlib import resources
+import networkx as nx
+import unittest
+
+
+class TestMisSolver(ScratchDirTestCase):
+    def setUp(self):
+        super().setUp()
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+
+    def assertIndependent(self, adjacency, nodes):
+        self.assertEqual(len(set(nodes)), len(nodes))
+        for node in nodes:
+            self.assertFalse(adjacency[node] & set(nodes))
+
+    def test_random_graphs_are_optimal(self):
+        # Dense enough that the rules don't solve everything: folds, dominance and branching all happen
+        for seed in range(20):
+            g = nx.gnp_random_graph(40, 0.15, seed=seed)
+            adjacency = [set(g.adj[node]) for node in range(40)]
+            result = solve_mis(adjacency, time_budget_sec=None)
+            self.assertIndependent(adjacency, result.nodes)
+            self.assertTrue(result.is_optimal())
+            self.assertEqual(
+                len(result.nodes),
+                max(map(len, nx.find_cliques(nx.complement(g)))),
+            )
+
+    def test_conflict_graph(self):
+        edges = edges_to_array(get_conflict_edges(self.primers, workers=1))
+        adjacency = get_adjacency(edges, len(self.primers), backend="networkx")
+        result = solve_mis(adjacency)
+        self.assertIndependent(adjacency, result.nodes)
+        self.assertEqual((len(result.nodes), result.gap()), (179, 0))
+
+    def test_out_of_time(self):
+        g = nx.gnp_random_graph(80, 0.1, seed=1)
+        adjacency = [set(g.adj[node]) for node in range(80)]
+        result = solve_mis(adjacency, time_budget_sec=0)
+        # Still a valid (greedy) independent set, with a bound that holds
+        self.assertIndependent(adjacency, result.nodes)
+        self.assertGreater(result.gap(), 0)
+        self.assertGreaterEqual(
+            result.upper_bound, len(solve_mis(adjacency, time_budget_sec=None).nodes)
+        )
+
+    def test_extractor(self):
+        extractor = ExactMisPrimerExtractor(self.primers[:100], workers=1)
+        extractor.start()
+        extractor.generate()
+        self.assertTrue(validate_primers(extractor.primers, workers=1).is_valid())
+        self.assertEqual(len(extractor.primers), extractor.upper_bound)
+
+
+if __name__ == "__main__":
+    unittest.main()
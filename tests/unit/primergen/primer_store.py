@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.primer_store import (
+    PrimerStore,
+    export_text_file,
+    import_text_file,
+    is_primer_store,
+    load_primers,
+    write_primer_store,
+)
+from primergen.common.validation import INVALID, validate_primers
+from importlib import resources
+from unittest import mock
+import numpy
+import os
+import pickle
+import tempfile
+import unittest
+
+
+class TestPrimerStore(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-102017-200-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "library.primers")
+        write_primer_store(self.path, self.primers)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_round_trip(self):
+        store = PrimerStore(self.path)
+        self.assertEqual(len(store), len(self.primers))
+        self.assertEqual(list(store), self.primers)
+        self.assertEqual(store[5], self.primers[5])
+        self.assertEqual(store[-1], self.primers[-1])
+        self.assertIsInstance(store.packed, numpy.memmap)
+        self.assertTrue(store.verify())
+        self.assertEqual((store.length, store.min_edit_distance), (20, 8))
+
+    def test_slices_are_views(self):
+        store = PrimerStore(self.path)
+        part = store[10:50]
+        self.assertIsInstance(part, PrimerStore)
+        self.assertEqual(list(part), self.primers[10:50])
+        self.assertEqual(list(part[5:10]), self.primers[15:20])
+        self.assertTrue(numpy.shares_memory(part.packed, store.packed))
+        # Slicing doesn't open the file again
+        with mock.patch.object(PrimerStore, "__init__", side_effect=AssertionError):
+            self.assertEqual(list(store[10:50][5:10]), self.primers[15:20])
+        # Pickled as the path and slice
+        self.assertEqual(list(pickle.loads(pickle.dumps(part))), self.primers[10:50])
+        with self.assertRaises(IndexError):
+            part[40]
+
+    def test_text_import_export(self):
+        text_path = os.path.join(self.folder.name, "library.txt")
+        export_text_file(self.path, text_path)
+        self.assertFalse(is_primer_store(text_path))
+        self.assertEqual(load_primers(text_path), self.primers)
+        store_path = os.path.join(self.folder.name, "imported.primers")
+        self.assertEqual(import_text_file(text_path, store_path), len(self.primers))
+        self.assertEqual(list(load_primers(store_path)), self.primers)
+
+    def test_invalid_primers_write_nothing(self):
+        path = os.path.join(self.folder.name, "bad.primers")
+        with self.assertRaises(ValueError):
+            write_primer_store(path, ["N" * 20])
+        self.assertEqual(os.listdir(self.folder.name), ["library.primers"])
+
+    def test_checkers_accept_store(self):
+        store = PrimerStore(self.path)
+        self.assertEqual(
+            get_conflict_edges(store, workers=1),
+            get_conflict_edges(self.primers, workers=1),
+        )
+        self.assertEqual(
+            get_conflict_edges(store, workers=2, pairs_per_block=2000),
+            get_conflict_edges(self.primers, workers=1),
+        )
+        report = validate_primers(store, workers=1)
+        self.assertEqual(report.verdict, INVALID)
+        self.assertEqual(
+            report.too_close_pairs,
+            validate_primers(self.primers, workers=1).too_close_pairs,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+from primergen.common.profiling import PhaseTimer
+from primergen.extractors.delob_min_degree import DelobMinDegreePrimerExtractor
+from primergen.generators.random_gc import RandomBalancedGCPrimerGenerator
+from tests.unit.primergen.scratch import ScratchDirTestCase
+from importlib import resources
+import json
+import os
+import tempfile
+import time
+import unittest
+
+
+def busy(sec):
+    end = time.perf_counter() + sec
+    while time.perf_counter() < end:
+        pass
+
+
+class TestProfiling(ScratchDirTestCase):
+    def test_spans(self):
+        timer = PhaseTimer()
+        timer.start()
+        for _ in range(3):
+            with timer.span("outer"):
+                with timer.span("inner"):
+                    busy(0.01)
+                time.sleep(0.01)
+        timer.add("hot", wall_sec=1.0, cpu_sec=0.5, calls=10)
+        timer.stop()
+
+        spans = timer.to_dict()["spans"]
+        self.assertEqual(list(spans), ["inner", "outer", "hot"])
+        self.assertEqual(spans["outer"]["calls"], 3)
+        self.assertGreaterEqual(spans["inner"]["wall_sec"], 0.03)
+        # Sleeping takes wall-clock time but no CPU time
+        self.assertGreaterEqual(spans["outer"]["wall_sec"], 0.06)
+        self.assertLess(spans["outer"]["cpu_sec"], spans["outer"]["wall_sec"])
+        self.assertEqual(
+            spans["hot"], dict(wall_sec=1.0, cpu_sec=0.5, worker_cpu_sec=0.0, calls=10)
+        )
+        self.assertGreaterEqual(timer.elapsed_sec(), spans["outer"]["wall_sec"])
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "phases.json")
+            timer.write_json(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f), timer.to_dict())
+
+    def test_profilers(self):
+        for profiler in ("cprofile", "sample"):
+            timer = PhaseTimer(profiler)
+            timer.start()
+            busy(0.1)
+            timer.stop()
+            profile = timer.to_dict()["profile"]
+            self.assertEqual(profile["type"], profiler)
+            names = [func["function"] for func in profile["functions"]]
+            self.assertTrue([name for name in names if "busy" in name], names)
+        with self.assertRaises(ValueError):
+            PhaseTimer("perf")
+
+    def test_phases(self):
+        with resources.open_text(
+            "primergen.input", "20211206-093547-100-primers.txt"
+        ) as f:
+            primers = f.read().splitlines()
+        extractor = DelobMinDegreePrimerExtractor(primers, workers=1)
+        extractor.start()
+        extractor.generate()
+        spans = extractor.timer.to_dict()["spans"]
+        for name in ("edges", "graph", "node-selection", "graph-mutation"):
+            self.assertIn(name, spans)
+        self.assertEqual(spans["edges"]["calls"], 1)
+
+        generator = RandomBalancedGCPrimerGenerator(target=20)
+        generator.start()
+        generator.generate()
+        spans = generator.timer.to_dict()["spans"]
+        self.assertGreaterEqual(spans["edit-distance"]["calls"], 20)
+        # Found times are wall-clock seconds since start
+        found_times = [found_time for found_time, _ in generator.primer_found_times]
+        self.assertEqual(found_times, sorted(found_times))
+        self.assertLessEqual(found_times[-1], generator.timer.elapsed_sec())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+from primergen.common.progress import (
+    HumanSink,
+    JsonLinesSink,
+    ProgressReporter,
+    get_sink,
+)
+from primergen.extractors.delob_min_degree import DelobMinDegreePrimerExtractor
+from tests.unit.primergen.scratch import ScratchDirTestCase
+from importlib import resources
+import gc
+import io
+import json
+import time
+import unittest
+
+
+class Counter:
+    """
+    Stand-in for a generator: just the counters the reporter reads
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.iterations = 0
+        self.primers = 0
+
+    def get_progress_state(self):
+        return {
+            "strategy": "test",
+            "elapsed_sec": time.perf_counter() - self.start_time,
+            "iterations": self.iterations,
+            "primers": self.primers,
+            "gc_errors": 0,
+            "edit_errors": 0,
+            "done": self.iterations,
+            "total": 1000,
+        }
+
+
+class TestProgress(ScratchDirTestCase):
+    def test_background_reports(self):
+        stream = io.StringIO()
+        counter = Counter()
+        reporter = ProgressReporter(counter, JsonLinesSink(stream), interval_sec=0.01)
+        reporter.start()
+        for _ in range(10):
+            counter.iterations += 50
+            counter.primers += 5
+            time.sleep(0.01)
+        reporter.stop()
+        self.assertIsNone(reporter.thread)
+
+        states = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertGreater(len(states), 2)
+        # The last one is the final state, reported by stop()
+        self.assertEqual((states[-1]["iterations"], states[-1]["primers"]), (500, 50))
+        self.assertTrue([state for state in states if state["eta_sec"] is not None])
+        # Nothing more once stopped
+        time.sleep(0.05)
+        self.assertEqual(len(stream.getvalue().splitlines()), len(states))
+
+    def test_thread_ends_with_generator(self):
+        counter = Counter()
+        reporter = ProgressReporter(
+            counter, HumanSink(io.StringIO()), interval_sec=0.01
+        )
+        reporter.start()
+        thread = reporter.thread
+        del counter
+        gc.collect()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+    def test_sinks(self):
+        self.assertIsNone(get_sink("silent"))
+        self.assertIsInstance(get_sink("human"), HumanSink)
+        self.assertIsInstance(get_sink("jsonl"), JsonLinesSink)
+        with self.assertRaises(ValueError):
+            get_sink("curses")
+        # No thread without a sink
+        reporter = ProgressReporter(Counter(), None)
+        reporter.start()
+        self.assertIsNone(reporter.thread)
+        reporter.stop()
+
+    def test_extractor(self):
+        with resources.open_text(
+            "primergen.input", "20211206-101224-500-primers.txt"
+        ) as f:
+            primers = f.read().splitlines()
+        extractor = DelobMinDegreePrimerExtractor(primers, workers=1)
+        stream = io.StringIO()
+        extractor.progress.sink = JsonLinesSink(stream)
+        extractor.start()
+        extractor.generate()
+        extractor.progress.stop()
+        state = json.loads(stream.getvalue().splitlines()[-1])
+        self.assertEqual(state["primers"], len(extractor.primers))
+        self.assertEqual(state["done"], state["total"])
+
+
+if __name__ == "__main__":
+    unittest.main()
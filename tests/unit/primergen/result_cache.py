@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+from primergen.common.result_cache import (
+    get_result_key,
+    get_result_path,
+    load_result,
+    save_result,
+)
+from primergen.extractors.exact_mis import ExactMisPrimerExtractor
+from primergen.extractors.greedy import GreedyPrimerExtractor
+from tests.unit.primergen.scratch import ScratchDirTestCase
+from importlib import resources
+import os
+import unittest
+
+
+class TestResultCache(ScratchDirTestCase):
+    def setUp(self):
+        super().setUp()
+        with resources.open_text(
+            "primergen.input", "20211206-093547-100-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+        self.folder = self.scratch_dir
+
+    def test_key(self):
+        params = {"strategy": "greedy", "seeds": [246, 4812]}
+        key = get_result_key(self.primers, params)
+        self.assertEqual(key, get_result_key(list(self.primers), dict(params)))
+        self.assertNotEqual(key, get_result_key(self.primers[1:], params))
+        self.assertNotEqual(
+            key, get_result_key(self.primers, {**params, "seeds": [1, 2]})
+        )
+        self.assertNotEqual(key, get_result_key(None, params))
+        # Strategy options are part of the key
+        self.assertNotEqual(
+            ExactMisPrimerExtractor(self.primers).get_result_cache_key(),
+            ExactMisPrimerExtractor(
+                self.primers, time_budget_sec=1
+            ).get_result_cache_key(),
+        )
+
+    def test_save_and_load(self):
+        self.assertIsNone(load_result("missing", self.folder))
+        path = save_result("key", self.primers[:10], self.folder)
+        self.assertEqual(load_result("key", self.folder), self.primers[:10])
+        # A damaged entry is dropped
+        with open(path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\xff")
+        self.assertIsNone(load_result("key", self.folder))
+        self.assertFalse(os.path.exists(path))
+        # Least recently used entries go first
+        old_path = save_result("old", self.primers, self.folder)
+        os.utime(old_path, (0, 0))
+        save_result("new", self.primers, self.folder, max_bytes=1)
+        self.assertIsNone(load_result("old", self.folder))
+        self.assertEqual(load_result("new", self.folder), self.primers)
+
+    def test_execute(self):
+        first = GreedyPrimerExtractor(self.primers)
+        primers = first.execute()
+        self.assertEqual(len(primers), 96)
+        key = first.get_result_cache_key()
+        self.assertTrue(os.path.exists(get_result_path(key)))
+
+        second = GreedyPrimerExtractor(self.primers)
+        second.generate = lambda: self.fail("Should come from the cache")
+        self.assertEqual(second.execute(), primers)
+
+        third = GreedyPrimerExtractor(self.primers)
+        self.assertEqual(third.execute(recompute=True), primers)
+        self.assertIsNotNone(third.timer.start_wall_time)
+
+    def test_incomplete_results_are_not_stored(self):
+        extractor = GreedyPrimerExtractor(self.primers)
+        extractor.is_result_complete = lambda: False
+        extractor.execute()
+        self.assertFalse(
+            os.path.exists(get_result_path(extractor.get_result_cache_key()))
+        )
+        # A solver that ran out of time didn't finish
+        exact = ExactMisPrimerExtractor(self.primers)
+        exact.primers = self.primers[:10]
+        exact.upper_bound = 11
+        self.assertFalse(exact.is_result_complete())
+        exact.upper_bound = 10
+        self.assertTrue(exact.is_result_complete())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+from primergen.common.check import is_gc_valid
+from primergen.common.packed import encode_primers, gc_counts_packed, unpack_primers
+from primergen.common.sampling import (
+    fix_gc_counts,
+    primers_from_frequencies_batch,
+    random_primers_batch,
+    random_primers_with_balanced_gc_batch,
+)
+import unittest
+
+import numpy
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        self.rng = numpy.random.RandomState(7)
+
+    def test_random_primers(self):
+        packed = random_primers_batch(500, rng=self.rng)
+        self.assertEqual(packed.shape, (500,))
+        primers = unpack_primers(packed, 20)
+        self.assertEqual(set("".join(primers)), set("ACGT"))
+
+    def test_balanced_gc(self):
+        packed = random_primers_with_balanced_gc_batch(2000, rng=self.rng)
+        gc = gc_counts_packed(packed, 20)
+        self.assertEqual(set(gc.tolist()), {9, 10, 11})
+        for primer in unpack_primers(packed[:100], 20):
+            self.assertTrue(is_gc_valid(primer))
+
+    def test_frequencies(self):
+        # Weights are in A, T, G, C order: position 0 is always T, the rest never G
+        frequencies = [[1, 1, 0, 1] for _ in range(20)]
+        frequencies[0] = [0, 1, 0, 0]
+        for reroll in (False, True):
+            packed = primers_from_frequencies_batch(
+                frequencies, 1000, alphabet="ATGC", reroll=reroll, rng=self.rng
+            )
+            self.assertEqual(len(packed), 1000)
+            gc = gc_counts_packed(packed, 20)
+            self.assertTrue(((gc >= 9) & (gc <= 11)).all())
+        # Without GC fixing needed, the weights are followed exactly
+        packed = primers_from_frequencies_batch(
+            frequencies, 1000, alphabet="ATGC", reroll=True, rng=self.rng
+        )
+        primers = unpack_primers(packed, 20)
+        self.assertEqual({primer[0] for primer in primers}, {"T"})
+        self.assertNotIn("G", "".join(primers))
+
+    def test_fix_gc_counts(self):
+        codes = encode_primers(["A" * 20, "G" * 20, "ACGT" * 5], 20)
+        fixed = fix_gc_counts(codes, rng=self.rng)
+        gc = ((fixed == 1) | (fixed == 2)).sum(axis=1)
+        self.assertEqual(gc.tolist(), [9, 11, 10])
+        # Balanced rows don't change
+        self.assertTrue((fixed[2] == codes[2]).all())
+
+    def test_same_seed_same_batch(self):
+        first = random_primers_with_balanced_gc_batch(
+            100, rng=numpy.random.RandomState(3)
+        )
+        second = random_primers_with_balanced_gc_batch(
+            100, rng=numpy.random.RandomState(3)
+        )
+        self.assertTrue((first == second).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
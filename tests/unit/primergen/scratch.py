@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+
+class ScratchDirTestCase(unittest.TestCase):
+    """
+    Runs each test in its own temporary working directory. Runs write their output (output/) and caches
+    (primergen/cache, primergen/results) relative to the working directory, so tests that call generate() or execute()
+    would otherwise leave files in the repo and pick up entries from earlier runs.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp.name)
+        self.scratch_dir = tmp.name
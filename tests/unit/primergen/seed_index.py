@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+from primergen.common.check import get_edit_distance_with_limit
+from primergen.common.conflict_graph import get_conflict_edges
+from primergen.common.seed_index import SeedIndex
+from importlib import resources
+import itertools
+import math
+import unittest
+
+
+def brute_force_edges(primers, limit):
+    return [
+        (i, j)
+        for (i, p1), (j, p2) in itertools.combinations(enumerate(primers), 2)
+        if get_edit_distance_with_limit(p1, p2, limit) < limit
+    ]
+
+
+class TestSeedIndex(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-101224-500-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+
+    def test_candidates_contain_all_close_pairs(self):
+        for limit in (4, 8):
+            index = SeedIndex(self.primers, limit=limit)
+            candidates = set(index.candidate_pairs())
+            for edge in brute_force_edges(self.primers, limit):
+                self.assertIn(edge, candidates)
+
+    def test_prunes_pairs_with_long_seeds(self):
+        index = SeedIndex(self.primers, limit=4)
+        num_candidates = len(list(index.candidate_pairs()))
+        self.assertLess(num_candidates, math.comb(len(self.primers), 2) / 2)
+
+    def test_edges_match_brute_force(self):
+        for limit in (4, 8):
+            edges = get_conflict_edges(
+                self.primers, limit=limit, workers=1, use_seed_index=True
+            )
+            self.assertEqual(edges, brute_force_edges(self.primers, limit))
+
+    def test_parallel_far_edges_match_without_index(self):
+        primers = self.primers[:200]
+        with_index = get_conflict_edges(
+            primers, workers=2, far=True, pairs_per_block=2000, use_seed_index=True
+        )
+        without_index = get_conflict_edges(primers, workers=1, far=True)
+        self.assertEqual(with_index, without_index)
+
+    def test_add_short_primer(self):
+        index = SeedIndex(["ACGTACGTAC"], limit=4)
+        index.add("ACGTACGTACGT")
+        self.assertEqual(index.candidates("ACGTACGTACGT"), [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
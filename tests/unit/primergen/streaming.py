@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+from primergen.extractors.greedy import GreedyPrimerExtractor
+from primergen.extractors.streaming import StreamingGreedyPrimerExtractor
+from importlib import resources
+import os
+import tempfile
+import unittest
+
+
+class TestStreamingGreedy(unittest.TestCase):
+    def setUp(self):
+        with resources.open_text(
+            "primergen.input", "20211206-100844-1000-primers.txt"
+        ) as f:
+            self.primers = f.read().splitlines()
+
+    def run_extractor(self, extractor):
+        extractor.start()
+        extractor.generate()
+        return extractor.primers
+
+    def test_same_as_greedy(self):
+        expected = self.run_extractor(GreedyPrimerExtractor(self.primers))
+        # Tiny budget: many chunks and batches
+        streaming = StreamingGreedyPrimerExtractor(
+            iter(self.primers), memory_budget_bytes=64 * 1024
+        )
+        self.assertGreater(len(self.primers), streaming.chunk_size)
+        self.assertEqual(self.run_extractor(streaming), expected)
+        self.assertEqual(streaming.num_starting_primers, len(self.primers))
+        self.assertEqual(streaming.primer_found_times[-1][1], len(expected))
+        # Progress counts candidates read, out of all of them when the source has a size
+        self.assertIsNone(streaming.progress_total)
+        sized = StreamingGreedyPrimerExtractor(self.primers)
+        self.run_extractor(sized)
+        self.assertEqual(sized.progress_done, sized.progress_total)
+        self.assertEqual(sized.progress_total, len(self.primers))
+
+    def test_file_source_and_invalid_lines(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "primers.txt")
+            with open(path, "w") as f:
+                f.write("\n".join(["NNNNNNNNNNGGGGGGGGGG", "A" * 20, "ACGT", ""]))
+                f.write("\n" + "\n".join(self.primers[:100]) + "\n")
+            streaming = StreamingGreedyPrimerExtractor(path)
+            primers = self.run_extractor(streaming)
+        self.assertEqual(
+            primers, self.run_extractor(GreedyPrimerExtractor(self.primers[:100]))
+        )
+        self.assertEqual(streaming.gc_errors, 3)
+
+    def test_target(self):
+        streaming = StreamingGreedyPrimerExtractor(iter(self.primers), target=10)
+        self.assertEqual(len(self.run_extractor(streaming)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()